@@ -1,5 +1,8 @@
 import type { NextConfig } from "next";
 
+// The backend image proxy (/images/...) lives on the same host as the API
+const apiUrl = new URL(process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000');
+
 const nextConfig: NextConfig = {
   images: {
     domains: ['image.tmdb.org'],
@@ -10,8 +13,14 @@ const nextConfig: NextConfig = {
         port: '',
         pathname: '/t/p/**',
       },
+      {
+        protocol: apiUrl.protocol === 'https:' ? 'https' : 'http',
+        hostname: apiUrl.hostname,
+        port: apiUrl.port,
+        pathname: `${apiUrl.pathname.replace(/\/$/, '')}/images/**`,
+      },
     ],
   },
 };
 
-export default nextConfig;
\ No newline at end of file
+export default nextConfig;
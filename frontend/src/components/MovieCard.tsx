@@ -3,7 +3,7 @@ import { Star, Calendar, Film, Eye, Play } from 'lucide-react';
 import Image from 'next/image';
 import type { Movie } from '@/types/movie';
 import { useState } from 'react';
-import { cn } from '@/lib/utils';
+import { cn, getPosterUrl } from '@/lib/utils';
 
 interface MovieCardProps {
   movie: Movie;
@@ -19,11 +19,7 @@ const MovieCard = ({ movie, onSelect, index = 0 }: MovieCardProps) => {
   const posterPath = movie.poster_path;
   const hasPosterPath = posterPath && posterPath !== 'null' && posterPath !== 'None' && posterPath.length > 0;
   
-  const imageUrl = hasPosterPath 
-    ? (posterPath.startsWith('http') 
-        ? posterPath 
-        : `https://image.tmdb.org/t/p/w500${posterPath.startsWith('/') ? posterPath : `/${posterPath}`}`)
-    : null;
+  const imageUrl = hasPosterPath ? getPosterUrl(posterPath, 'w342') : null;
 
   const generateColorFromTitle = (title: string) => {
     let hash = 0;
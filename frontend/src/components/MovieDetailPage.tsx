@@ -16,7 +16,7 @@ import { useAuth } from '@/contexts/AuthContext';
 import axios from 'axios';
 import { toast } from 'react-hot-toast';
 import { Dialog } from '@/components/ui/dialog';
-import { cn } from '@/lib/utils';
+import { cn, getPosterUrl } from '@/lib/utils';
 import { useRouter } from 'next/navigation';
 
 interface MovieDetailPageProps {
@@ -168,7 +168,7 @@ export default function MovieDetailPage({ movieId }: MovieDetailPageProps) {
 
   const hasValidPoster = movie.poster_path && movie.poster_path.length > 0 && movie.poster_path !== 'null' && movie.poster_path !== 'None';
   const posterUrl = hasValidPoster 
-    ? `${process.env.NEXT_PUBLIC_TMDB_IMAGE_BASE_URL}${movie.poster_path}`
+    ? getPosterUrl(movie.poster_path, 'w500') ?? ''
     : '';
 
   return (
@@ -13,6 +13,7 @@ import { Badge } from '@/components/ui/badge';
 import axios from 'axios';
 import { useRouter } from 'next/navigation';
 import { useAuth } from '@/contexts/AuthContext';
+import { subscribeToNotifications } from '@/services/notificationStream';
 
 interface Movie {
   id: number;
@@ -44,9 +45,12 @@ export function NotificationBell() {
     if (user) {
       fetchNotifications();
   
-      const interval = setInterval(fetchNotifications, 5 * 60 * 1000); 
-      
-      return () => clearInterval(interval);
+      return subscribeToNotifications({
+        onNotification: (notification) => {
+          setNotifications(prev => [notification, ...prev.filter(n => n.id !== notification.id)].slice(0, 10));
+        },
+        onSummary: (summary) => setUnreadCount(summary.unread_count)
+      });
     }
   }, [user]);
 
@@ -54,12 +58,15 @@ export function NotificationBell() {
     if (!user) return;
     
     try {
-      const response = await axios.get('/notifications');
+      const [listResponse, summaryResponse] = await Promise.all([
+        axios.get('/notifications', { params: { limit: 10 } }),
+        axios.get('/notifications/summary')
+      ]);
       
-      if (response.data && Array.isArray(response.data)) {
-        setNotifications(response.data);
-        setUnreadCount(response.data.filter((n: Notification) => !n.read).length);
+      if (listResponse.data && Array.isArray(listResponse.data.items)) {
+        setNotifications(listResponse.data.items);
       }
+      setUnreadCount(summaryResponse.data?.unread_count ?? 0);
     } catch (error) {
       console.error('Error fetching notifications:', error);
     }
@@ -13,6 +13,7 @@ import { useRouter } from 'next/navigation';
 import { useAuth } from '@/contexts/AuthContext';
 import { toast } from 'react-hot-toast';
 import { cn } from '@/lib/utils';
+import { subscribeToNotifications } from '@/services/notificationStream';
 
 interface Movie {
   id: number;
@@ -55,6 +56,8 @@ const getNotificationColor = (type: Notification['type']) => {
   return colors[type];
 };
 
+const PAGE_SIZE = 20;
+
 export default function NotificationsPage() {
   const { user } = useAuth();
   const [notifications, setNotifications] = useState<Notification[]>([]);
@@ -62,6 +65,8 @@ export default function NotificationsPage() {
   const [isGenerating, setIsGenerating] = useState(false);
   const [selectedFilter, setSelectedFilter] = useState<'all' | 'unread'>('all');
   const [expandedNotifications, setExpandedNotifications] = useState<Set<number>>(new Set());
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const router = useRouter();
 
   useEffect(() => {
@@ -71,22 +76,23 @@ export default function NotificationsPage() {
     }
 
     fetchNotifications();
-    const refreshInterval = setInterval(fetchNotifications, 5 * 60 * 1000);
     
-    return () => clearInterval(refreshInterval);
+    return subscribeToNotifications({
+      onNotification: (notification) => {
+        setNotifications(prev => [notification, ...prev.filter(n => n.id !== notification.id)]);
+      }
+    });
   }, [user, router]);
 
   const fetchNotifications = async () => {
     if (!user) return;
     setIsLoading(true);
     try {
-      const response = await axios.get('/notifications');
+      const response = await axios.get('/notifications', { params: { limit: PAGE_SIZE } });
       
-      if (response.data && Array.isArray(response.data)) {
-        const sortedNotifications = [...response.data].sort((a, b) => 
-          new Date(b.created_at).getTime() - new Date(a.created_at).getTime()
-        );
-        setNotifications(sortedNotifications);
+      if (response.data && Array.isArray(response.data.items)) {
+        setNotifications(response.data.items);
+        setNextCursor(response.data.next_cursor);
       }
     } catch (error) {
       console.error('Error fetching notifications:', error);
@@ -96,6 +102,26 @@ export default function NotificationsPage() {
     }
   };
 
+  const loadMoreNotifications = async () => {
+    if (!nextCursor) return;
+    setIsLoadingMore(true);
+    try {
+      const response = await axios.get('/notifications', {
+        params: { limit: PAGE_SIZE, cursor: nextCursor }
+      });
+      
+      if (response.data && Array.isArray(response.data.items)) {
+        setNotifications(prev => [...prev, ...response.data.items]);
+        setNextCursor(response.data.next_cursor);
+      }
+    } catch (error) {
+      console.error('Error loading more notifications:', error);
+      toast.error('Failed to load more notifications');
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const markAsRead = async (notificationId: number) => {
     try {
       await axios.post(`/notifications/${notificationId}/mark-read`);
@@ -140,6 +166,7 @@ export default function NotificationsPage() {
       try {
         await axios.delete('/notifications');
         setNotifications([]);
+        setNextCursor(null);
         toast.success('All notifications deleted');
       } catch (error) {
         console.error('Error deleting all notifications:', error);
@@ -515,6 +542,20 @@ export default function NotificationsPage() {
                 </CardContent>
               </Card>
             ))}
+
+            {nextCursor && (
+              <div className="flex justify-center pt-2">
+                <Button
+                  variant="outline"
+                  onClick={loadMoreNotifications}
+                  disabled={isLoadingMore}
+                  className="hover:border-primary transition-colors"
+                >
+                  <RefreshCw className={cn("h-4 w-4 mr-2", isLoadingMore && "animate-spin")} />
+                  Load more
+                </Button>
+              </div>
+            )}
           </div>
         ) : (
           <Card className="shadow-lg border-0">
@@ -16,7 +16,7 @@ import axios from 'axios';
 import { useRouter } from 'next/navigation';
 import RatingStars from '@/components/RatingStars';
 import Image from 'next/image';
-import { cn } from '@/lib/utils';
+import { cn, getPosterUrl } from '@/lib/utils';
 
 interface UserRating {
   movie_id: number;
@@ -277,7 +277,7 @@ export default function ProfilePage() {
                             <div className="flex-shrink-0 h-20 w-14 relative bg-gray-200 rounded-lg overflow-hidden shadow-md group-hover:shadow-xl transition-shadow">
                               {rating.poster_path && !imageLoadErrors.has(rating.movie_id) ? (
                                 <Image
-                                  src={`https://image.tmdb.org/t/p/w92${rating.poster_path}`}
+                                  src={getPosterUrl(rating.poster_path, 'w92') ?? ''}
                                   alt={rating.movie_title}
                                   fill
                                   sizes="56px"
@@ -1,5 +1,5 @@
 import axios from 'axios';
-import type { Movie, MovieRecommendation, Rating} from '@/types/movie';
+import type { BrowseFilters, BrowseResponse, Movie, MovieRecommendation, Rating} from '@/types/movie';
 
 const apiClient = axios.create({
   baseURL: process.env.NEXT_PUBLIC_API_URL,
@@ -55,14 +55,28 @@ export const movieApi = {
     return data;
   },
 
+  getMoviesBatch: async (movieIds: number[]): Promise<Movie[]> => {
+    if (movieIds.length === 0) return [];
+    const { data } = await apiClient.post<Movie[]>('/movies/batch', { movie_ids: movieIds });
+    return data;
+  },
+
+  browseMovies: async (filters: BrowseFilters = {}): Promise<BrowseResponse> => {
+    const { data } = await apiClient.get<BrowseResponse>('/movies/browse', {
+      params: filters,
+      paramsSerializer: { indexes: null },
+    });
+    return data;
+  },
+
   getRecommendations: async (
     movieId: number,
     method: string = 'hybrid',
     limit: number = 10
   ): Promise<MovieRecommendation[]> => {
-    const { data } = await apiClient.post<MovieRecommendation[]>(
+    const { data } = await apiClient.get<MovieRecommendation[]>(
       `/movies/${movieId}/recommendations`,
-      { method, limit }
+      { params: { method, limit } }
     );
     return data;
   },
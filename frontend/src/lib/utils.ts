@@ -4,3 +4,12 @@ import { twMerge } from "tailwind-merge"
 export function cn(...inputs: ClassValue[]) {
   return twMerge(clsx(inputs))
 }
+
+export type PosterSize = 'w92' | 'w154' | 'w185' | 'w342' | 'w500' | 'w780' | 'original';
+
+export function getPosterUrl(posterPath: string | null | undefined, size: PosterSize = 'w342') {
+  if (!posterPath || posterPath === 'null' || posterPath === 'None') return null;
+  if (posterPath.startsWith('http')) return posterPath;
+  const path = posterPath.startsWith('/') ? posterPath : `/${posterPath}`;
+  return `${process.env.NEXT_PUBLIC_API_URL}/images/${size}${path}`;
+}
@@ -0,0 +1,50 @@
+// src/services/notificationStream.ts
+
+export interface NotificationSummary {
+  unread_count: number;
+  last_recommendation_at: string | null;
+}
+
+export interface StreamedNotification {
+  id: number;
+  title: string;
+  message: string;
+  type: 'info' | 'success' | 'warning' | 'error';
+  kind?: string | null;
+  read: boolean;
+  created_at: string;
+  metadata?: string;
+}
+
+interface NotificationStreamHandlers {
+  onNotification?: (notification: StreamedNotification) => void;
+  onSummary?: (summary: NotificationSummary) => void;
+}
+
+// EventSource cannot send an Authorization header, so the token goes in the query string.
+// The browser reconnects on its own if the connection drops.
+export const subscribeToNotifications = (handlers: NotificationStreamHandlers): (() => void) => {
+  const token = localStorage.getItem('token');
+  if (!token || typeof EventSource === 'undefined') return () => {};
+
+  const baseURL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000';
+  const source = new EventSource(`${baseURL}/notifications/stream?token=${encodeURIComponent(token)}`);
+
+  source.addEventListener('notification', (event) => {
+    try {
+      handlers.onNotification?.(JSON.parse((event as MessageEvent).data));
+    } catch (error) {
+      console.error('Error parsing streamed notification:', error);
+    }
+  });
+
+  source.addEventListener('summary', (event) => {
+    try {
+      handlers.onSummary?.(JSON.parse((event as MessageEvent).data));
+    } catch (error) {
+      console.error('Error parsing notification summary:', error);
+    }
+  });
+
+  return () => source.close();
+};
@@ -19,31 +19,14 @@ export const canSendNewNotification = async (): Promise<boolean> => {
   if (DISABLE_NOTIFICATIONS) return false;
   
   try {
-    const response = await axios.get('/notifications');
-    
-    if (!response.data || !Array.isArray(response.data) || response.data.length === 0) {
-      return true;
-    }
-    
-    interface Notification {
-      metadata?: string;
-      created_at: string;
-    }
+    const response = await axios.get('/notifications/summary');
+    const lastRecommendationAt = response.data?.last_recommendation_at;
 
-    const lastRecommendationNotification = response.data.find((notification: Notification) => {
-      try {
-        const metadata = JSON.parse(notification.metadata || '{}');
-        return metadata.type === 'daily_recommendations';
-      } catch {
-        return false;
-      }
-    });
-    
-    if (!lastRecommendationNotification) {
+    if (!lastRecommendationAt) {
       return true;
     }
     
-    const lastNotificationTime = new Date(lastRecommendationNotification.created_at).getTime();
+    const lastNotificationTime = new Date(lastRecommendationAt).getTime();
     const currentTime = new Date().getTime();
     const minutesPassed = (currentTime - lastNotificationTime) / (1000 * 60);
     
@@ -175,14 +158,3 @@ export const processDailyRecommendations = async (): Promise<void> => {
     console.error('Error processing daily recommendations:', error);
   }
 };
-
-
-export const setupNotificationInterval = (intervalMinutes: number = 30): (() => void) => {
-  if (DISABLE_NOTIFICATIONS) return () => {};
-  
-  processDailyRecommendations();
-  
-  const interval = setInterval(processDailyRecommendations, intervalMinutes * 60 * 1000);
-  
-  return () => clearInterval(interval);
-};
\ No newline at end of file
@@ -19,6 +19,28 @@ export interface MovieRecommendation extends Movie {
     method: 'collaborative_filtering' | 'content_based' | 'hybrid' | 'popular';
 }
   
+export interface BrowseFilters {
+    genres?: string[];
+    genre_match?: 'any' | 'all';
+    year_min?: number;
+    year_max?: number;
+    min_rating?: number;
+    min_votes?: number;
+    sort_by?: 'popularity' | 'rating' | 'year' | 'title';
+    skip?: number;
+    limit?: number;
+}
+
+export interface BrowseResponse {
+    total: number;
+    results: Movie[];
+    facets: {
+        genres: { [genre: string]: number };
+        decades: { [decade: string]: number };
+        min_rating: { [threshold: string]: number };
+    };
+}
+  
 export interface Rating {
     movie_id: number;
     rating: number;
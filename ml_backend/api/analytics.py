@@ -0,0 +1,190 @@
+import json
+from datetime import datetime
+from typing import Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from database.dialects import insert_if_missing
+from database.genres import NO_GENRES, split_genres
+from database.models import AppRating, Movie, UserAnalytics, Watchlist
+
+EMPTY_WATCH_STATISTICS = {
+    "total_movies_rated": 0,
+    "average_rating": 0,
+    "highest_rated_genre": None,
+    "most_watched_year": None
+}
+
+
+class AnalyticsRollup:
+    # Vedere în memorie peste rândul user_analytics; câmpurile JSON sunt decodate o singură dată
+    def __init__(self, row: UserAnalytics):
+        self.row = row
+        self.rating_count = row.rating_count or 0
+        self.rating_sum = row.rating_sum or 0.0
+        self.rating_histogram = json.loads(row.rating_histogram or '{}')
+        self.genre_stats = json.loads(row.genre_stats or '{}')
+        self.monthly_genres = json.loads(row.monthly_genres or '{}')
+        self.year_counts = json.loads(row.year_counts or '{}')
+        self._drop_placeholder_genre()
+
+    def _drop_placeholder_genre(self):
+        # Rândurile construite înainte de split_genres numărau "(no genres listed)" ca gen
+        self.genre_stats.pop(NO_GENRES, None)
+        for month_key in list(self.monthly_genres):
+            self.monthly_genres[month_key].pop(NO_GENRES, None)
+            if not self.monthly_genres[month_key]:
+                del self.monthly_genres[month_key]
+
+    def _add(self, rating: float, timestamp: Optional[datetime], genres: Optional[str], year: Optional[int], sign: int):
+        self.rating_count += sign
+        self.rating_sum += sign * rating
+
+        rating_key = str(float(rating))
+        self.rating_histogram[rating_key] = self.rating_histogram.get(rating_key, 0) + sign
+        if self.rating_histogram[rating_key] <= 0:
+            del self.rating_histogram[rating_key]
+
+        genres = split_genres(genres)
+        if genres:
+            month_key = timestamp.strftime("%Y-%m") if timestamp else None
+            for genre in genres:
+                count, total = self.genre_stats.get(genre, [0, 0.0])
+                count, total = count + sign, total + sign * rating
+                if count <= 0:
+                    self.genre_stats.pop(genre, None)
+                else:
+                    self.genre_stats[genre] = [count, total]
+
+                if month_key:
+                    month = self.monthly_genres.setdefault(month_key, {})
+                    month[genre] = month.get(genre, 0) + sign
+                    if month[genre] <= 0:
+                        del month[genre]
+                    if not month:
+                        del self.monthly_genres[month_key]
+
+        if year:
+            year_key = str(year)
+            self.year_counts[year_key] = self.year_counts.get(year_key, 0) + sign
+            if self.year_counts[year_key] <= 0:
+                del self.year_counts[year_key]
+
+    def add_rating(self, rating: float, timestamp, genres, year):
+        self._add(float(rating), timestamp, genres, year, 1)
+
+    def remove_rating(self, rating: float, timestamp, genres, year):
+        self._add(float(rating), timestamp, genres, year, -1)
+
+    def save(self):
+        self.row.rating_count = self.rating_count
+        self.row.rating_sum = round(self.rating_sum, 4)
+        self.row.rating_histogram = json.dumps(self.rating_histogram)
+        self.row.genre_stats = json.dumps(self.genre_stats)
+        self.row.monthly_genres = json.dumps(self.monthly_genres)
+        self.row.year_counts = json.dumps(self.year_counts)
+        self.row.updated_at = datetime.utcnow()
+
+    def rating_distribution(self) -> List[Dict]:
+        return [
+            {"rating": float(rating), "count": count}
+            for rating, count in sorted(self.rating_histogram.items(), key=lambda item: float(item[0]))
+        ]
+
+    def genre_trends(self) -> List[Dict]:
+        return [{"month": month, "genres": genres} for month, genres in sorted(self.monthly_genres.items())]
+
+    def watch_statistics(self) -> Dict:
+        if not self.rating_count:
+            return dict(EMPTY_WATCH_STATISTICS)
+
+        genre_stats = {
+            genre: {"count": count, "average": round(total / count, 2)}
+            for genre, (count, total) in self.genre_stats.items()
+        }
+        highest_rated_genre = max(
+            self.genre_stats, key=lambda genre: self.genre_stats[genre][1] / self.genre_stats[genre][0]
+        ) if self.genre_stats else None
+        most_watched_year = int(max(self.year_counts, key=self.year_counts.get)) if self.year_counts else None
+
+        return {
+            "total_movies_rated": self.rating_count,
+            "average_rating": round(self.rating_sum / self.rating_count, 2),
+            "highest_rated_genre": highest_rated_genre,
+            "most_watched_year": most_watched_year,
+            "genre_stats": genre_stats
+        }
+
+    def user_statistics(self) -> Dict:
+        return {
+            "rating_count": self.rating_count,
+            "average_rating": self.rating_sum / self.rating_count if self.rating_count else None,
+            "watchlist_count": self.row.watchlist_count or 0
+        }
+
+
+def _lock_analytics_row(db: Session, user_id: int) -> UserAnalytics:
+    # FOR UPDATE nu blochează nimic cât rândul nu există: două prime scrieri concurente (rating + watchlist)
+    # l-ar insera amândouă. Inserarea fără conflict, urmată de blocare, le serializează; rândul inserat
+    # aici are updated_at NULL până când este reconstruit.
+    query = db.query(UserAnalytics).filter(UserAnalytics.user_id == user_id).with_for_update()
+    row = query.first()
+    if row is None:
+        insert_if_missing(db, UserAnalytics.__table__, {'user_id': user_id, 'updated_at': None})
+        row = query.first()
+    return row
+
+
+def rebuild_user_analytics(db: Session, user_id: int) -> UserAnalytics:
+    row = _lock_analytics_row(db, user_id)
+
+    row.rating_count, row.rating_sum = 0, 0.0
+    row.rating_histogram = row.genre_stats = row.monthly_genres = row.year_counts = None
+    rollup = AnalyticsRollup(row)
+
+    ratings = db.query(AppRating.rating, AppRating.timestamp, Movie.genres, Movie.year).join(
+        Movie, AppRating.movie_id == Movie.id
+    ).filter(
+        AppRating.user_app_id == user_id
+    ).all()
+    for rating, timestamp, genres, year in ratings:
+        rollup.add_rating(rating, timestamp, genres, year)
+    rollup.save()
+
+    row.watchlist_count = db.query(Watchlist).filter(Watchlist.user_app_id == user_id).count()
+    return row
+
+
+def get_user_analytics(db: Session, user_id: int) -> AnalyticsRollup:
+    row = db.query(UserAnalytics).filter(UserAnalytics.user_id == user_id).first()
+    if row is None or row.updated_at is None:
+        # Utilizatorii existenți înainte de rollup sunt completați la prima citire
+        row = rebuild_user_analytics(db, user_id)
+        db.commit()
+    return AnalyticsRollup(row)
+
+
+def lock_user_analytics(db: Session, user_id: int) -> AnalyticsRollup:
+    row = _lock_analytics_row(db, user_id)
+    if row.updated_at is None:
+        row = rebuild_user_analytics(db, user_id)
+    return AnalyticsRollup(row)
+
+
+def record_rating_change(db: Session, user_id: int, movie: Optional[Movie],
+                         old_rating=None, old_timestamp=None, new_rating=None, new_timestamp=None):
+    # Apelat în aceeași tranzacție cu scrierea rating-ului, înainte de flush
+    rollup = lock_user_analytics(db, user_id)
+    genres = movie.genres if movie else None
+    year = movie.year if movie else None
+
+    if old_rating is not None:
+        rollup.remove_rating(old_rating, old_timestamp, genres, year)
+    if new_rating is not None:
+        rollup.add_rating(new_rating, new_timestamp, genres, year)
+    rollup.save()
+
+
+def record_watchlist_change(db: Session, user_id: int, delta: int):
+    rollup = lock_user_analytics(db, user_id)
+    rollup.row.watchlist_count = max(0, (rollup.row.watchlist_count or 0) + delta)
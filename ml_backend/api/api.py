@@ -1,19 +1,20 @@
+import asyncio
 import os
 import random
 
 import openai
 import logging
 from datetime import datetime, timedelta
-from pydoc import text
 import json
 
 from dotenv import load_dotenv
-from fastapi import FastAPI, HTTPException, Depends, APIRouter
+from fastapi import FastAPI, HTTPException, Depends, APIRouter, Request, Response, Query, BackgroundTasks
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, EmailStr
 from typing import List, Optional, Dict
 
-from sqlalchemy import func
+from sqlalchemy import func, text
 from sqlalchemy.testing import db
 from starlette import status
 from starlette.responses import JSONResponse
@@ -21,9 +22,19 @@ from starlette.responses import JSONResponse
 from auth.auth import verify_password, ACCESS_TOKEN_EXPIRE_MINUTES, create_access_token, get_password_hash, \
     get_current_user
 from database.models import UserApplication, AppRating, Movie, Watchlist, Notification, UserProfile, CollectionMovie, \
-    Collection, MovieStatus
+    Collection, MovieStatus, UserAnalytics, NotificationSummary
 from machine_learning.RecommendationEngine import RecommendationEngine
-from database.connection import get_db
+from machine_learning.MovieCatalog import SORT_KEYS, movie_catalog
+from machine_learning.diversity import DIVERSITY_POOL_FACTOR
+from machine_learning.user_recommendations import invalidate_user_recommendations, refresh_user_recommendations
+from api.analytics import get_user_analytics, record_rating_change, record_watchlist_change
+from api.compression import CompressionMiddleware
+from api.notification_broker import notification_broker, sse_frame, summary_payload
+from api.notifications import DAILY_RECOMMENDATIONS, NOTIFICATION_PAGE_SIZE, MAX_NOTIFICATION_PAGE_SIZE, \
+    add_notification, delete_notifications, get_notification_summary, list_notifications, mark_notifications_read
+from api.http_cache import catalog_etag, is_not_modified, not_modified_response, cache_headers
+from api.image_cache import ImageCache, ImageUnavailable, IMAGE_SIZES, is_valid_poster_path, media_type_for
+from database.connection import get_db, get_read_db, ReadSessionLocal, SessionLocal
 from sqlalchemy.orm import Session
 from groq import Groq
 
@@ -46,7 +57,8 @@ logger = logging.getLogger(__name__)
 app = FastAPI(
     title="Movie Recommendation API",
     description="API pentru recomandarea filmelor",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=ORJSONResponse
 )
 
 
@@ -58,6 +70,22 @@ app.add_middleware(
     allow_headers=["*"],
     expose_headers=["*"]
 )
+app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+image_cache = ImageCache()
+
+SSE_HEARTBEAT_SECONDS = 20
+
+
+@app.on_event("startup")
+async def start_notification_broker():
+    await notification_broker.start()
+
+
+@app.on_event("shutdown")
+async def stop_notification_broker():
+    await notification_broker.stop()
+
 
 class ChatQuestionRequest(BaseModel):
     movie_id: int
@@ -70,9 +98,14 @@ class ChatResponse(BaseModel):
 class MovieRecommendationRequest(BaseModel):
     method: str = "hybrid"
     limit: int = 10
+    diversity: float = 0.0  # 0 = ranked by score only, 1 = maximally diverse (MMR)
 
 class PersonalizedRecommendationRequest(BaseModel):
     limit: int = 10
+    diversity: float = 0.0
+
+class MovieBatchRequest(BaseModel):
+    movie_ids: List[int]
 
 class SearchRequest(BaseModel):
     query: str
@@ -137,6 +170,16 @@ class ChangePasswordRequest(BaseModel):
 
 
 def get_recommendation_engine():
+    # Catalog and recommendation reads go to a read replica when one is configured and caught up
+    engine = RecommendationEngine(ReadSessionLocal())
+    try:
+        yield engine
+    finally:
+        engine.close()
+
+
+def get_primary_recommendation_engine():
+    # For responses that must reflect the user's own latest writes (watchlist, ratings)
     engine = RecommendationEngine()
     try:
         yield engine
@@ -179,50 +222,215 @@ async def root():
 
 @app.get("/movies/popular", response_model=List[RecommendationResponse], tags=["Movies"])
 async def get_popular_movies(
+        request: Request,
+        response: Response,
         limit: int = 10,
         engine: RecommendationEngine = Depends(get_recommendation_engine)
 ):
+    etag = catalog_etag(request, engine.session)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    response.headers.update(cache_headers(etag))
+
     popular_movies = engine.get_popular_movies(limit)
     return popular_movies
 
 
+MAX_ALL_MOVIES_LIMIT = 500
+
+
+@app.get("/movies/all", response_model=List[MovieResponse], tags=["Movies"])
+async def get_all_movies(
+        request: Request,
+        limit: int = Query(100, ge=1, le=MAX_ALL_MOVIES_LIMIT),
+        skip: int = Query(0, ge=0),
+        sort_by: str = "popularity",
+        engine: RecommendationEngine = Depends(get_recommendation_engine)
+):
+    if sort_by not in SORT_KEYS:
+        raise HTTPException(status_code=400, detail=f"sort_by must be one of: {', '.join(SORT_KEYS)}")
+
+    etag = catalog_etag(request, engine.session)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    try:
+        # Served from the in-memory catalogue; rows are plain dicts, no extra Pydantic validation
+        movies = [movie.to_dict() for movie in engine.get_catalog().page(sort_by, skip, limit)]
+        return ORJSONResponse(movies, headers=cache_headers(etag))
+
+    except Exception as e:
+        logger.error(f"Error getting all movies: {e}")
+        raise HTTPException(status_code=500, detail="Error retrieving movies")
+
+
+MAX_BROWSE_LIMIT = 100
+
+
+@app.get("/movies/browse", tags=["Movies"])
+async def browse_movies(
+        request: Request,
+        genres: Optional[List[str]] = Query(None),
+        genre_match: str = "any",
+        year_min: Optional[int] = None,
+        year_max: Optional[int] = None,
+        min_rating: Optional[float] = None,
+        min_votes: Optional[int] = None,
+        sort_by: str = "popularity",
+        skip: int = 0,
+        limit: int = 20,
+        db: Session = Depends(get_read_db)
+):
+    if genre_match not in ("any", "all"):
+        raise HTTPException(status_code=400, detail="genre_match must be 'any' or 'all'")
+    if limit < 1 or limit > MAX_BROWSE_LIMIT or skip < 0:
+        raise HTTPException(status_code=400, detail=f"limit must be between 1 and {MAX_BROWSE_LIMIT}")
+
+    etag = catalog_etag(request, db)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
+    try:
+        result = movie_catalog.get(db.connection()).browse(
+            genres=genres,
+            match_all=genre_match == "all",
+            year_min=year_min,
+            year_max=year_max,
+            min_rating=min_rating,
+            min_votes=min_votes,
+            sort_by=sort_by,
+            skip=skip,
+            limit=limit
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return ORJSONResponse(result, headers=cache_headers(etag))
+
+
 @app.get("/movies/{movie_id}", response_model=MovieResponse, tags=["Movies"])
-async def get_movie(movie_id: int, engine: RecommendationEngine = Depends(get_recommendation_engine)):
+async def get_movie(
+        movie_id: int,
+        request: Request,
+        response: Response,
+        engine: RecommendationEngine = Depends(get_recommendation_engine)
+):
+    etag = catalog_etag(request, engine.session)
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+
     movie = engine.get_movie_details(movie_id)
     if not movie:
         raise HTTPException(status_code=404, detail="Film not found")
+
+    response.headers.update(cache_headers(etag))
     return movie
 
 
-@app.post("/movies/{movie_id}/recommendations", response_model=List[RecommendationResponse], tags=["Recommendations"])
-async def get_movie_recommendations(
-        movie_id: int,
-        request: MovieRecommendationRequest = MovieRecommendationRequest(),
+@app.get("/images/{size}/{poster_path:path}", tags=["Images"])
+def get_image(size: str, poster_path: str, request: Request):
+    poster_path = f"/{poster_path.lstrip('/')}"
+    if size not in IMAGE_SIZES or not is_valid_poster_path(poster_path):
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    try:
+        image = image_cache.get(size, poster_path)
+    except ImageUnavailable:
+        # A transient origin failure must not be cached by browsers or CDNs as "image does not exist"
+        raise HTTPException(status_code=502, detail="Image origin unavailable",
+                            headers={"Cache-Control": "no-store", "Retry-After": "30"})
+    if not image:
+        raise HTTPException(status_code=404, detail="Image not found")
+
+    data, digest = image
+    headers = {
+        "ETag": f'"{digest}"',
+        "Cache-Control": "public, max-age=31536000, immutable"
+    }
+
+    if is_not_modified(request, headers["ETag"]):
+        return Response(status_code=304, headers=headers)
+
+    return Response(content=data, media_type=media_type_for(poster_path), headers=headers)
+
+
+MAX_BATCH_SIZE = 100
+
+
+@app.post("/movies/batch", response_model=List[MovieResponse], tags=["Movies"])
+async def get_movies_batch(
+        request: MovieBatchRequest,
         engine: RecommendationEngine = Depends(get_recommendation_engine)
 ):
+    if len(request.movie_ids) > MAX_BATCH_SIZE:
+        raise HTTPException(status_code=400, detail=f"At most {MAX_BATCH_SIZE} movie ids per request")
+
+    movies = engine.get_movies_details(request.movie_ids)
+    return ORJSONResponse(movies)
+
+
+def validate_diversity(diversity: float):
+    if not 0 <= diversity <= 1:
+        raise HTTPException(status_code=400, detail="diversity must be between 0 and 1")
+
+
+def compute_movie_recommendations(engine: RecommendationEngine, movie_id: int, method: str, limit: int,
+                                  diversity: float = 0.0):
+    validate_diversity(diversity)
     movie = engine.get_movie_details(movie_id)
     if not movie:
         raise HTTPException(status_code=404, detail="Film not found")
 
-    if request.method == "hybrid":
-        recommendations = engine.hybrid_recommendations(movie_id, request.limit)
-    elif request.method == "collaborative":
-        recommendations = engine.collaborative_filtering_recommendations(movie_id, request.limit)
-    elif request.method == "content_based":
-        recommendations = engine.content_based_recommendations(movie_id, request.limit)
+    pool = limit * DIVERSITY_POOL_FACTOR if diversity > 0 else limit
+    if method == "hybrid":
+        return engine.hybrid_recommendations(movie_id, limit, diversity=diversity)
+    elif method == "collaborative":
+        recommendations = engine.collaborative_filtering_recommendations(movie_id, pool)
+    elif method == "content_based":
+        recommendations = engine.content_based_recommendations(movie_id, pool)
     else:
         raise HTTPException(status_code=400, detail="Invalid recommendation method")
 
+    return engine.diversify(recommendations, limit, diversity, 'similarity_score')
+
+
+@app.get("/movies/{movie_id}/recommendations", response_model=List[RecommendationResponse], tags=["Recommendations"])
+async def get_movie_recommendations_cached(
+        movie_id: int,
+        http_request: Request,
+        response: Response,
+        method: str = "hybrid",
+        limit: int = 10,
+        diversity: float = 0.0,
+        engine: RecommendationEngine = Depends(get_recommendation_engine)
+):
+    etag = catalog_etag(http_request, engine.session)
+    if is_not_modified(http_request, etag):
+        return not_modified_response(etag)
+
+    recommendations = compute_movie_recommendations(engine, movie_id, method, limit, diversity)
+    response.headers.update(cache_headers(etag))
     return recommendations
 
 
+@app.post("/movies/{movie_id}/recommendations", response_model=List[RecommendationResponse], tags=["Recommendations"])
+async def get_movie_recommendations(
+        movie_id: int,
+        request: MovieRecommendationRequest = MovieRecommendationRequest(),
+        engine: RecommendationEngine = Depends(get_recommendation_engine)
+):
+    # Conditional requests only apply to the GET variant; a POST is never revalidated
+    return compute_movie_recommendations(engine, movie_id, request.method, request.limit, request.diversity)
+
+
 @app.post("/users/{user_id}/recommendations", response_model=List[RecommendationResponse], tags=["Recommendations"])
 async def get_personalized_recommendations(
         user_id: int,
         request: PersonalizedRecommendationRequest = PersonalizedRecommendationRequest(),
         engine: RecommendationEngine = Depends(get_recommendation_engine)
 ):
-    recommendations = engine.personalized_recommendations(user_id, request.limit)
+    validate_diversity(request.diversity)
+    recommendations = engine.personalized_recommendations(user_id, request.limit, request.diversity)
     return recommendations
 
 
@@ -309,7 +517,7 @@ async def get_user_ratings(
 
 
 @app.get("/stats", tags=["Stats"])
-async def get_system_stats(db: Session = Depends(get_db)):
+async def get_system_stats(db: Session = Depends(get_read_db)):
     try:
         from database.models import User, Rating
 
@@ -331,13 +539,17 @@ async def get_system_stats(db: Session = Depends(get_db)):
 
 @app.exception_handler(HTTPException)
 async def http_exception_handler(request, exc):
-    return {"error": exc.detail, "status_code": exc.status_code}
+    return JSONResponse(
+        status_code=exc.status_code,
+        content={"error": exc.detail, "status_code": exc.status_code},
+        headers=getattr(exc, "headers", None)
+    )
 
 
 @app.exception_handler(Exception)
 async def general_exception_handler(request, exc):
     logger.error(f"Unhandled exception: {exc}")
-    return {"error": "Internal server error", "status_code": 500}
+    return JSONResponse(status_code=500, content={"error": "Internal server error", "status_code": 500})
 
 
 @app.post("/auth/register", response_model=dict)
@@ -407,6 +619,7 @@ async def get_current_user_info(current_user: UserApplication = Depends(get_curr
 async def add_app_rating(
         movie_id: int,
         rating: float,
+        background_tasks: BackgroundTasks,
         review_text: str = None,
         current_user: UserApplication = Depends(get_current_user),
         db: Session = Depends(get_db)
@@ -416,20 +629,34 @@ async def add_app_rating(
         AppRating.movie_id == movie_id
     ).first()
 
+    # Update the analytics rollup in the same transaction, before the rating row changes
+    movie = db.query(Movie).filter(Movie.id == movie_id).first()
+    now = datetime.utcnow()
+    record_rating_change(
+        db, current_user.id, movie,
+        old_rating=existing_rating.rating if existing_rating else None,
+        old_timestamp=existing_rating.timestamp if existing_rating else None,
+        new_rating=rating,
+        new_timestamp=now
+    )
+
     if existing_rating:
         existing_rating.rating = rating
         existing_rating.review_text = review_text
-        existing_rating.timestamp = datetime.utcnow()
+        existing_rating.timestamp = now
     else:
         new_rating = AppRating(
             user_app_id=current_user.id,
             movie_id=movie_id,
             rating=rating,
-            review_text=review_text
+            review_text=review_text,
+            timestamp=now
         )
         db.add(new_rating)
 
+    invalidate_user_recommendations(db, current_user.id)
     db.commit()
+    background_tasks.add_task(refresh_user_recommendations, current_user.id)
     return {"message": "Rating saved successfully"}
 
 
@@ -450,25 +677,82 @@ async def get_my_ratings(
             "movie_id": movie.id,
             "movie_title": movie.title,
             "year": movie.year,
-            "rating": rating.rating,
+            "rating": float(rating.rating),
             "review": rating.review_text,
             "timestamp": rating.timestamp
         })
 
-    return result
+    return ORJSONResponse(result)
 
 
 # Notifications endpoints
 @app.get("/notifications", tags=["Notifications"])
 async def get_notifications(
+        limit: int = NOTIFICATION_PAGE_SIZE,
+        cursor: Optional[str] = None,
+        kind: Optional[str] = None,
+        unread_only: bool = False,
         current_user: UserApplication = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
-    notifications = db.query(Notification).filter(
-        Notification.user_id == current_user.id
-    ).order_by(Notification.created_at.desc()).all()
+    limit = max(1, min(limit, MAX_NOTIFICATION_PAGE_SIZE))
+    try:
+        page = list_notifications(db, current_user.id, cursor, limit, kind, unread_only)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return ORJSONResponse(page)
 
-    return notifications
+
+@app.get("/notifications/summary", tags=["Notifications"])
+async def get_notifications_summary(
+        current_user: UserApplication = Depends(get_current_user),
+        db: Session = Depends(get_db)
+):
+    summary = get_notification_summary(db, current_user.id)
+    return ORJSONResponse({
+        "unread_count": summary.unread_count or 0,
+        "last_recommendation_at": summary.last_recommendation_at
+    })
+
+
+@app.get("/notifications/stream", tags=["Notifications"])
+async def stream_notifications(request: Request, token: Optional[str] = None):
+    # EventSource cannot send headers, so the token may also come as a query parameter
+    authorization = request.headers.get("Authorization", "")
+    if authorization.startswith("Bearer "):
+        token = authorization[len("Bearer "):]
+    if not token:
+        raise HTTPException(status_code=401, detail="Not authenticated", headers={"WWW-Authenticate": "Bearer"})
+
+    # The session is only needed up front; the stream itself holds no connection
+    db = SessionLocal()
+    try:
+        user_id = (await get_current_user(token, db)).id
+        queue = notification_broker.subscribe(user_id)
+        try:
+            summary = summary_payload(get_notification_summary(db, user_id))
+        except Exception:
+            notification_broker.unsubscribe(user_id, queue)
+            raise
+    finally:
+        db.close()
+
+    async def event_stream():
+        try:
+            yield sse_frame('summary', summary)
+            while True:
+                try:
+                    yield await asyncio.wait_for(queue.get(), timeout=SSE_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield b": keep-alive\n\n"
+        finally:
+            notification_broker.unsubscribe(user_id, queue)
+
+    return StreamingResponse(event_stream(), media_type="text/event-stream", headers={
+        "Cache-Control": "no-cache",
+        "X-Accel-Buffering": "no"
+    })
 
 
 @app.post("/notifications/{notification_id}/mark-read", tags=["Notifications"])
@@ -477,15 +761,15 @@ async def mark_notification_read(
         current_user: UserApplication = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
-    notification = db.query(Notification).filter(
+    exists = db.query(Notification.id).filter(
         Notification.id == notification_id,
         Notification.user_id == current_user.id
     ).first()
 
-    if not notification:
+    if not exists:
         raise HTTPException(status_code=404, detail="Notification not found")
 
-    notification.read = True
+    mark_notifications_read(db, current_user.id, notification_id)
     db.commit()
     return {"message": "Notification marked as read"}
 
@@ -495,25 +779,21 @@ async def create_notification(
         title: str,
         message: str,
         type: str = "info",
+        metadata: str = None,
         current_user: UserApplication = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
-    notification = Notification(
-        user_id=current_user.id,
-        title=title,
-        message=message,
-        type=type
-    )
-
-    db.add(notification)
+    notification = add_notification(db, current_user.id, title, message, type, metadata)
     db.commit()
-    return {"message": "Notification created"}
+    db.refresh(notification)
+    return {"message": "Notification created", "id": notification.id}
 
 
 # Watchlist endpoints
 @app.post("/watchlist", tags=["Watchlist"])
 async def add_to_watchlist(
         movie_id: int,
+        background_tasks: BackgroundTasks,
         priority: int = 0,
         notes: str = None,
         current_user: UserApplication = Depends(get_current_user),
@@ -534,8 +814,11 @@ async def add_to_watchlist(
         notes=notes
     )
 
+    record_watchlist_change(db, current_user.id, 1)
     db.add(watchlist_item)
+    invalidate_user_recommendations(db, current_user.id)
     db.commit()
+    background_tasks.add_task(refresh_user_recommendations, current_user.id)
     return {"message": "Added to watchlist"}
 
 
@@ -550,7 +833,7 @@ async def get_watchlist(
         Watchlist.user_app_id == current_user.id
     ).all()
 
-    return [{
+    return ORJSONResponse([{
         "id": wl.id,
         "movie_id": movie.id,
         "title": movie.title,
@@ -560,12 +843,13 @@ async def get_watchlist(
         "added_at": wl.added_at,
         "priority": wl.priority,
         "notes": wl.notes
-    } for wl, movie in watchlist]
+    } for wl, movie in watchlist])
 
 
 @app.delete("/watchlist/{item_id}", tags=["Watchlist"])
 async def remove_from_watchlist(
         item_id: int,
+        background_tasks: BackgroundTasks,
         current_user: UserApplication = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
@@ -577,8 +861,11 @@ async def remove_from_watchlist(
     if not watchlist_item:
         raise HTTPException(status_code=404, detail="Item not found")
 
+    record_watchlist_change(db, current_user.id, -1)
     db.delete(watchlist_item)
+    invalidate_user_recommendations(db, current_user.id)
     db.commit()
+    background_tasks.add_task(refresh_user_recommendations, current_user.id)
     return {"message": "Removed from watchlist"}
 
 
@@ -605,22 +892,9 @@ async def update_watchlist_priority(
 @app.get("/watchlist/recommendations", tags=["Watchlist"])
 async def get_watchlist_recommendations(
         current_user: UserApplication = Depends(get_current_user),
-        db: Session = Depends(get_db),
-        engine: RecommendationEngine = Depends(get_recommendation_engine)
+        engine: RecommendationEngine = Depends(get_primary_recommendation_engine)
 ):
-    watchlist = db.query(Watchlist).filter(
-        Watchlist.user_app_id == current_user.id
-    ).all()
-
-    if not watchlist:
-        return []
-
-    recommendations = []
-    for item in watchlist[:5]:
-        movie_recs = engine.hybrid_recommendations(item.movie_id, 3)
-        recommendations.extend(movie_recs)
-
-    return recommendations
+    return engine.watchlist_recommendations(current_user.id)
 
 
 @app.get("/user/statistics", tags=["User"])
@@ -628,23 +902,7 @@ async def get_user_statistics(
         current_user: UserApplication = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
-    rating_count = db.query(AppRating).filter(
-        AppRating.user_app_id == current_user.id
-    ).count()
-
-    avg_rating = db.query(func.avg(AppRating.rating)).filter(
-        AppRating.user_app_id == current_user.id
-    ).scalar()
-
-    watchlist_count = db.query(Watchlist).filter(
-        Watchlist.user_app_id == current_user.id
-    ).count()
-
-    return {
-        "rating_count": rating_count,
-        "average_rating": avg_rating,
-        "watchlist_count": watchlist_count
-    }
+    return get_user_analytics(db, current_user.id).user_statistics()
 
 
 @app.post("/chatbot/movie-details", tags=["Chatbot"], response_model=ChatResponse)
@@ -786,7 +1044,8 @@ async def ask_movie_question(
 
     elif any(word in question_lower for word in ["watch", "similar", "recommend", "like"]):
         try:
-            similar_movies = engine.hybrid_recommendations(movie['id'], limit=3)
+            similar_movies = engine.rerank_for_user(current_user.id,
+                                                    engine.hybrid_recommendations(movie['id'], limit=10))
             if similar_movies:
                 titles = [m['title'] for m in similar_movies[:3]]
                 return ChatResponse(
@@ -928,55 +1187,6 @@ async def get_api_status():
 
 
 
-@app.get("/movies/all", response_model=List[MovieResponse], tags=["Movies"])
-async def get_all_movies(
-        limit: int = 100,
-        skip: int = 0,
-        sort_by: str = "popularity",
-        engine: RecommendationEngine = Depends(get_recommendation_engine)
-):
-    try:
-        query = text("""
-            SELECT m.id as movie_id, m.title, m.year, m.genres, m.overview, m.poster_path,
-                   ms.avg_rating, ms.rating_count
-            FROM movies m
-            LEFT JOIN movie_stats ms ON m.id = ms.movie_id
-            ORDER BY 
-                CASE WHEN :sort_by = 'title' THEN m.title END ASC,
-                CASE WHEN :sort_by = 'year' THEN m.year END DESC,
-                CASE WHEN :sort_by = 'rating' THEN ms.avg_rating END DESC,
-                CASE WHEN :sort_by = 'popularity' OR :sort_by = '' THEN 
-                    (ms.avg_rating * LOG(ms.rating_count + 1)) 
-                END DESC
-            LIMIT :limit OFFSET :skip
-        """)
-
-        results = engine.session.execute(query, {
-            "sort_by": sort_by,
-            "limit": limit,
-            "skip": skip
-        }).fetchall()
-
-        movies = []
-        for row in results:
-            movies.append({
-                'movie_id': row.movie_id,
-                'title': row.title,
-                'year': row.year,
-                'genres': row.genres,
-                'overview': row.overview,
-                'poster_path': row.poster_path,
-                'average_rating': row.avg_rating,
-                'rating_count': row.rating_count
-            })
-
-        return movies
-
-    except Exception as e:
-        logger.error(f"Error getting all movies: {e}")
-        raise HTTPException(status_code=500, detail="Error retrieving movies")
-
-
 router = APIRouter()
 
 
@@ -1037,76 +1247,6 @@ async def get_user_rating(
         }
 
 
-@app.post("/notifications", tags=["Notifications"])
-async def create_notification(
-        title: str,
-        message: str,
-        type: str = "info",
-        metadata: str = None,
-        current_user: UserApplication = Depends(get_current_user),
-        db: Session = Depends(get_db)
-):
-    notification = Notification(
-        user_id=current_user.id,
-        title=title,
-        message=message,
-        type=type,
-        metadata=metadata
-    )
-
-    db.add(notification)
-    db.commit()
-    db.refresh(notification)
-    return {"message": "Notification created", "id": notification.id}
-
-
-@app.post("/notifications", tags=["Notifications"])
-async def create_notification(
-        title: str,
-        message: str,
-        type: str = "info",
-        metadata: str = None,
-        current_user: UserApplication = Depends(get_current_user),
-        db: Session = Depends(get_db)
-):
-    notification = Notification(
-        user_id=current_user.id,
-        title=title,
-        message=message,
-        type=type,
-        notification_metadata=metadata
-    )
-
-    db.add(notification)
-    db.commit()
-    db.refresh(notification)
-    return {"message": "Notification created", "id": notification.id}
-
-
-@app.get("/notifications", tags=["Notifications"])
-async def get_notifications(
-        current_user: UserApplication = Depends(get_current_user),
-        db: Session = Depends(get_db)
-):
-    notifications = db.query(Notification).filter(
-        Notification.user_id == current_user.id
-    ).order_by(Notification.created_at.desc()).all()
-
-    result = []
-    for notification in notifications:
-        result.append({
-            "id": notification.id,
-            "title": notification.title,
-            "message": notification.message,
-            "type": notification.type,
-            "read": notification.read,
-            "created_at": notification.created_at,
-            "metadata": notification.notification_metadata
-        })
-
-    return result
-
-
 @app.get("/notifications/check-daily", tags=["Notifications"])
 async def check_daily_notifications(
         date: str,
@@ -1120,7 +1260,7 @@ async def check_daily_notifications(
         Notification.user_id == current_user.id,
         Notification.created_at >= today_start,
         Notification.created_at < today_end,
-        Notification.notification_metadata.like('%"type":"daily_recommendations"%')
+        Notification.kind == DAILY_RECOMMENDATIONS
     ).first()
 
     return {"sent": existing is not None}
@@ -1131,7 +1271,8 @@ async def get_daily_recommendations(
         seed: str,
         limit: int = 3,
         current_user: UserApplication = Depends(get_current_user),
-        engine: RecommendationEngine = Depends(get_recommendation_engine)
+        db: Session = Depends(get_db),
+        engine: RecommendationEngine = Depends(get_primary_recommendation_engine)
 ):
 
     recommendations = []
@@ -1141,7 +1282,8 @@ async def get_daily_recommendations(
         recommendations.extend(personal_recs[:1])
 
     if len(recommendations) < limit:
-        popular_recs = engine.get_popular_movies(limit * 2)
+        popular_recs = engine.rerank_for_user(current_user.id, engine.get_popular_movies(limit * 2),
+                                              score_key='popularity_score')
         popular_recs = [r for r in popular_recs if not any(rec['movie_id'] == r['movie_id'] for rec in recommendations)]
         recommendations.extend(popular_recs[:limit - len(recommendations)])
 
@@ -1176,65 +1318,24 @@ async def get_user_profile(user_id: int, db: Session):
 
 async def search_by_genre(genre: str, limit: int, engine: RecommendationEngine):
     try:
-        return engine.search_movies(genre, limit)
+        return engine.search_movies_by_genre(genre, limit)
     except:
         return []
 
 
 @app.get("/notifications/scheduled", tags=["Notifications"])
-async def check_and_generate_scheduled_notifications(
+async def check_scheduled_notifications(
         current_user: UserApplication = Depends(get_current_user),
-        db: Session = Depends(get_db),
-        engine: RecommendationEngine = Depends(get_recommendation_engine)
+        db: Session = Depends(get_db)
 ):
-    try:
-        last_notification = db.query(Notification) \
-            .filter(Notification.user_id == current_user.id) \
-            .order_by(Notification.created_at.desc()) \
-            .first()
-
-        should_generate = True
-        if last_notification:
-            now = datetime.utcnow()
-            last_notification_time = last_notification.created_at
-            time_diff = now - last_notification_time
-
-            if time_diff.total_seconds() < 30 * 60:
-                should_generate = False
-
-        if should_generate:
-            recommendations = engine.personalized_recommendations(current_user.id, 3)
-
-            if not recommendations:
-                recommendations = engine.get_popular_movies(3)
-
-            metadata = {
-                "type": "daily_recommendations",
-                "movies": [
-                    {"id": rec["movie_id"], "title": rec["title"]}
-                    for rec in recommendations[:3]
-                ]
-            }
-
-            notification = Notification(
-                user_id=current_user.id,
-                title="New Movie Recommendations",
-                message="We've found some movies you might enjoy!",
-                type="info",
-                notification_metadata=json.dumps(metadata)
-            )
-
-            db.add(notification)
-            db.commit()
-            db.refresh(notification)
-
-            return {"success": True, "notification_generated": True, "notification_id": notification.id}
-
-        return {"success": True, "notification_generated": False, "message": "Too soon for a new notification"}
-
-    except Exception as e:
-        logger.error(f"Error checking/generating scheduled notifications: {e}")
-        raise HTTPException(status_code=500, detail=f"Failed to process scheduled notifications: {str(e)}")
+    # Daily recommendations are generated in bulk by scripts/generate_daily_notifications.py,
+    # not on the request path; this only reports when the last batch reached the user
+    summary = get_notification_summary(db, current_user.id)
+    return {
+        "success": True,
+        "notification_generated": False,
+        "last_recommendation_at": summary.last_recommendation_at
+    }
 
 
 @app.get("/test-notification", tags=["Notifications"])
@@ -1254,15 +1355,13 @@ async def create_test_notification(
             ]
         }
 
-        notification = Notification(
-            user_id=current_user.id,
+        notification = add_notification(
+            db, current_user.id,
             title="Film Recommendations",
             message="Here are some movie recommendations for you!",
             type="info",
-            notification_metadata=json.dumps(metadata)
+            metadata=json.dumps(metadata)
         )
-
-        db.add(notification)
         db.commit()
         db.refresh(notification)
 
@@ -1272,64 +1371,15 @@ async def create_test_notification(
         raise HTTPException(status_code=500, detail=f"Failed to create notification: {str(e)}")
 
 
-@router.delete("/notifications/{notification_id}", tags=["Notifications"])
-async def delete_notification(
-        notification_id: int,
-        current_user: UserApplication = Depends(get_current_user),
-        db: Session = Depends(get_db)
-):
-
-    notification = db.query(Notification).filter(
-        Notification.id == notification_id,
-        Notification.user_id == current_user.id
-    ).first()
-
-    if not notification:
-        raise HTTPException(status_code=404, detail="Notification not found")
-
-    db.delete(notification)
-    db.commit()
-
-    return {"message": "Notification deleted successfully"}
-
-
-@router.delete("/notifications", tags=["Notifications"])
-async def delete_all_notifications(
-        current_user: UserApplication = Depends(get_current_user),
-        db: Session = Depends(get_db)
-):
-    notifications = db.query(Notification).filter(
-        Notification.user_id == current_user.id
-    ).all()
-
-    count = len(notifications)
-
-    for notification in notifications:
-        db.delete(notification)
-
-    db.commit()
-
-    return {"message": f"{count} notifications deleted successfully"}
-
-
-@router.delete("/notifications/read", tags=["Notifications"])
+@app.delete("/notifications/read", tags=["Notifications"])
 async def delete_read_notifications(
         current_user: UserApplication = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
-    read_notifications = db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.read == True
-    ).all()
-
-    count = len(read_notifications)
-
-    for notification in read_notifications:
-        db.delete(notification)
-
+    result = delete_notifications(db, current_user.id, read_only=True)
     db.commit()
 
-    return {"message": f"{count} read notifications deleted successfully"}
+    return {"message": f"{result} read notifications deleted successfully"}
 
 
 @app.delete("/notifications/{notification_id}", tags=["Notifications"])
@@ -1338,15 +1388,11 @@ async def delete_notification(
         current_user: UserApplication = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
-    notification = db.query(Notification).filter(
-        Notification.id == notification_id,
-        Notification.user_id == current_user.id
-    ).first()
-
-    if not notification:
+    result = delete_notifications(db, current_user.id, notification_id)
+    if not result:
+        db.rollback()
         raise HTTPException(status_code=404, detail="Notification not found")
 
-    db.delete(notification)
     db.commit()
 
     return {"message": "Notification deleted successfully"}
@@ -1357,41 +1403,18 @@ async def delete_all_notifications(
         current_user: UserApplication = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
-
-    result = db.query(Notification).filter(
-        Notification.user_id == current_user.id
-    ).delete(synchronize_session=False)
-
+    result = delete_notifications(db, current_user.id)
     db.commit()
 
     return {"message": f"{result} notifications deleted successfully"}
 
 
-@app.delete("/notifications/read", tags=["Notifications"])
-async def delete_read_notifications(
-        current_user: UserApplication = Depends(get_current_user),
-        db: Session = Depends(get_db)
-):
-    result = db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.read == True
-    ).delete(synchronize_session=False)
-
-    db.commit()
-
-    return {"message": f"{result} read notifications deleted successfully"}
-
-
 @app.post("/notifications/mark-all-read", tags=["Notifications"])
 async def mark_all_notifications_read(
         current_user: UserApplication = Depends(get_current_user),
         db: Session = Depends(get_db)
 ):
-    result = db.query(Notification).filter(
-        Notification.user_id == current_user.id,
-        Notification.read == False
-    ).update({"read": True}, synchronize_session=False)
-
+    result = mark_notifications_read(db, current_user.id)
     db.commit()
 
     return {"message": f"{result} notifications marked as read"}
@@ -1512,6 +1535,16 @@ async def delete_account(
         ).delete(synchronize_session=False)
         logger.info(f"Deleted {deleted_profile} user profiles")
 
+        db.query(UserAnalytics).filter(
+            UserAnalytics.user_id == user_id
+        ).delete(synchronize_session=False)
+
+        db.query(NotificationSummary).filter(
+            NotificationSummary.user_id == user_id
+        ).delete(synchronize_session=False)
+
+        invalidate_user_recommendations(db, user_id)
+
         deleted_user = db.query(UserApplication).filter(
             UserApplication.id == user_id
         ).delete(synchronize_session=False)
@@ -1545,23 +1578,7 @@ async def get_rating_distribution(
         db: Session = Depends(get_db)
 ):
     try:
-        ratings = db.query(AppRating).filter(
-            AppRating.user_app_id == current_user.id
-        ).all()
-
-        distribution = {}
-        for rating in ratings:
-            rating_value = float(rating.rating)
-            distribution[rating_value] = distribution.get(rating_value, 0) + 1
-
-        result = []
-        for rating_value in sorted(distribution.keys()):
-            result.append({
-                "rating": rating_value,
-                "count": distribution[rating_value]
-            })
-
-        return result
+        return get_user_analytics(db, current_user.id).rating_distribution()
     except Exception as e:
         logger.error(f"Error getting rating distribution: {e}")
         raise HTTPException(status_code=500, detail="Failed to get rating distribution")
@@ -1572,32 +1589,7 @@ async def get_genre_trends(
         db: Session = Depends(get_db)
 ):
     try:
-        ratings = db.query(AppRating, Movie).join(
-            Movie, AppRating.movie_id == Movie.id
-        ).filter(
-            AppRating.user_app_id == current_user.id
-        ).order_by(AppRating.timestamp).all()
-
-        genre_trends = {}
-        for rating, movie in ratings:
-            if movie.genres:
-                month_key = rating.timestamp.strftime("%Y-%m")
-                if month_key not in genre_trends:
-                    genre_trends[month_key] = {}
-
-                for genre in movie.genres.split('|'):
-                    if genre not in genre_trends[month_key]:
-                        genre_trends[month_key][genre] = 0
-                    genre_trends[month_key][genre] += 1
-
-        result = []
-        for month, genres in sorted(genre_trends.items()):
-            result.append({
-                "month": month,
-                "genres": genres
-            })
-
-        return result
+        return get_user_analytics(db, current_user.id).genre_trends()
     except Exception as e:
         logger.error(f"Error getting genre trends: {e}")
         raise HTTPException(status_code=500, detail="Failed to get genre trends")
@@ -1608,59 +1600,7 @@ async def get_watch_statistics(
         db: Session = Depends(get_db)
 ):
     try:
-        ratings = db.query(AppRating).filter(
-            AppRating.user_app_id == current_user.id
-        ).all()
-
-        if not ratings:
-            return {
-                "total_movies_rated": 0,
-                "average_rating": 0,
-                "highest_rated_genre": None,
-                "most_watched_year": None
-            }
-
-        total_ratings = len(ratings)
-        avg_rating = sum(r.rating for r in ratings) / total_ratings
-
-        genre_ratings = {}
-        year_counts = {}
-
-        for rating in ratings:
-            movie = db.query(Movie).filter(Movie.id == rating.movie_id).first()
-            if movie:
-                if movie.genres:
-                    for genre in movie.genres.split('|'):
-                        if genre not in genre_ratings:
-                            genre_ratings[genre] = []
-                        genre_ratings[genre].append(rating.rating)
-
-                if movie.year:
-                    year_counts[movie.year] = year_counts.get(movie.year, 0) + 1
-
-        highest_rated_genre = None
-        highest_avg = 0
-        for genre, ratings_list in genre_ratings.items():
-            avg = sum(ratings_list) / len(ratings_list)
-            if avg > highest_avg:
-                highest_avg = avg
-                highest_rated_genre = genre
-
-        most_watched_year = max(year_counts.items(), key=lambda x: x[1])[0] if year_counts else None
-
-        return {
-            "total_movies_rated": total_ratings,
-            "average_rating": round(avg_rating, 2),
-            "highest_rated_genre": highest_rated_genre,
-            "most_watched_year": most_watched_year,
-            "genre_stats": {
-                genre: {
-                    "count": len(ratings_list),
-                    "average": round(sum(ratings_list) / len(ratings_list), 2)
-                }
-                for genre, ratings_list in genre_ratings.items()
-            }
-        }
+        return get_user_analytics(db, current_user.id).watch_statistics()
     except Exception as e:
         logger.error(f"Error getting watch statistics: {e}")
         raise HTTPException(status_code=500, detail="Failed to get watch statistics")
@@ -0,0 +1,130 @@
+import zlib
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+MINIMUM_SIZE = 1024
+# Imaginile sunt deja comprimate, iar SSE trebuie trimis imediat, fără buffer
+EXCLUDED_CONTENT_TYPES = ('image/', 'text/event-stream')
+
+
+class _GzipCompressor:
+    def __init__(self, level: int):
+        self.compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.compress(data)
+
+    def finish(self) -> bytes:
+        return self.compressor.flush()
+
+
+class _BrotliCompressor:
+    def __init__(self, quality: int):
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def compress(self, data: bytes) -> bytes:
+        return self.compressor.process(data)
+
+    def finish(self) -> bytes:
+        return self.compressor.finish()
+
+
+def select_encoding(accept_encoding: str):
+    encodings = {part.split(';')[0].strip().lower() for part in accept_encoding.split(',')}
+    if brotli is not None and 'br' in encodings:
+        return 'br'
+    if 'gzip' in encodings:
+        return 'gzip'
+    return None
+
+
+class CompressionMiddleware:
+    def __init__(self, app: ASGIApp, minimum_size: int = MINIMUM_SIZE,
+                 gzip_level: int = 6, brotli_quality: int = 4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope['type'] == 'http':
+            encoding = select_encoding(Headers(scope=scope).get('accept-encoding', ''))
+            if encoding:
+                responder = CompressionResponder(self, encoding, send)
+                await self.app(scope, receive, responder.send)
+                return
+        await self.app(scope, receive, send)
+
+
+class CompressionResponder:
+    def __init__(self, middleware: CompressionMiddleware, encoding: str, send: Send):
+        self.middleware = middleware
+        self.encoding = encoding
+        self._send = send
+        self.initial_message: Message = {}
+        self.started = False
+        self.passthrough = False
+        self.compressor = None
+
+    def _create_compressor(self):
+        if self.encoding == 'br':
+            return _BrotliCompressor(self.middleware.brotli_quality)
+        return _GzipCompressor(self.middleware.gzip_level)
+
+    async def send(self, message: Message):
+        if message['type'] == 'http.response.start':
+            self.initial_message = message
+            headers = Headers(raw=message['headers'])
+            content_type = headers.get('content-type', '')
+            self.passthrough = 'content-encoding' in headers or content_type.startswith(EXCLUDED_CONTENT_TYPES)
+            return
+
+        if message['type'] != 'http.response.body':
+            await self._send(message)
+            return
+
+        body = message.get('body', b'')
+        more_body = message.get('more_body', False)
+
+        if not self.started:
+            self.started = True
+
+            if self.passthrough or (len(body) < self.middleware.minimum_size and not more_body):
+                self.passthrough = True
+                await self._send(self.initial_message)
+                await self._send(message)
+                return
+
+            self.compressor = self._create_compressor()
+            headers = MutableHeaders(raw=self.initial_message['headers'])
+            headers['Content-Encoding'] = self.encoding
+            headers.add_vary_header('Accept-Encoding')
+            if 'etag' in headers and not headers['etag'].startswith('W/'):
+                # Corpul comprimat nu mai e identic octet cu octet
+                headers['ETag'] = f"W/{headers['etag']}"
+
+            compressed = self.compressor.compress(body)
+            if more_body:
+                del headers['Content-Length']
+            else:
+                compressed += self.compressor.finish()
+                headers['Content-Length'] = str(len(compressed))
+
+            await self._send(self.initial_message)
+            await self._send({'type': 'http.response.body', 'body': compressed, 'more_body': more_body})
+            return
+
+        if self.passthrough:
+            await self._send(message)
+            return
+
+        compressed = self.compressor.compress(body)
+        if not more_body:
+            compressed += self.compressor.finish()
+        await self._send({'type': 'http.response.body', 'body': compressed, 'more_body': more_body})
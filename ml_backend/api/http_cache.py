@@ -0,0 +1,43 @@
+import hashlib
+from fastapi import Request, Response
+
+from machine_learning.MovieCatalog import movie_catalog
+
+CATALOG_CACHE_CONTROL = "public, max-age=60, stale-while-revalidate=600"
+
+
+def build_etag(version: int, request: Request) -> str:
+    # ETag-ul depinde doar de versiunea datelor și de cerere, deci poate fi
+    # calculat înainte de orice interogare
+    key = hashlib.sha1(f"{request.url.path}?{request.url.query}".encode('utf-8'))
+    return f'W/"v{version}-{key.hexdigest()[:16]}"'
+
+
+def _opaque_tag(etag: str) -> str:
+    return etag[2:] if etag.startswith('W/') else etag
+
+
+def is_not_modified(request: Request, etag: str) -> bool:
+    if_none_match = request.headers.get('if-none-match')
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == '*':
+        return True
+
+    # If-None-Match folosește comparația slabă (RFC 9110, 13.1.2)
+    tags = {_opaque_tag(tag.strip()) for tag in if_none_match.split(',')}
+    return _opaque_tag(etag) in tags
+
+
+def cache_headers(etag: str, cache_control: str = CATALOG_CACHE_CONTROL) -> dict:
+    return {"ETag": etag, "Cache-Control": cache_control, "Vary": "Accept-Encoding"}
+
+
+def not_modified_response(etag: str, cache_control: str = CATALOG_CACHE_CONTROL) -> Response:
+    return Response(status_code=304, headers=cache_headers(etag, cache_control))
+
+
+def catalog_etag(request: Request, session) -> str:
+    # Versiunea snapshot-ului de catalog care servește răspunsul, nu o citire separată din data_version:
+    # snapshot-urile doar avansează, deci corpul răspunsului nu poate fi mai vechi decât ETag-ul
+    return build_etag(movie_catalog.get(session.connection()).version, request)
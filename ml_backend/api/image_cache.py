@@ -0,0 +1,221 @@
+import hashlib
+import io
+import logging
+import os
+import re
+import threading
+from contextlib import contextmanager
+from typing import Optional, Tuple
+
+import requests
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+logger = logging.getLogger(__name__)
+
+TMDB_IMAGE_BASE_URL = os.getenv('TMDB_IMAGE_ORIGIN_URL', 'https://image.tmdb.org/t/p')
+IMAGE_CACHE_DIR = os.getenv('IMAGE_CACHE_DIR', os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), '.image_cache'))
+IMAGE_CACHE_MAX_BYTES = int(os.getenv('IMAGE_CACHE_MAX_BYTES', str(512 * 1024 * 1024)))
+
+# Dimensiunile TMDB pentru postere; None înseamnă originalul
+IMAGE_SIZES = {
+    'w92': 92,
+    'w154': 154,
+    'w185': 185,
+    'w342': 342,
+    'w500': 500,
+    'w780': 780,
+    'original': None
+}
+
+POSTER_PATH_PATTERN = re.compile(r'^/[A-Za-z0-9_\-]+\.(jpg|jpeg|png|webp)$')
+MEDIA_TYPES = {'jpg': 'image/jpeg', 'jpeg': 'image/jpeg', 'png': 'image/png', 'webp': 'image/webp'}
+
+
+class ImageUnavailable(Exception):
+    # Originea nu a răspuns (timeout, eroare de rețea, 5xx) sau a trimis o imagine ilizibilă;
+    # spre deosebire de un 404, nu înseamnă că imaginea nu există
+    pass
+
+
+def is_valid_poster_path(poster_path: str) -> bool:
+    return bool(POSTER_PATH_PATTERN.match(poster_path))
+
+
+def media_type_for(poster_path: str) -> str:
+    return MEDIA_TYPES[poster_path.rsplit('.', 1)[-1].lower()]
+
+
+class ImageCache:
+    def __init__(self, directory: str = IMAGE_CACHE_DIR, max_bytes: int = IMAGE_CACHE_MAX_BYTES,
+                 origin_url: str = TMDB_IMAGE_BASE_URL):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.origin_url = origin_url
+        self.objects_dir = os.path.join(directory, 'objects')
+        self.refs_dir = os.path.join(directory, 'refs')
+        self.lock = threading.Lock()
+        # (dimensiune, poster) -> [lock, cereri care îl folosesc], pentru generarea o singură dată
+        self.inflight = {}
+        self.inflight_lock = threading.Lock()
+        self.http = requests.Session()
+
+        os.makedirs(self.objects_dir, exist_ok=True)
+        os.makedirs(self.refs_dir, exist_ok=True)
+        self.total_bytes = sum(size for _, _, size in self._iter_objects())
+
+    def _object_path(self, digest: str) -> str:
+        return os.path.join(self.objects_dir, digest[:2], digest)
+
+    def _ref_path(self, size: str, poster_path: str) -> str:
+        key = hashlib.sha1(f"{size}{poster_path}".encode('utf-8')).hexdigest()
+        return os.path.join(self.refs_dir, key[:2], key)
+
+    def _iter_objects(self):
+        for root, _, files in os.walk(self.objects_dir):
+            for name in files:
+                path = os.path.join(root, name)
+                try:
+                    stat = os.stat(path)
+                except OSError:
+                    continue
+                yield path, stat.st_mtime, stat.st_size
+
+    def _write_atomic(self, path: str, data: bytes):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+
+    def _lookup(self, size: str, poster_path: str) -> Optional[Tuple[bytes, str]]:
+        try:
+            with open(self._ref_path(size, poster_path), 'r') as f:
+                digest = f.read().strip()
+            object_path = self._object_path(digest)
+            with open(object_path, 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+
+        # mtime ține loc de "ultima accesare" pentru evacuarea LRU
+        try:
+            os.utime(object_path)
+        except OSError:
+            pass
+        return data, digest
+
+    def _store(self, size: str, poster_path: str, data: bytes) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        object_path = self._object_path(digest)
+
+        with self.lock:
+            if not os.path.exists(object_path):
+                self._write_atomic(object_path, data)
+                self.total_bytes += len(data)
+            self._write_atomic(self._ref_path(size, poster_path), digest.encode('ascii'))
+
+            if self.total_bytes > self.max_bytes:
+                self._evict()
+
+        return digest
+
+    def _evict(self):
+        target = int(self.max_bytes * 0.9)
+        for path, _, size in sorted(self._iter_objects(), key=lambda item: item[1]):
+            if self.total_bytes <= target:
+                break
+            try:
+                os.remove(path)
+                self.total_bytes -= size
+            except OSError:
+                pass
+
+    def _fetch(self, size: str, poster_path: str) -> Optional[bytes]:
+        # None doar pentru un 404 de la origine; orice altă eroare ridică ImageUnavailable
+        try:
+            response = self.http.get(f"{self.origin_url}/{size}{poster_path}", timeout=10)
+            if response.status_code == 404:
+                return None
+            response.raise_for_status()
+            return response.content
+        except requests.RequestException as e:
+            logger.error(f"Error fetching image {size}{poster_path}: {e}")
+            raise ImageUnavailable(str(e)) from e
+
+    def _thumbnail(self, original: bytes, width: int, poster_path: str) -> bytes:
+        try:
+            with Image.open(io.BytesIO(original)) as image:
+                if image.width <= width:
+                    return original
+                height = round(image.height * width / image.width)
+
+                # Formatul urmează extensia, pentru că media type-ul răspunsului se alege după ea
+                image_format = 'PNG' if poster_path.endswith('.png') else 'WEBP' if poster_path.endswith('.webp') else 'JPEG'
+                has_alpha = image.mode in ('RGBA', 'LA', 'PA') or 'transparency' in image.info
+                if has_alpha and image_format != 'JPEG':
+                    resized = image.convert('RGBA').resize((width, height), Image.LANCZOS)
+                elif has_alpha:
+                    # JPEG nu are canal alfa: fundal alb în loc de negru
+                    rgba = image.convert('RGBA')
+                    flattened = Image.new('RGB', rgba.size, (255, 255, 255))
+                    flattened.paste(rgba, mask=rgba.getchannel('A'))
+                    resized = flattened.resize((width, height), Image.LANCZOS)
+                else:
+                    resized = image.convert('RGB').resize((width, height), Image.LANCZOS)
+
+                output = io.BytesIO()
+                resized.save(output, format=image_format, quality=85, optimize=True)
+                return output.getvalue()
+        except Exception as e:
+            logger.error(f"Error resizing image {poster_path}: {e}")
+            raise ImageUnavailable(str(e)) from e
+
+    @contextmanager
+    def _single_flight(self, size: str, poster_path: str):
+        # Cererile concurente pentru aceeași imagine așteaptă prima generare în loc să o repete
+        key = (size, poster_path)
+        with self.inflight_lock:
+            entry = self.inflight.setdefault(key, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self.inflight_lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self.inflight[key]
+
+    def _fetch_once(self, size: str, poster_path: str) -> Optional[Tuple[bytes, str]]:
+        with self._single_flight(size, poster_path):
+            cached = self._lookup(size, poster_path)
+            if cached:
+                return cached
+            data = self._fetch(size, poster_path)
+            return (data, self._store(size, poster_path, data)) if data else None
+
+    def get(self, size: str, poster_path: str) -> Optional[Tuple[bytes, str]]:
+        # None: imaginea nu există la origine; ImageUnavailable: originea nu poate fi folosită acum
+        cached = self._lookup(size, poster_path)
+        if cached:
+            return cached
+
+        # Fără Pillow păstrăm doar ce livrează TMDB pentru dimensiunea cerută
+        if Image is None or IMAGE_SIZES[size] is None:
+            return self._fetch_once(size, poster_path)
+
+        # Doar dimensiunea cerută se generează din original; celelalte la prima lor cerere
+        with self._single_flight(size, poster_path):
+            cached = self._lookup(size, poster_path)
+            if cached:
+                return cached
+
+            original = self._fetch_once('original', poster_path)
+            if not original:
+                return None
+            data = self._thumbnail(original[0], IMAGE_SIZES[size], poster_path)
+            return data, self._store(size, poster_path, data)
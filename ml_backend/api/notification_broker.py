@@ -0,0 +1,249 @@
+import asyncio
+import atexit
+import logging
+import os
+import threading
+from collections import defaultdict
+from queue import Empty, Full, Queue
+from typing import Dict, Optional, Set
+
+import orjson
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from api.notifications import serialize_notification
+from database.models import Notification, NotificationSummary
+
+try:
+    import redis
+    import redis.asyncio as redis_asyncio
+except ImportError:
+    redis = None
+    redis_asyncio = None
+
+logger = logging.getLogger(__name__)
+
+REDIS_URL = os.getenv("REDIS_URL")
+CHANNEL_PREFIX = "notifications:"
+SUBSCRIBER_QUEUE_SIZE = 100
+OUTBOX_KEY = 'notification_outbox'
+# Cadrele așteaptă aici firul care publică în Redis, nu în hook-ul after_commit al cererii
+PUBLISH_QUEUE_SIZE = 10000
+PUBLISH_BATCH_SIZE = 500
+REDIS_TIMEOUT = 2.0
+
+
+def sse_frame(event_name: str, data) -> bytes:
+    return b"event: " + event_name.encode() + b"\ndata: " + orjson.dumps(data) + b"\n\n"
+
+
+def summary_payload(summary: NotificationSummary) -> Dict:
+    return {
+        "unread_count": summary.unread_count or 0,
+        "last_recommendation_at": summary.last_recommendation_at
+    }
+
+
+class NotificationBroker:
+    # Pub/sub in proces: fiecare conexiune SSE are o coadă asyncio, indexată după user_id
+    shared = False  # True dacă publish() ajunge și la abonații din alte procese
+
+    def __init__(self):
+        self.subscribers: Dict[int, Set[asyncio.Queue]] = defaultdict(set)
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.lock = threading.Lock()
+
+    async def start(self):
+        self.loop = asyncio.get_running_loop()
+
+    async def stop(self):
+        pass
+
+    def subscribe(self, user_id: int) -> asyncio.Queue:
+        self.loop = asyncio.get_running_loop()
+        queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self.lock:
+            self.subscribers[user_id].add(queue)
+        return queue
+
+    def unsubscribe(self, user_id: int, queue: asyncio.Queue):
+        with self.lock:
+            queues = self.subscribers.get(user_id)
+            if queues is not None:
+                queues.discard(queue)
+                if not queues:
+                    del self.subscribers[user_id]
+
+    def subscriber_count(self) -> int:
+        with self.lock:
+            return sum(len(queues) for queues in self.subscribers.values())
+
+    def publish(self, user_id: int, frame: bytes):
+        self.deliver(user_id, frame)
+
+    def deliver(self, user_id: int, frame: bytes):
+        # Poate fi apelat din orice fir (commit dintr-un endpoint sync, job programat)
+        with self.lock:
+            queues = list(self.subscribers.get(user_id, ()))
+        if not queues or self.loop is None or self.loop.is_closed():
+            return
+        self.loop.call_soon_threadsafe(self._enqueue, user_id, queues, frame)
+
+    @staticmethod
+    def _enqueue(user_id: int, queues, frame: bytes):
+        for queue in queues:
+            try:
+                queue.put_nowait(frame)
+            except asyncio.QueueFull:
+                logger.warning(f"Notification stream for user {user_id} is not keeping up, dropping event")
+
+
+class RedisNotificationBroker(NotificationBroker):
+    # Publicarea trece prin Redis, ca fiecare worker să livreze abonaților lui locali
+    shared = True
+
+    def __init__(self, url: str):
+        super().__init__()
+        self.url = url
+        self.client = redis.Redis.from_url(url, socket_timeout=REDIS_TIMEOUT, socket_connect_timeout=REDIS_TIMEOUT)
+        self.listener: Optional[asyncio.Task] = None
+        self.outgoing: Queue = Queue(maxsize=PUBLISH_QUEUE_SIZE)
+        self.publisher: Optional[threading.Thread] = None
+
+    async def start(self):
+        await super().start()
+        self.listener = asyncio.create_task(self._listen())
+
+    async def stop(self):
+        if self.listener is not None:
+            self.listener.cancel()
+            try:
+                await self.listener
+            except asyncio.CancelledError:
+                pass
+            self.listener = None
+        self.close()
+
+    def publish(self, user_id: int, frame: bytes):
+        # Apelat din after_commit: doar pune cadrul în coadă, fără drum dus-întors până la Redis
+        self._start_publisher()
+        try:
+            self.outgoing.put_nowait((user_id, frame))
+        except Full:
+            logger.warning("Redis publish queue is full, delivering notification to local subscribers only")
+            self.deliver(user_id, frame)
+
+    def _start_publisher(self):
+        # Pornit la prima publicare, și în procesele fără event loop (joburile programate)
+        with self.lock:
+            if self.publisher is not None:
+                return
+            self.publisher = threading.Thread(target=self._publish_loop, name='redis-notification-publisher',
+                                              daemon=True)
+            self.publisher.start()
+        atexit.register(self.close)
+
+    def _publish_loop(self):
+        while True:
+            item = self.outgoing.get()
+            if item is None:
+                return
+            batch = [item]
+            while len(batch) < PUBLISH_BATCH_SIZE:
+                try:
+                    item = self.outgoing.get_nowait()
+                except Empty:
+                    break
+                if item is None:
+                    self._publish_batch(batch)
+                    return
+                batch.append(item)
+            self._publish_batch(batch)
+
+    def _publish_batch(self, batch):
+        try:
+            pipeline = self.client.pipeline(transaction=False)
+            for user_id, frame in batch:
+                pipeline.publish(f"{CHANNEL_PREFIX}{user_id}", frame)
+            pipeline.execute()
+        except redis.RedisError as e:
+            logger.error(f"Error publishing notifications to Redis: {e}")
+            for user_id, frame in batch:
+                self.deliver(user_id, frame)
+
+    def close(self, timeout: float = 5.0):
+        # Trimite cadrele rămase în coadă înainte de oprire
+        with self.lock:
+            publisher, self.publisher = self.publisher, None
+        if publisher is None:
+            return
+        self.outgoing.put(None)
+        publisher.join(timeout)
+
+    async def _listen(self):
+        while True:
+            client = redis_asyncio.Redis.from_url(self.url)
+            pubsub = client.pubsub()
+            try:
+                await pubsub.psubscribe(f"{CHANNEL_PREFIX}*")
+                async for message in pubsub.listen():
+                    if message['type'] != 'pmessage':
+                        continue
+                    user_id = int(message['channel'].decode()[len(CHANNEL_PREFIX):])
+                    self.deliver(user_id, message['data'])
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Redis notification listener failed, reconnecting: {e}")
+                await asyncio.sleep(1)
+            finally:
+                await pubsub.close()
+                await client.close()
+
+
+def create_broker() -> NotificationBroker:
+    if REDIS_URL:
+        if redis is not None:
+            logger.info("Notification broker: Redis")
+            return RedisNotificationBroker(REDIS_URL)
+        logger.warning("REDIS_URL is set but the redis package is not installed; using the in-process broker")
+    return NotificationBroker()
+
+
+notification_broker = create_broker()
+
+
+@event.listens_for(Session, 'after_flush')
+def _collect_notification_events(session, flush_context):
+    # După flush id-urile sunt atribuite; evenimentele pleacă abia după commit
+    events = [
+        ('notification', obj.user_id, serialize_notification(obj))
+        for obj in session.new if isinstance(obj, Notification)
+    ]
+    events += [
+        ('summary', obj.user_id, summary_payload(obj))
+        for obj in list(session.new) + list(session.dirty) if isinstance(obj, NotificationSummary)
+    ]
+    if events:
+        session.info.setdefault(OUTBOX_KEY, []).extend(events)
+
+
+@event.listens_for(Session, 'after_commit')
+def _publish_notification_events(session):
+    outbox = session.info.pop(OUTBOX_KEY, None)
+    if not outbox:
+        return
+    # Un singur eveniment summary per utilizator: ultima stare din tranzacție
+    summaries = {}
+    for event_name, user_id, data in outbox:
+        if event_name == 'summary':
+            summaries[user_id] = data
+        else:
+            notification_broker.publish(user_id, sse_frame(event_name, data))
+    for user_id, data in summaries.items():
+        notification_broker.publish(user_id, sse_frame('summary', data))
+
+
+@event.listens_for(Session, 'after_rollback')
+def _discard_notification_events(session):
+    session.info.pop(OUTBOX_KEY, None)
@@ -0,0 +1,177 @@
+import base64
+import json
+from datetime import datetime
+from typing import Dict, Optional
+
+from sqlalchemy import and_, func, or_
+from sqlalchemy.orm import Session
+
+from database.dialects import insert_if_missing
+from database.models import Notification, NotificationSummary
+
+DAILY_RECOMMENDATIONS = 'daily_recommendations'
+NOTIFICATION_PAGE_SIZE = 20
+MAX_NOTIFICATION_PAGE_SIZE = 100
+
+
+def notification_kind(metadata: Optional[str]) -> Optional[str]:
+    if not metadata:
+        return None
+    try:
+        kind = json.loads(metadata).get('type')
+    except (ValueError, AttributeError):
+        return None
+    return str(kind)[:50] if kind else None
+
+
+def encode_cursor(notification: Notification) -> str:
+    raw = f"{notification.created_at.isoformat()}|{notification.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str):
+    try:
+        created_at, notification_id = base64.urlsafe_b64decode(cursor.encode()).decode().split('|')
+        return datetime.fromisoformat(created_at), int(notification_id)
+    except (ValueError, UnicodeDecodeError):
+        raise ValueError("Invalid cursor")
+
+
+def serialize_notification(notification: Notification) -> Dict:
+    return {
+        "id": notification.id,
+        "title": notification.title,
+        "message": notification.message,
+        "type": notification.type,
+        "kind": notification.kind,
+        "read": notification.read,
+        "created_at": notification.created_at,
+        "metadata": notification.notification_metadata
+    }
+
+
+def last_recommendation_at(db: Session, user_id: int) -> Optional[datetime]:
+    return db.query(func.max(Notification.created_at)).filter(
+        Notification.user_id == user_id,
+        Notification.kind == DAILY_RECOMMENDATIONS
+    ).scalar()
+
+
+def _lock_summary_row(db: Session, user_id: int) -> NotificationSummary:
+    # Ca în analytics: FOR UPDATE nu blochează un rând inexistent, deci prima notificare și prima citire
+    # concurente l-ar insera amândouă. Rândul inserat aici are updated_at NULL până când este reconstruit.
+    query = db.query(NotificationSummary).filter(NotificationSummary.user_id == user_id).with_for_update()
+    row = query.first()
+    if row is None:
+        insert_if_missing(db, NotificationSummary.__table__, {'user_id': user_id, 'updated_at': None})
+        row = query.first()
+    return row
+
+
+def rebuild_notification_summary(db: Session, user_id: int) -> NotificationSummary:
+    row = _lock_summary_row(db, user_id)
+
+    row.unread_count = db.query(Notification).filter(
+        Notification.user_id == user_id,
+        Notification.read == False
+    ).count()
+    row.last_recommendation_at = last_recommendation_at(db, user_id)
+    row.updated_at = datetime.utcnow()
+    return row
+
+
+def get_notification_summary(db: Session, user_id: int) -> NotificationSummary:
+    row = db.query(NotificationSummary).filter(NotificationSummary.user_id == user_id).first()
+    if row is None or row.updated_at is None:
+        # Utilizatorii existenți înainte de sumar sunt completați la prima citire
+        row = rebuild_notification_summary(db, user_id)
+        db.commit()
+    return row
+
+
+def lock_notification_summary(db: Session, user_id: int) -> NotificationSummary:
+    row = _lock_summary_row(db, user_id)
+    if row.updated_at is None:
+        row = rebuild_notification_summary(db, user_id)
+    return row
+
+
+def add_notification(db: Session, user_id: int, title: str, message: str,
+                     type: str = 'info', metadata: Optional[str] = None) -> Notification:
+    # Sumarul este blocat înainte de add, ca o eventuală reconstruire să nu numere notificarea de două ori
+    summary = lock_notification_summary(db, user_id)
+
+    notification = Notification(
+        user_id=user_id,
+        title=title,
+        message=message,
+        type=type,
+        notification_metadata=metadata,
+        kind=notification_kind(metadata),
+        created_at=datetime.utcnow()
+    )
+    db.add(notification)
+
+    summary.unread_count = (summary.unread_count or 0) + 1
+    if notification.kind == DAILY_RECOMMENDATIONS:
+        summary.last_recommendation_at = notification.created_at
+    return notification
+
+
+def mark_notifications_read(db: Session, user_id: int, notification_id: Optional[int] = None) -> int:
+    summary = lock_notification_summary(db, user_id)
+
+    query = db.query(Notification).filter(
+        Notification.user_id == user_id,
+        Notification.read == False
+    )
+    if notification_id is not None:
+        query = query.filter(Notification.id == notification_id)
+    updated = query.update({"read": True}, synchronize_session=False)
+
+    summary.unread_count = max(0, (summary.unread_count or 0) - updated)
+    return updated
+
+
+def delete_notifications(db: Session, user_id: int, notification_id: Optional[int] = None,
+                         read_only: bool = False) -> int:
+    summary = lock_notification_summary(db, user_id)
+
+    query = db.query(Notification).filter(Notification.user_id == user_id)
+    if notification_id is not None:
+        query = query.filter(Notification.id == notification_id)
+    if read_only:
+        query = query.filter(Notification.read == True)
+
+    unread = 0 if read_only else query.filter(Notification.read == False).count()
+    removes_recommendation = query.filter(Notification.kind == DAILY_RECOMMENDATIONS).first() is not None
+    deleted = query.delete(synchronize_session=False)
+
+    summary.unread_count = max(0, (summary.unread_count or 0) - unread)
+    if removes_recommendation:
+        summary.last_recommendation_at = last_recommendation_at(db, user_id)
+    return deleted
+
+
+def list_notifications(db: Session, user_id: int, cursor: Optional[str] = None,
+                       limit: int = NOTIFICATION_PAGE_SIZE, kind: Optional[str] = None,
+                       unread_only: bool = False) -> Dict:
+    # Paginare keyset pe (created_at, id) descrescător, servită de indecșii pe user_id
+    query = db.query(Notification).filter(Notification.user_id == user_id)
+    if kind:
+        query = query.filter(Notification.kind == kind)
+    if unread_only:
+        query = query.filter(Notification.read == False)
+    if cursor:
+        created_at, notification_id = decode_cursor(cursor)
+        query = query.filter(or_(
+            Notification.created_at < created_at,
+            and_(Notification.created_at == created_at, Notification.id < notification_id)
+        ))
+
+    rows = query.order_by(Notification.created_at.desc(), Notification.id.desc()).limit(limit + 1).all()
+    page = rows[:limit]
+    return {
+        "items": [serialize_notification(notification) for notification in page],
+        "next_cursor": encode_cursor(page[-1]) if len(rows) > limit else None
+    }
@@ -1,22 +1,48 @@
 import pandas as pd
 import numpy as np
-from sqlalchemy import text
-from database.connection import SessionLocal
+from sqlalchemy import text, bindparam
+from database.connection import SessionLocal, router
 from database.models import Movie, Rating, User, Base
 from sklearn.preprocessing import StandardScaler
-from sklearn.metrics.pairwise import cosine_similarity
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 import json
+import sys
+from itertools import groupby
+
+from data_processing import similarity
+from data_processing.DuckDBSource import DuckDBSource
+from data_processing.SnapshotSource import SnapshotSource
+from data_processing.snapshot import SNAPSHOT_ROOT, export_snapshot
+from database.dialects import add_column_if_missing, autoincrement_id, create_index_if_missing
+from database.genres import load_genres, load_movie_genres
+from database.versioning import bump_data_version
+from machine_learning.user_recommendations import build_all_user_recommendations
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+SERVING_TOP_K = 50
+# Evaluările modificate cu puțin înainte de citire pot fi comise după ea; se recalculează din nou
+WATERMARK_OVERLAP = timedelta(minutes=1)
+# Joburile batch tolerează o replică mai în urmă decât endpoint-urile
+BATCH_MAX_LAG = 60.0
+# metoda din movie_similarity -> metoda raportată în recomandări
+SERVING_METHODS = {
+    'item_collaborative': 'collaborative_filtering',
+    'genre': 'content_based'
+}
+
 
 class DataPreprocessor:
-    def __init__(self):
-        self.session = SessionLocal()
+    def __init__(self, session=None, source=None):
+        self.session = session or SessionLocal()
         self.engine = self.session.bind
+        # Scanările datelor de intrare (ratings, movies, genuri) pot rula pe o replică; scrierile și citirile
+        # tabelelor produse de preprocesare (movie_similarity, watermark-uri) rămân pe primar
+        self.read_engine = router.read_engine(BATCH_MAX_LAG) if session is None else self.engine
+        # DuckDBSource / SnapshotSource opțional: statisticile, evaluările și profilurile se citesc din fișiere
+        self.source = source
 
     def create_processed_tables(self):
         try:
@@ -30,17 +56,18 @@ class DataPreprocessor:
                         FOREIGN KEY (movie_id) REFERENCES movies(id)
                     )
                 """))
+                create_index_if_missing(conn, 'idx_movie_stats_rating_count', 'movie_stats', ['rating_count'])
 
-                conn.execute(text("""
+                conn.execute(text(f"""
                     CREATE TABLE IF NOT EXISTS movie_similarity (
-                        id INTEGER PRIMARY KEY AUTO_INCREMENT,
+                        id {autoincrement_id(conn.dialect.name)},
                         movie_id1 INTEGER,
                         movie_id2 INTEGER,
                         similarity_score FLOAT,
                         method VARCHAR(50),
                         FOREIGN KEY (movie_id1) REFERENCES movies(id),
                         FOREIGN KEY (movie_id2) REFERENCES movies(id),
-                        UNIQUE KEY (movie_id1, movie_id2, method)
+                        UNIQUE (movie_id1, movie_id2, method)
                     )
                 """))
 
@@ -56,6 +83,44 @@ class DataPreprocessor:
                     )
                 """))
 
+                conn.execute(text("""
+                    CREATE TABLE IF NOT EXISTS data_version (
+                        name VARCHAR(50) PRIMARY KEY,
+                        version BIGINT NOT NULL DEFAULT 0,
+                        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP
+                    )
+                """))
+
+                conn.execute(text("""
+                    CREATE TABLE IF NOT EXISTS preprocessing_state (
+                        stage VARCHAR(50) PRIMARY KEY,
+                        last_run DATETIME,
+                        last_rating_id BIGINT
+                    )
+                """))
+                add_column_if_missing(conn, 'preprocessing_state', 'last_rating_id', 'BIGINT')
+
+                conn.execute(text("""
+                    CREATE TABLE IF NOT EXISTS movie_recommendations (
+                        movie_id INTEGER NOT NULL,
+                        method VARCHAR(50) NOT NULL,
+                        recommendations TEXT NOT NULL,
+                        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        PRIMARY KEY (movie_id, method),
+                        FOREIGN KEY (movie_id) REFERENCES movies(id)
+                    )
+                """))
+
+                conn.execute(text("""
+                    CREATE TABLE IF NOT EXISTS user_recommendations (
+                        user_id INTEGER NOT NULL,
+                        kind VARCHAR(20) NOT NULL,
+                        recommendations TEXT NOT NULL,
+                        updated_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+                        PRIMARY KEY (user_id, kind)
+                    )
+                """))
+
                 conn.execute(text("""
                     CREATE TABLE IF NOT EXISTS movie_genre_vectors (
                         movie_id INTEGER PRIMARY KEY,
@@ -72,6 +137,19 @@ class DataPreprocessor:
             logger.error(f"Eroare la crearea tabelelor: {e}")
             return False
 
+    def create_snapshot(self, root: str = SNAPSHOT_ROOT):
+        # Exportă ratings, movies și movie_stats o dată per rulare; etapele următoare citesc snapshot-ul
+        try:
+            path = export_snapshot(self.read_engine, root)
+            if self.source:
+                self.source.close()
+            self.source = SnapshotSource(path)
+            return path
+
+        except Exception as e:
+            logger.error(f"Eroare la exportul snapshot-ului: {e}")
+            return None
+
     def calculate_movie_stats(self):
 
         try:
@@ -85,21 +163,24 @@ class DataPreprocessor:
                 GROUP BY m.id
             """)
 
-            df = pd.read_sql(query, self.engine)
+            df = self.source.movie_stats() if self.source else pd.read_sql(query, self.read_engine)
+            rows = [{
+                'movie_id': int(row.movie_id),
+                'avg_rating': float(row.avg_rating) if pd.notna(row.avg_rating) else 0.0,
+                'rating_count': int(row.rating_count)
+            } for row in df.itertuples(index=False)]
 
             with self.engine.begin() as conn:
 
                 conn.execute(text("DELETE FROM movie_stats"))
 
-                for _, row in df.iterrows():
+                for i in range(0, len(rows), 1000):
                     conn.execute(text("""
                         INSERT INTO movie_stats (movie_id, avg_rating, rating_count)
                         VALUES (:movie_id, :avg_rating, :rating_count)
-                    """), {
-                        'movie_id': row['movie_id'],
-                        'avg_rating': row['avg_rating'] if pd.notna(row['avg_rating']) else 0.0,
-                        'rating_count': row['rating_count']
-                    })
+                    """), rows[i:i + 1000])
+
+                bump_data_version(conn)
 
             logger.info(f"Statistici calculate pentru {len(df)} filme")
             return True
@@ -108,53 +189,143 @@ class DataPreprocessor:
             logger.error(f"Eroare la calcularea statisticilor: {e}")
             return False
 
-    def create_item_collaborative_similarity(self):
+    def _load_collaborative_ratings(self) -> pd.DataFrame:
+        if self.source:
+            return self.source.collaborative_ratings()
+
+        query = text("""
+            SELECT r.id, r.user_id, r.movie_id, r.rating, r.timestamp
+            FROM ratings r
+            INNER JOIN movies m ON r.movie_id = m.id
+        """)
+        df = pd.read_sql(query, self.read_engine)
+        df['rating'] = df['rating'].astype(float)
+        # SQLite întoarce DATETIME ca text
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        return df
+
+    def _get_stage_watermark(self, stage: str):
+        # Cel mai mare id de evaluare procesat de etapă și momentul în care rularea a citit evaluările
+        with self.engine.connect() as conn:
+            row = conn.execute(text("""
+                SELECT last_rating_id, last_run FROM preprocessing_state WHERE stage = :stage
+            """), {'stage': stage}).first()
+        if row is None:
+            return None, None
+        # SQLite întoarce DATETIME ca text
+        return row.last_rating_id, pd.Timestamp(row.last_run) if row.last_run is not None else None
+
+    def _set_stage_watermark(self, conn, stage: str, last_rating_id, last_run: datetime):
+        conn.execute(text("DELETE FROM preprocessing_state WHERE stage = :stage"), {'stage': stage})
+        conn.execute(text("""
+            INSERT INTO preprocessing_state (stage, last_run, last_rating_id)
+            VALUES (:stage, :last_run, :last_rating_id)
+        """), {'stage': stage, 'last_run': last_run, 'last_rating_id': last_rating_id})
+
+    def _load_collaborative_neighbours(self, movie_ids: np.ndarray) -> dict:
+        df = pd.read_sql(text("""
+            SELECT movie_id1, movie_id2, similarity_score
+            FROM movie_similarity
+            WHERE method = 'item_collaborative'
+            ORDER BY movie_id1, similarity_score DESC
+        """), self.engine)
+
+        current = {}
+        if df.empty:
+            return current
+
+        index = pd.Index(movie_ids)
+        rows1 = index.get_indexer(df['movie_id1'])
+        rows2 = index.get_indexer(df['movie_id2'])
+        known = (rows1 >= 0) & (rows2 >= 0)
+
+        grouped = pd.DataFrame({
+            'row1': rows1[known],
+            'row2': rows2[known],
+            'score': df['similarity_score'].to_numpy(dtype=np.float32)[known]
+        }).groupby('row1', sort=False)
+
+        for row, group in grouped:
+            current[int(row)] = (group['row2'].to_numpy(), group['score'].to_numpy())
+
+        return current
+
+    def _write_neighbours(self, conn, movie_ids: np.ndarray, neighbours: dict, method: str = 'item_collaborative'):
+        rows = []
+        for row, (neighbour_rows, scores) in neighbours.items():
+            for neighbour_row, score in zip(neighbour_rows, scores):
+                rows.append({
+                    'movie_id1': int(movie_ids[row]),
+                    'movie_id2': int(movie_ids[neighbour_row]),
+                    'score': float(score),
+                    'method': method
+                })
+
+        for i in range(0, len(rows), 10000):
+            conn.execute(text("""
+                INSERT INTO movie_similarity 
+                (movie_id1, movie_id2, similarity_score, method)
+                VALUES (:movie_id1, :movie_id2, :score, :method)
+            """), rows[i:i + 10000])
+
+        return len(rows)
+
+    def create_item_collaborative_similarity(self, incremental=False, dirty_movie_ids=None):
         try:
-            query = text("""
-                SELECT r.user_id, r.movie_id, r.rating
-                FROM ratings r
-                INNER JOIN movies m ON r.movie_id = m.id
-            """)
-
-            df = pd.read_sql(query, self.engine)
-
-            user_item_matrix = df.pivot_table(
-                index='user_id',
-                columns='movie_id',
-                values='rating'
-            ).fillna(0)
-
-            item_similarity = cosine_similarity(user_item_matrix.T)
-
-            similarity_df = pd.DataFrame(
-                item_similarity,
-                index=user_item_matrix.columns,
-                columns=user_item_matrix.columns
-            )
-
-            top_k = 20
+            started = datetime.utcnow()
+            df = self._load_collaborative_ratings()
+            movie_ids, item_matrix = similarity.build_item_matrix(df)
+            # Watermark pe id-ul evaluării: o evaluare importată mai târziu cu un timestamp vechi primește
+            # totuși un id nou. O evaluare modificată (POST /users/{id}/ratings actualizează rândul existent)
+            # își păstrează id-ul, dar primește un timestamp nou, deci se compară și cu last_run.
+            # Sursele din fișiere (DuckDB, snapshot) nu au id, deci rulează complet, în afară de filmele
+            # marcate explicit în dirty_movie_ids.
+            has_ids = 'id' in df.columns
+            watermark = int(df['id'].max()) if has_ids and not df.empty else None
+
+            last_rating_id, last_run = (self._get_stage_watermark('item_collaborative')
+                                        if incremental and has_ids else (None, None))
+
+            if incremental and (last_rating_id is not None or dirty_movie_ids is not None):
+                dirty_ids = set(dirty_movie_ids or [])
+                if last_rating_id is not None:
+                    dirty = df['id'] > last_rating_id
+                    if last_run is not None:
+                        # Evaluările scrise cât timp rula etapa anterioară intră în suprapunere
+                        dirty |= df['timestamp'] > last_run - WATERMARK_OVERLAP
+                    dirty_ids.update(df.loc[dirty, 'movie_id'].unique().tolist())
+
+                dirty_rows = np.flatnonzero(np.isin(movie_ids, list(dirty_ids)))
+
+                current = self._load_collaborative_neighbours(movie_ids)
+                neighbours = similarity.incremental_neighbours(item_matrix, dirty_rows, current)
+
+                with self.engine.begin() as conn:
+                    if neighbours:
+                        conn.execute(text("""
+                            DELETE FROM movie_similarity
+                            WHERE method = 'item_collaborative' AND movie_id1 IN :movie_ids
+                        """).bindparams(bindparam('movie_ids', expanding=True)), {
+                            'movie_ids': [int(movie_ids[row]) for row in neighbours]
+                        })
+                    written = self._write_neighbours(conn, movie_ids, neighbours)
+                    self._set_stage_watermark(conn, 'item_collaborative', watermark, started)
+                    bump_data_version(conn)
+
+                logger.info(f"Similarități item-based actualizate incremental: {len(dirty_rows)} filme modificate, "
+                            f"{len(neighbours)} liste recalculate, {written} perechi scrise")
+                return True
+
+            neighbours = similarity.top_k_neighbours(item_matrix)
 
             with self.engine.begin() as conn:
 
                 conn.execute(text("DELETE FROM movie_similarity WHERE method = 'item_collaborative'"))
+                written = self._write_neighbours(conn, movie_ids, neighbours)
+                self._set_stage_watermark(conn, 'item_collaborative', watermark, started)
+                bump_data_version(conn)
 
-                for movie_id in similarity_df.index:
-
-                    similar_movies = similarity_df[movie_id].sort_values(ascending=False)[1:top_k + 1]
-
-                    for similar_id, score in similar_movies.items():
-                        if score > 0.1:
-                            conn.execute(text("""
-                                INSERT INTO movie_similarity 
-                                (movie_id1, movie_id2, similarity_score, method)
-                                VALUES (:movie_id1, :movie_id2, :score, 'item_collaborative')
-                            """), {
-                                'movie_id1': int(movie_id),
-                                'movie_id2': int(similar_id),
-                                'score': float(score)
-                            })
-
-            logger.info("Similarități item-based calculate cu succes!")
+            logger.info(f"Similarități item-based calculate cu succes! ({written} perechi)")
             return True
 
         except Exception as e:
@@ -164,61 +335,42 @@ class DataPreprocessor:
     def process_genre_similarities(self):
         try:
 
-            query = text("SELECT id, genres FROM movies WHERE genres IS NOT NULL")
-            df = pd.read_sql(query, self.engine)
-
-            all_genres = set()
-            for genres in df['genres']:
-                for genre in genres.split('|'):
-                    all_genres.add(genre)
+            with self.read_engine.connect() as conn:
+                genre_ids = load_genres(conn)
+                pairs = load_movie_genres(conn)
 
-            genre_list = list(all_genres)
-            genre_to_idx = {genre: idx for idx, genre in enumerate(genre_list)}
+            if pairs.empty:
+                logger.warning("Tabela movie_genres este goală; rulați migrarea genurilor")
+                return False
 
-            movie_vectors = []
-            movie_ids = []
-
-            for _, row in df.iterrows():
-                vector = np.zeros(len(genre_list))
-                for genre in row['genres'].split('|'):
-                    if genre in genre_to_idx:
-                        vector[genre_to_idx[genre]] = 1
-                movie_vectors.append(vector)
-                movie_ids.append(row['id'])
-
-            movie_vectors = np.array(movie_vectors)
-            genre_similarity = cosine_similarity(movie_vectors)
+            # Aceeași funcție ca similaritățile item-based: top-k vecini per film, în ambele direcții,
+            # doar cu scor > GENRE_MIN_SCORE. Toate perechile i < j ar fi zeci de milioane de rânduri,
+            # iar căutarea după movie_id1 ar vedea doar vecinii cu id mai mare.
+            movie_ids, genre_matrix = similarity.build_genre_matrix(pairs, max(genre_ids.values()))
+            neighbours = similarity.top_k_neighbours(genre_matrix, top_k=SERVING_TOP_K,
+                                                     min_score=similarity.GENRE_MIN_SCORE)
+            vectors = genre_matrix.astype(bool).astype(np.float64).toarray()
 
             with self.engine.begin() as conn:
 
                 conn.execute(text("DELETE FROM movie_genre_vectors"))
                 conn.execute(text("DELETE FROM movie_similarity WHERE method = 'genre'"))
 
-                for idx, movie_id in enumerate(movie_ids):
-                    vector_json = movie_vectors[idx].tolist()
+                vector_rows = [{
+                    'movie_id': int(movie_id),
+                    'vector': json.dumps(vectors[idx].tolist())  # Formatăm ca JSON valid
+                } for idx, movie_id in enumerate(movie_ids)]
+                for i in range(0, len(vector_rows), 1000):
                     conn.execute(text("""
                         INSERT INTO movie_genre_vectors (movie_id, genre_vector)
                         VALUES (:movie_id, :vector)
-                    """), {
-                        'movie_id': int(movie_id),
-                        'vector': json.dumps(vector_json)  # Formatăm ca JSON valid
-                    })
-
-                for i in range(len(movie_ids)):
-                    for j in range(i + 1, len(movie_ids)):
-                        score = genre_similarity[i][j]
-                        if score > 0.1:
-                            conn.execute(text("""
-                                INSERT INTO movie_similarity 
-                                (movie_id1, movie_id2, similarity_score, method)
-                                VALUES (:movie_id1, :movie_id2, :score, 'genre')
-                            """), {
-                                'movie_id1': int(movie_ids[i]),
-                                'movie_id2': int(movie_ids[j]),
-                                'score': float(score)
-                            })
-
-            logger.info("Genre similarity calculată cu succes!")
+                    """), vector_rows[i:i + 1000])
+
+                written = self._write_neighbours(conn, movie_ids, neighbours, 'genre')
+
+                bump_data_version(conn)
+
+            logger.info(f"Genre similarity calculată cu succes! ({written} perechi)")
             return True
 
         except Exception as e:
@@ -227,65 +379,74 @@ class DataPreprocessor:
 
     def create_user_profiles(self):
         try:
-            query = text("""
+            # Varianța populației (VARIANCE din MySQL) scrisă cu AVG, ca să meargă pe orice dialect
+            stats_query = text("""
                 SELECT 
                     u.id as user_id,
                     COUNT(r.id) as rating_count,
                     AVG(r.rating) as avg_rating,
-                    VARIANCE(r.rating) as rating_variance,
-                    m.genres
+                    AVG(r.rating * r.rating) - AVG(r.rating) * AVG(r.rating) as rating_variance
                 FROM users u
                 JOIN ratings r ON u.id = r.user_id
-                JOIN movies m ON r.movie_id = m.id
-                WHERE m.genres IS NOT NULL
-                GROUP BY u.id, m.genres
+                GROUP BY u.id
+            """)
+
+            genres_query = text("""
+                SELECT r.user_id, g.name as genre, COUNT(*) as genre_count
+                FROM ratings r
+                JOIN movie_genres mg ON mg.movie_id = r.movie_id
+                JOIN genres g ON g.id = mg.genre_id
+                GROUP BY r.user_id, g.name
+                ORDER BY r.user_id, g.name
             """)
 
-            df = pd.read_sql(query, self.engine)
+            if self.source:
+                stats_df = self.source.user_stats()
+                genres_df = self.source.user_genre_counts()
+            else:
+                stats_df = pd.read_sql(stats_query, self.read_engine)
+                genres_df = pd.read_sql(genres_query, self.read_engine)
 
             user_profiles = {}
-            for _, row in df.iterrows():
-                user_id = row['user_id']
-                if user_id not in user_profiles:
-                    user_profiles[user_id] = {
-                        'favorite_genres': {},
-                        'avg_rating': 0,
-                        'rating_count': 0,
-                        'rating_variance': 0
-                    }
-
-                user_profiles[user_id]['rating_count'] = row['rating_count']
-                user_profiles[user_id]['avg_rating'] = row['avg_rating']
-                user_profiles[user_id]['rating_variance'] = row['rating_variance']
-
-                if row['genres']:
-                    for genre in row['genres'].split('|'):
-                        if genre not in user_profiles[user_id]['favorite_genres']:
-                            user_profiles[user_id]['favorite_genres'][genre] = 0
-                        user_profiles[user_id]['favorite_genres'][genre] += 1
+            for row in stats_df.itertuples(index=False):
+                user_profiles[row.user_id] = {
+                    'favorite_genres': {},
+                    'avg_rating': row.avg_rating,
+                    'rating_count': row.rating_count,
+                    'rating_variance': row.rating_variance
+                }
+
+            for row in genres_df.itertuples(index=False):
+                if row.user_id in user_profiles:
+                    user_profiles[row.user_id]['favorite_genres'][row.genre] = int(row.genre_count)
+
+            rows = []
+            for user_id, profile in user_profiles.items():
+                sorted_genres = dict(sorted(
+                    profile['favorite_genres'].items(),
+                    key=lambda x: x[1],
+                    reverse=True
+                ))
+
+                rows.append({
+                    'user_id': int(user_id),
+                    'favorite_genres': json.dumps(sorted_genres),  # Convertim în JSON valid
+                    'avg_rating': float(profile['avg_rating']),
+                    'rating_count': int(profile['rating_count']),
+                    # AVG(x²) - AVG(x)² poate ieși ușor negativ din rotunjiri
+                    'rating_variance': max(float(profile['rating_variance']), 0.0) if profile['rating_variance'] else 0.0
+                })
 
             with self.engine.begin() as conn:
 
                 conn.execute(text("DELETE FROM user_profiles"))
 
-                for user_id, profile in user_profiles.items():
-                    sorted_genres = dict(sorted(
-                        profile['favorite_genres'].items(),
-                        key=lambda x: x[1],
-                        reverse=True
-                    ))
-
+                for i in range(0, len(rows), 1000):
                     conn.execute(text("""
                         INSERT INTO user_profiles 
                         (user_id, favorite_genres, avg_rating, rating_count, rating_variance)
                         VALUES (:user_id, :favorite_genres, :avg_rating, :rating_count, :rating_variance)
-                    """), {
-                        'user_id': int(user_id),
-                        'favorite_genres': json.dumps(sorted_genres),  # Convertim în JSON valid
-                        'avg_rating': float(profile['avg_rating']),
-                        'rating_count': int(profile['rating_count']),
-                        'rating_variance': float(profile['rating_variance']) if profile['rating_variance'] else 0.0
-                    })
+                    """), rows[i:i + 1000])
 
             logger.info(f"Profile create pentru {len(user_profiles)} utilizatori")
             return True
@@ -294,6 +455,68 @@ class DataPreprocessor:
             logger.error(f"Eroare la crearea profilurilor: {e}")
             return False
 
+    def build_recommendation_rows(self, methods=None, top_k: int = SERVING_TOP_K):
+        # Listele top-k gata de servit, câte un rând per (film, metodă), doar cu perechi [movie_id, scor]:
+        # titlul, posterul și statisticile se completează la servire din MovieCatalog, deci fetch_posters
+        # și calculate_movie_stats nu invalidează rândurile
+        try:
+            methods = list(methods or SERVING_METHODS)
+
+            # Top-k per movie_id1 selectat în SQL, o metodă pe rând: nu se mai citește tot movie_similarity
+            top_query = text("""
+                SELECT movie_id1, movie_id2, similarity_score
+                FROM (
+                    SELECT movie_id1, movie_id2, similarity_score,
+                           ROW_NUMBER() OVER (
+                               PARTITION BY movie_id1 ORDER BY similarity_score DESC, movie_id2
+                           ) AS neighbour_rank
+                    FROM movie_similarity
+                    WHERE method = :method
+                ) ranked
+                WHERE neighbour_rank <= :top_k
+                ORDER BY movie_id1, neighbour_rank
+            """)
+            insert_query = text("""
+                INSERT INTO movie_recommendations (movie_id, method, recommendations)
+                VALUES (:movie_id, :method, :recommendations)
+            """)
+
+            total = 0
+            with self.engine.begin() as conn:
+                conn.execute(
+                    text("DELETE FROM movie_recommendations WHERE method IN :methods").bindparams(
+                        bindparam('methods', expanding=True)
+                    ),
+                    {'methods': methods}
+                )
+
+                for method in methods:
+                    rows = []
+                    result = conn.execute(top_query, {'method': method, 'top_k': top_k})
+                    for movie_id, group in groupby(result, key=lambda row: row.movie_id1):
+                        rows.append({
+                            'movie_id': int(movie_id),
+                            'method': method,
+                            'recommendations': json.dumps([
+                                [int(row.movie_id2), float(row.similarity_score)] for row in group
+                            ])
+                        })
+                    for i in range(0, len(rows), 1000):
+                        conn.execute(insert_query, rows[i:i + 1000])
+                    total += len(rows)
+                bump_data_version(conn)
+
+            logger.info(f"Tabela movie_recommendations actualizată: {total} rânduri ({', '.join(methods)})")
+            return True
+
+        except Exception as e:
+            logger.error(f"Eroare la construirea recomandărilor precalculate: {e}")
+            return False
+
+    def build_user_recommendation_rows(self):
+        # Listele per utilizator depind de movie_similarity și user_profiles, deci se refac după ele
+        return build_all_user_recommendations() is not None
+
     def run_all_preprocessing(self):
 
         logger.info("Începe prelucrarea datelor...")
@@ -318,16 +541,67 @@ class DataPreprocessor:
             logger.error("Eșec la crearea profilurilor utilizatori")
             return False
 
+        if not self.build_recommendation_rows():
+            logger.error("Eșec la construirea recomandărilor precalculate")
+            return False
+
+        if not self.build_user_recommendation_rows():
+            logger.error("Eșec la construirea recomandărilor per utilizator")
+            return False
+
         logger.info("Prelucrarea datelor completată cu succes!")
         return True
 
+    def run_analytical_preprocessing(self):
+        # Etapele care scanează toate evaluările; cu o sursă DuckDB nu ating tabelele bazei de servire
+        logger.info("Începe prelucrarea analitică...")
+
+        for stage, name in ((self.create_processed_tables, "crearea tabelelor"),
+                            (self.calculate_movie_stats, "calcularea statisticilor"),
+                            (self.create_item_collaborative_similarity, "calcularea similarităților item-based"),
+                            (self.create_user_profiles, "crearea profilurilor utilizatori"),
+                            (self.build_recommendation_rows, "construirea recomandărilor precalculate"),
+                            (self.build_user_recommendation_rows, "construirea recomandărilor per utilizator")):
+            if not stage():
+                logger.error(f"Eșec la {name}")
+                return False
+
+        logger.info("Prelucrarea analitică completată cu succes!")
+        return True
+
     def close(self):
         self.session.close()
+        if self.source:
+            self.source.close()
 
 
 if __name__ == "__main__":
-    preprocessor = DataPreprocessor()
+    # --source <dir>: statisticile, similaritățile item-based și profilurile se calculează cu DuckDB
+    # din fișierele MovieLens (CSV sau Parquet) din <dir>
+    # --snapshot: exportă un snapshot nou și rulează etapele analitice pe el
+    # --snapshot <dir|latest>: reia etapele pe un snapshot existent, fără să recitească evaluările din bază
+    source = DuckDBSource(sys.argv[sys.argv.index('--source') + 1]) if '--source' in sys.argv else None
+    snapshot = None
+    if '--snapshot' in sys.argv:
+        position = sys.argv.index('--snapshot') + 1
+        snapshot = sys.argv[position] if position < len(sys.argv) and not sys.argv[position].startswith('--') else ''
+        if snapshot:
+            source = SnapshotSource(None if snapshot == 'latest' else snapshot)
+
+    preprocessor = DataPreprocessor(source=source)
     try:
-        preprocessor.run_all_preprocessing()
+        if snapshot == '' and not preprocessor.create_snapshot():
+            sys.exit(1)
+
+        if '--incremental' in sys.argv:
+            if preprocessor.create_item_collaborative_similarity(incremental=True):
+                preprocessor.build_recommendation_rows(['item_collaborative'])
+                preprocessor.build_user_recommendation_rows()
+        elif '--users' in sys.argv:
+            preprocessor.build_user_recommendation_rows()
+        elif preprocessor.source:
+            preprocessor.run_analytical_preprocessing()
+        else:
+            preprocessor.run_all_preprocessing()
     finally:
         preprocessor.close()
\ No newline at end of file
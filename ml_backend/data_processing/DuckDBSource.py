@@ -0,0 +1,84 @@
+import logging
+import os
+
+import pandas as pd
+
+try:
+    import duckdb
+except ImportError:
+    duckdb = None
+
+from database.genres import NO_GENRES
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class DuckDBSource:
+    # Etapele analitice din DataPreprocessor (statistici, evaluări pentru similarități, profiluri)
+    # calculate cu DuckDB direct din fișierele MovieLens (Parquet dacă există, altfel CSV),
+    # fără să scaneze tabelele bazei de servire. Rezultatele sunt scrise tot în baza de servire.
+    def __init__(self, data_path: str = "ml-latest-small"):
+        if duckdb is None:
+            raise RuntimeError("Pachetul duckdb nu este instalat (pip install duckdb)")
+
+        self.data_path = data_path
+        self.conn = duckdb.connect()
+        self.conn.execute(f"CREATE VIEW movies AS SELECT movieId AS movie_id, genres FROM {self._scan('movies')}")
+        self.conn.execute(f"""
+            CREATE VIEW ratings AS
+            SELECT userId AS user_id, movieId AS movie_id, CAST(rating AS DOUBLE) AS rating,
+                   CAST(to_timestamp(timestamp) AS TIMESTAMP) AS timestamp
+            FROM {self._scan('ratings')}
+        """)
+        logger.info(f"Sursa DuckDB: {data_path}")
+
+    def _scan(self, name: str) -> str:
+        # Schema MovieLens (movieId, userId, rating, timestamp în secunde), în oricare din formate
+        parquet = os.path.join(self.data_path, f"{name}.parquet")
+        if os.path.exists(parquet):
+            return f"read_parquet('{parquet}')"
+
+        csv = os.path.join(self.data_path, f"{name}.csv")
+        if not os.path.exists(csv):
+            raise FileNotFoundError(f"Nu există {name}.parquet sau {name}.csv în {self.data_path}")
+        return f"read_csv_auto('{csv}', header = true)"
+
+    def movie_stats(self) -> pd.DataFrame:
+        return self.conn.execute("""
+            SELECT m.movie_id, AVG(r.rating) AS avg_rating, COUNT(r.rating) AS rating_count
+            FROM movies m
+            LEFT JOIN ratings r ON m.movie_id = r.movie_id
+            GROUP BY m.movie_id
+        """).df()
+
+    def collaborative_ratings(self) -> pd.DataFrame:
+        return self.conn.execute("""
+            SELECT r.user_id, r.movie_id, r.rating, r.timestamp
+            FROM ratings r
+            INNER JOIN movies m ON r.movie_id = m.movie_id
+        """).df()
+
+    def user_stats(self) -> pd.DataFrame:
+        # var_pop, la fel ca VARIANCE din MySQL
+        return self.conn.execute("""
+            SELECT user_id, COUNT(*) AS rating_count, AVG(rating) AS avg_rating,
+                   var_pop(rating) AS rating_variance
+            FROM ratings
+            GROUP BY user_id
+        """).df()
+
+    def user_genre_counts(self) -> pd.DataFrame:
+        return self.conn.execute("""
+            SELECT r.user_id, g.genre, COUNT(*) AS genre_count
+            FROM ratings r
+            JOIN (
+                SELECT movie_id, unnest(string_split(genres, '|')) AS genre FROM movies
+            ) g ON g.movie_id = r.movie_id
+            WHERE g.genre <> ? AND g.genre <> ''
+            GROUP BY r.user_id, g.genre
+            ORDER BY r.user_id, g.genre
+        """, [NO_GENRES]).df()
+
+    def close(self):
+        self.conn.close()
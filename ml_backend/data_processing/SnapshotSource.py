@@ -0,0 +1,96 @@
+import logging
+
+import numpy as np
+import pandas as pd
+from scipy import sparse
+
+from data_processing.snapshot import latest_snapshot, load_snapshot
+from database.genres import split_genres
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+class SnapshotSource:
+    # Aceeași interfață ca DuckDBSource, peste un snapshot exportat cu export_snapshot:
+    # etapele analitice pot fi rulate din nou pe același snapshot fără să citească baza de date
+    def __init__(self, path: str = None):
+        path = path or latest_snapshot()
+        if path is None:
+            raise FileNotFoundError("Nu există niciun snapshot; rulați întâi DataPreprocessor.py --snapshot")
+
+        self.path = path
+        snapshot = load_snapshot(path)
+        self.manifest = snapshot['manifest']
+        self.movies = snapshot['movies']
+        self.stats = snapshot['movie_stats']
+        self.ratings = snapshot['ratings']
+        logger.info(f"Snapshot {self.manifest['version']} ({path}): {self.ratings.num_rows} evaluări, "
+                    f"data_version {self.manifest['data_version']}")
+
+    def _ratings_frame(self) -> pd.DataFrame:
+        # O singură copie, din chunk-urile mapate în coloane numpy compacte (int32/float32)
+        return pd.DataFrame({
+            name: self.ratings.column(name).to_numpy()
+            for name in ('user_id', 'movie_id', 'rating', 'timestamp')
+        })
+
+    def movie_stats(self) -> pd.DataFrame:
+        # Toate filmele, și cele fără evaluări (ca LEFT JOIN-ul din calculate_movie_stats)
+        ratings = self._ratings_frame()
+        grouped = ratings.groupby('movie_id')['rating']
+        stats = pd.DataFrame({
+            'movie_id': self.movies.column('id').to_numpy()
+        }).merge(pd.DataFrame({
+            'avg_rating': grouped.mean().astype(np.float64),
+            'rating_count': grouped.size()
+        }), left_on='movie_id', right_index=True, how='left')
+        stats['rating_count'] = stats['rating_count'].fillna(0).astype(np.int64)
+        return stats
+
+    def collaborative_ratings(self) -> pd.DataFrame:
+        ratings = self._ratings_frame()
+        return ratings[np.isin(ratings['movie_id'].to_numpy(), self.movies.column('id').to_numpy())]
+
+    def user_stats(self) -> pd.DataFrame:
+        ratings = self._ratings_frame()
+        rating = ratings['rating'].astype(np.float64)
+        grouped = rating.groupby(ratings['user_id'])
+        return pd.DataFrame({
+            'rating_count': grouped.size(),
+            'avg_rating': grouped.mean(),
+            'rating_variance': grouped.var(ddof=0)
+        }).rename_axis('user_id').reset_index()
+
+    def user_genre_counts(self) -> pd.DataFrame:
+        # Numărul de evaluări per (utilizator, gen) ca produs de matrici rare: utilizatori x filme @ filme x genuri
+        movie_ids = self.movies.column('id').to_numpy()
+        movie_genres = [split_genres(genres) for genres in self.movies.column('genres').to_pylist()]
+        genre_names = sorted({genre for genres in movie_genres for genre in genres})
+        genre_columns = {genre: column for column, genre in enumerate(genre_names)}
+
+        pair_rows = np.repeat(np.arange(len(movie_ids)), [len(genres) for genres in movie_genres])
+        pair_columns = np.array([genre_columns[genre] for genres in movie_genres for genre in genres], dtype=np.int64)
+        genre_matrix = sparse.csr_matrix(
+            (np.ones(len(pair_rows), dtype=np.int32), (pair_rows, pair_columns)),
+            shape=(len(movie_ids), len(genre_names))
+        )
+
+        ratings = self.collaborative_ratings()
+        user_codes, user_ids = pd.factorize(ratings['user_id'], sort=True)
+        movie_rows = pd.Index(movie_ids).get_indexer(ratings['movie_id'])
+        user_matrix = sparse.csr_matrix(
+            (np.ones(len(ratings), dtype=np.int32), (user_codes, movie_rows)),
+            shape=(len(user_ids), len(movie_ids))
+        )
+
+        counts = (user_matrix @ genre_matrix).tocoo()
+        return pd.DataFrame({
+            'user_id': np.asarray(user_ids)[counts.row],
+            'genre': np.asarray(genre_names, dtype=object)[counts.col],
+            'genre_count': counts.data
+        }).sort_values(['user_id', 'genre'], kind='stable', ignore_index=True)
+
+    def close(self):
+        # Tabelele mapate sunt eliberate odată cu ultimele referințe
+        self.movies = self.stats = self.ratings = None
@@ -3,6 +3,7 @@ import os
 from datetime import datetime
 from database.models import Movie, Rating, User, MovieLink, UserApplication
 from database.connection import SessionLocal
+from database.genres import sync_movie_genres
 
 
 class DataLoader:
@@ -88,6 +89,18 @@ class DataLoader:
             import traceback
             traceback.print_exc()
 
+    def save_movie_genres_to_db(self):
+        try:
+            saved = sync_movie_genres(self.session.connection())
+            self.session.commit()
+            print(f"Salvate {saved} asocieri film-gen")
+
+        except Exception as e:
+            self.session.rollback()
+            print(f"Eroare la salvarea genurilor: {str(e)}")
+            import traceback
+            traceback.print_exc()
+
     def save_links_to_db(self, links_df):
         try:
             batch_size = 100
@@ -204,6 +217,7 @@ class DataLoader:
 
             processed_movies = self.process_movies(movies_df)
             self.save_movies_to_db(processed_movies)
+            self.save_movie_genres_to_db()
             self.save_links_to_db(links_df)
             self.save_ratings_to_db(ratings_df)
 
@@ -1,17 +1,130 @@
-import requests
+import hashlib
+import json
 import os
+import threading
+import time
+from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import requests
 from dotenv import load_dotenv
+from requests.adapters import HTTPAdapter
+from sqlalchemy import or_, update
+
 from database.connection import SessionLocal
 from database.models import Movie
-import time
+from database.versioning import bump_data_version
 
 load_dotenv()
 
 TMDB_API_KEY = os.getenv('TMDB_API_KEY', 'eb66dab773708ea19e3140e36407f9bf')
-TMDB_BASE_URL = 'https://api.themoviedb.org/3'
+TMDB_BASE_URL = os.getenv('TMDB_BASE_URL', 'https://api.themoviedb.org/3')
+TMDB_CACHE_DIR = os.getenv('TMDB_CACHE_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.tmdb_cache'))
+
+MAX_WORKERS = int(os.getenv('TMDB_MAX_WORKERS', '8'))
+REQUESTS_PER_SECOND = float(os.getenv('TMDB_REQUESTS_PER_SECOND', '20'))
+BATCH_SIZE = 100
+REQUEST_TIMEOUT = 10
+MAX_ATTEMPTS = 5
+BACKOFF_SECONDS = 0.5
+MAX_RETRY_AFTER = 60
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+# Versiunea formatului intrărilor din cache; se incrementează când se schimbă modul de căutare,
+# iar intrările scrise de versiunile anterioare sunt tratate ca lipsă și recitite de la TMDB.
+# 2: căutare după tmdb_id (/movie/{id}) înainte de căutarea după titlu
+CACHE_VERSION = 2
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float = None):
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(1.0, rate)
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+                self.updated_at = now
+
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+
+class ResponseCache:
+    def __init__(self, directory: str = TMDB_CACHE_DIR, version: int = CACHE_VERSION):
+        self.directory = directory
+        self.version = version
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key) -> str:
+        digest = hashlib.sha1(json.dumps(key, sort_keys=True).encode('utf-8')).hexdigest()
+        return os.path.join(self.directory, digest[:2], f"{digest}.json")
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'r', encoding='utf-8') as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            return False, None
+        if entry.get('version') != self.version or 'result' not in entry:
+            return False, None
+        return True, entry['result']
+
+    def set(self, key, result):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump({'version': self.version, 'key': key, 'result': result}, f)
+        os.replace(tmp_path, path)
+
+
+def create_tmdb_session(pool_size: int = MAX_WORKERS) -> requests.Session:
+    # Fără reîncercări în adapter: tmdb_get le face prin rate limiter
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+
+    session = requests.Session()
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def retry_delay(response, attempt: int) -> float:
+    retry_after = response.headers.get('Retry-After') if response is not None else None
+    if retry_after and retry_after.isdigit():
+        return min(float(retry_after), MAX_RETRY_AFTER)
+    return BACKOFF_SECONDS * 2 ** attempt
+
+
+def tmdb_get(url, params, session=None, rate_limiter=None) -> requests.Response:
+    # Fiecare încercare, inclusiv reîncercările după 429/5xx sau erori de conexiune, ia un token,
+    # deci reîncercările respectă și ele limita de cereri pe secundă
+    for attempt in range(MAX_ATTEMPTS):
+        if rate_limiter:
+            rate_limiter.acquire()
+
+        try:
+            response = (session or requests).get(url, params=params, timeout=REQUEST_TIMEOUT)
+        except (requests.ConnectionError, requests.Timeout):
+            if attempt == MAX_ATTEMPTS - 1:
+                raise
+            response = None
+        else:
+            if response.status_code not in RETRY_STATUSES or attempt == MAX_ATTEMPTS - 1:
+                return response
+
+        time.sleep(retry_delay(response, attempt))
 
 
-def get_tmdb_movie_details(movie_title, year=None):
+def get_tmdb_movie_details(movie_title, year=None, session=None, rate_limiter=None):
     try:
         url = f"{TMDB_BASE_URL}/search/movie"
         params = {
@@ -20,7 +133,7 @@ def get_tmdb_movie_details(movie_title, year=None):
             'year': year if year else None
         }
 
-        response = requests.get(url, params=params)
+        response = tmdb_get(url, params, session=session, rate_limiter=rate_limiter)
         response.raise_for_status()
 
         data = response.json()
@@ -30,49 +143,148 @@ def get_tmdb_movie_details(movie_title, year=None):
 
     except Exception as e:
         print(f"Error fetching TMDB data for {movie_title}: {e}")
+        raise
+
+
+def get_tmdb_movie_by_id(tmdb_id, session=None, rate_limiter=None):
+    try:
+        url = f"{TMDB_BASE_URL}/movie/{tmdb_id}"
+        params = {'api_key': TMDB_API_KEY}
+
+        response = tmdb_get(url, params, session=session, rate_limiter=rate_limiter)
+        if response.status_code == 404:
+            return None
+        response.raise_for_status()
+
+        return response.json()
+
+    except Exception as e:
+        print(f"Error fetching TMDB movie {tmdb_id}: {e}")
+        raise
+
+
+def fetch_movie(movie, session, rate_limiter, cache):
+    movie_id, title, year, tmdb_id = movie[:4]
+    key = [title, year, tmdb_id]
+
+    hit, tmdb_data = cache.get(key)
+    if hit:
+        return movie, tmdb_data, True
+
+    tmdb_data = None
+    if tmdb_id:
+        tmdb_data = get_tmdb_movie_by_id(tmdb_id, session=session, rate_limiter=rate_limiter)
+    if tmdb_data is None:
+        tmdb_data = get_tmdb_movie_details(title, year, session=session, rate_limiter=rate_limiter)
+    cache.set(key, tmdb_data)
+    # La rulările următoare filmul va avea deja tmdb_id-ul găsit acum
+    if tmdb_data and tmdb_data.get('id') and tmdb_data['id'] != tmdb_id:
+        cache.set([title, year, tmdb_data['id']], tmdb_data)
+    return movie, tmdb_data, False
+
+
+def parse_release_date(value):
+    try:
+        return datetime.strptime(value, '%Y-%m-%d').date() if value else None
+    except ValueError:
+        return None
+
+
+def build_movie_update(movie, tmdb_data):
+    movie_id, title, year, tmdb_id, overview, vote_average, poster_path, runtime, release_date, popularity = movie
+
+    if not tmdb_data:
         return None
 
+    values = {'id': movie_id}
+    if not poster_path and tmdb_data.get('poster_path'):
+        values['poster_path'] = tmdb_data['poster_path']
+    if not overview and tmdb_data.get('overview'):
+        values['overview'] = tmdb_data['overview']
+    if not vote_average and tmdb_data.get('vote_average'):
+        values['vote_average'] = tmdb_data['vote_average']
+    if not tmdb_id and tmdb_data.get('id'):
+        values['tmdb_id'] = tmdb_data['id']
+    if not runtime and tmdb_data.get('runtime'):
+        values['runtime'] = tmdb_data['runtime']
+    if not release_date and parse_release_date(tmdb_data.get('release_date')):
+        values['release_date'] = parse_release_date(tmdb_data['release_date'])
+    if not popularity and tmdb_data.get('popularity'):
+        values['popularity'] = tmdb_data['popularity']
+
+    return values if len(values) > 1 else None
+
+
+def update_movie_posters(max_workers=MAX_WORKERS, requests_per_second=REQUESTS_PER_SECOND, batch_size=BATCH_SIZE,
+                         session=None, cache_dir=TMDB_CACHE_DIR):
+    # O sesiune primită de la apelant rămâne deschisă; o închidem doar pe cea creată aici
+    owns_session = session is None
+    session = session or SessionLocal()
+    http_session = create_tmdb_session(max_workers)
+    rate_limiter = TokenBucket(requests_per_second)
+    cache = ResponseCache(cache_dir)
 
-def update_movie_posters():
-    session = SessionLocal()
     try:
-        movies = session.query(Movie).filter(Movie.poster_path.is_(None)).all()
+        movies = session.query(
+            Movie.id, Movie.title, Movie.year, Movie.tmdb_id, Movie.overview, Movie.vote_average,
+            Movie.poster_path, Movie.runtime, Movie.release_date, Movie.popularity
+        ).filter(or_(Movie.poster_path.is_(None), Movie.runtime.is_(None))).all()
+        movies = [tuple(movie) for movie in movies]
+
+        print(f"Found {len(movies)} movies without posters or details")
+
+        pending = []
+        updated = failed = cached = 0
+        started_at = time.monotonic()
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [executor.submit(fetch_movie, movie, http_session, rate_limiter, cache) for movie in movies]
 
-        print(f"Found {len(movies)} movies without posters")
+            for i, future in enumerate(as_completed(futures), start=1):
+                try:
+                    movie, tmdb_data, from_cache = future.result()
+                except Exception:
+                    failed += 1
+                    continue
 
-        for i, movie in enumerate(movies):
-            if i > 0:
-                time.sleep(0.5)
+                cached += from_cache
+                values = build_movie_update(movie, tmdb_data)
+                if values:
+                    pending.append(values)
+                    updated += 1
 
-            print(f"Processing {i + 1}/{len(movies)}: {movie.title}")
+                if len(pending) >= batch_size:
+                    session.execute(update(Movie), pending)
+                    session.commit()
+                    pending = []
 
-            tmdb_data = get_tmdb_movie_details(movie.title, movie.year)
+                if i % batch_size == 0:
+                    elapsed = time.monotonic() - started_at
+                    print(f"Processed {i}/{len(movies)} ({i / elapsed:.1f} movies/s, {cached} from cache)")
 
-            if tmdb_data and tmdb_data.get('poster_path'):
-                movie.poster_path = tmdb_data['poster_path']
-                if not movie.overview and tmdb_data.get('overview'):
-                    movie.overview = tmdb_data['overview']
-                if not movie.vote_average and tmdb_data.get('vote_average'):
-                    movie.vote_average = tmdb_data['vote_average']
-                if not movie.tmdb_id and tmdb_data.get('id'):
-                    movie.tmdb_id = tmdb_data['id']
+        if pending:
+            session.execute(update(Movie), pending)
+            session.commit()
 
-                print(f"  ✓ Updated {movie.title}")
-            else:
-                print(f"  ✗ No poster found for {movie.title}")
+        if updated:
+            # Cataloagele din memorie ale API-ului se reîncarcă la schimbarea versiunii
+            bump_data_version(session.connection())
+            session.commit()
 
-        session.commit()
-        print("All movies processed successfully!")
+        print(f"All movies processed: {updated} updated, {failed} failed, {cached} served from cache")
+        return {'updated': updated, 'failed': failed, 'cached': cached}
 
     except Exception as e:
         session.rollback()
         print(f"Error updating movie posters: {e}")
     finally:
-        session.close()
+        http_session.close()
+        if owns_session:
+            session.close()
 
 
 if __name__ == "__main__":
     if not TMDB_API_KEY:
         print("Error: Please set TMDB_API_KEY in your .env file")
     else:
-        update_movie_posters()
\ No newline at end of file
+        update_movie_posters()
@@ -0,0 +1,96 @@
+import os
+import resource
+import time
+from contextlib import contextmanager
+from typing import Dict, Optional
+
+import pandas as pd
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from data_processing.DataPreprocessor import DataPreprocessor
+from database.dialects import create_database_engine
+from database.genres import sync_movie_genres
+from database.models import Base
+from database.versioning import bump_data_version
+from machine_learning.BatchRecommender import BatchRecommender
+from machine_learning.MovieCatalog import MovieCatalog
+from machine_learning.user_recommendations import compute_user_rows, write_user_rows
+
+# Bază locală (SQLite) cu tabelele de servire construite din ml-latest-small, pentru evaluare și teste de încărcare
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ml-latest-small")
+
+
+def load_movielens():
+    movies = pd.read_csv(os.path.join(DATA_PATH, "movies.csv")).rename(columns={'movieId': 'id'})
+    ratings = pd.read_csv(os.path.join(DATA_PATH, "ratings.csv")).rename(
+        columns={'userId': 'user_id', 'movieId': 'movie_id'}
+    )
+    ratings['timestamp'] = pd.to_datetime(ratings['timestamp'], unit='s')
+    movies['year'] = movies['title'].str.extract(r'\((\d{4})\)\s*$')[0].astype(float)
+    return movies, ratings
+
+
+def peak_rss_mb() -> float:
+    # ru_maxrss este în KB pe Linux
+    return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+@contextmanager
+def measure(stages: Dict, name: str):
+    # Vârful RSS al procesului după etapă (monoton, deci creșterea arată cât a adăugat etapa)
+    started = time.perf_counter()
+    yield
+    stages[name] = {'seconds': round(time.perf_counter() - started, 3), 'peak_rss_mb': peak_rss_mb()}
+
+
+def create_local_engine(url: Optional[str] = None):
+    # Fără url: SQLite în memorie, o singură conexiune partajată
+    if url is None:
+        return create_database_engine("sqlite://", poolclass=StaticPool)
+    return create_database_engine(url)
+
+
+def build_local_store(store, movies: pd.DataFrame, ratings: pd.DataFrame):
+    # Aceleași tabele ca în producție (modelele ORM + tabelele procesate), populate din ratings
+    stages = {}
+    session = Session(bind=store)
+    preprocessor = DataPreprocessor(session=session)
+
+    with measure(stages, 'load'):
+        Base.metadata.create_all(store)
+        if not preprocessor.create_processed_tables():
+            raise RuntimeError("Tabelele procesate nu au putut fi create")
+        with store.begin() as conn:
+            bump_data_version(conn)
+
+            movies[['id', 'title', 'year', 'genres']].to_sql('movies', conn, if_exists='append', index=False)
+            users = ratings['user_id'].unique()
+            pd.DataFrame({'id': users, 'email': [f"user{user_id}@eval" for user_id in users],
+                          'password_hash': ''}).to_sql('users', conn, if_exists='append', index=False)
+            ratings[['user_id', 'movie_id', 'rating', 'timestamp']].to_sql('ratings', conn, if_exists='append',
+                                                                        index=False)
+            sync_movie_genres(conn)
+
+    # Etapele DataPreprocessor din producție, rulate pe baza locală: evaluarea și testele de încărcare
+    # măsoară exact tabelele pe care le servește API-ul
+    for name, stage in (('movie_stats', preprocessor.calculate_movie_stats),
+                        ('item_collaborative', preprocessor.create_item_collaborative_similarity),
+                        ('genre', preprocessor.process_genre_similarities),
+                        ('user_profiles', preprocessor.create_user_profiles),
+                        ('movie_recommendations', preprocessor.build_recommendation_rows)):
+        with measure(stages, name):
+            if not stage():
+                raise RuntimeError(f"Etapa {name} a eșuat")
+
+    catalog = MovieCatalog()
+    with measure(stages, 'user_recommendations'):
+        conn = session.connection()
+        recommender = BatchRecommender(catalog.get(conn))
+        user_ids = [int(user_id) for user_id in ratings['user_id'].unique()]
+        write_user_rows(conn, user_ids, compute_user_rows(conn, recommender, user_ids))
+        session.commit()
+
+    return session, catalog, stages
+
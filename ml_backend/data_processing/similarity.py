@@ -0,0 +1,130 @@
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from typing import Dict, Iterable, Optional, Tuple
+
+TOP_K = 20
+MIN_SCORE = 0.1
+BLOCK_SIZE = 1024
+# Pragul de similaritate pe genuri (scor > 0.1, ca înainte)
+GENRE_MIN_SCORE = 0.1
+
+Neighbours = Tuple[np.ndarray, np.ndarray]
+
+
+def build_item_matrix(ratings_df: pd.DataFrame) -> Tuple[np.ndarray, sparse.csr_matrix]:
+    # Rândurile sunt filme, coloanele utilizatori; fiecare rând e normalizat L2,
+    # deci produsul scalar a două rânduri este similaritatea cosinus.
+    movie_codes, movie_ids = pd.factorize(ratings_df['movie_id'], sort=True)
+    user_codes, user_ids = pd.factorize(ratings_df['user_id'])
+
+    matrix = sparse.csr_matrix(
+        (ratings_df['rating'].astype(np.float32).to_numpy(), (movie_codes, user_codes)),
+        shape=(len(movie_ids), len(user_ids))
+    )
+
+    norms = np.sqrt(np.asarray(matrix.multiply(matrix).sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    matrix = sparse.diags((1.0 / norms).astype(np.float32)) @ matrix
+
+    return np.asarray(movie_ids, dtype=np.int64), matrix.tocsr()
+
+
+def build_genre_matrix(pairs: pd.DataFrame, genre_count: int) -> Tuple[np.ndarray, sparse.csr_matrix]:
+    # Vectorii binari de gen (coloana genului = id - 1, ca bitul din măștile de genuri), normalizați L2:
+    # produsul scalar a două rânduri este similaritatea cosinus
+    movie_ids = np.sort(pairs['movie_id'].unique())
+    matrix = sparse.csr_matrix(
+        (np.ones(len(pairs), dtype=np.float32),
+         (np.searchsorted(movie_ids, pairs['movie_id'].to_numpy()), pairs['genre_id'].to_numpy() - 1)),
+        shape=(len(movie_ids), genre_count)
+    )
+    matrix.data[:] = 1.0
+
+    norms = np.sqrt(np.asarray(matrix.sum(axis=1)).ravel())
+    norms[norms == 0] = 1.0
+    normalized = sparse.diags((1.0 / norms).astype(np.float32)) @ matrix
+    return np.asarray(movie_ids, dtype=np.int64), normalized.tocsr()
+
+
+def _top_k_block(scores: np.ndarray, top_k: int, min_score: float) -> Iterable[Neighbours]:
+    k = min(top_k, scores.shape[1])
+    if k == 0:
+        for _ in range(scores.shape[0]):
+            yield np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        return
+
+    candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    candidate_scores = np.take_along_axis(scores, candidates, axis=1)
+    order = np.argsort(-candidate_scores, axis=1)
+    candidates = np.take_along_axis(candidates, order, axis=1)
+    candidate_scores = np.take_along_axis(candidate_scores, order, axis=1)
+
+    for row_idx, row_scores in zip(candidates, candidate_scores):
+        keep = row_scores > min_score
+        yield row_idx[keep], row_scores[keep]
+
+
+def top_k_neighbours(matrix: sparse.csr_matrix, rows: Optional[np.ndarray] = None,
+                     top_k: int = TOP_K, min_score: float = MIN_SCORE) -> Dict[int, Neighbours]:
+    if rows is None:
+        rows = np.arange(matrix.shape[0])
+    rows = np.asarray(rows, dtype=np.int64)
+
+    matrix_t = matrix.T.tocsc()
+    neighbours = {}
+
+    for start in range(0, len(rows), BLOCK_SIZE):
+        block_rows = rows[start:start + BLOCK_SIZE]
+        scores = (matrix[block_rows] @ matrix_t).toarray()
+        # Un film nu este propriul vecin
+        scores[np.arange(len(block_rows)), block_rows] = -np.inf
+
+        for row, result in zip(block_rows, _top_k_block(scores, top_k, min_score)):
+            neighbours[int(row)] = result
+
+    return neighbours
+
+
+def affected_rows(matrix: sparse.csr_matrix, dirty_rows: np.ndarray,
+                  current: Dict[int, Neighbours], top_k: int = TOP_K,
+                  min_score: float = MIN_SCORE) -> np.ndarray:
+    # Un rând curat trebuie recalculat doar dacă lista lui conține un film modificat
+    # (scorul s-a schimbat) sau dacă un film modificat ar intra acum în top-k.
+    dirty_rows = np.asarray(dirty_rows, dtype=np.int64)
+    n_items = matrix.shape[0]
+    if len(dirty_rows) == 0:
+        return dirty_rows
+
+    is_dirty = np.zeros(n_items, dtype=bool)
+    is_dirty[dirty_rows] = True
+
+    thresholds = np.full(n_items, min_score, dtype=np.float32)
+    contains_dirty = np.zeros(n_items, dtype=bool)
+    for row, (neighbour_rows, scores) in current.items():
+        if row >= n_items:
+            continue
+        if len(scores) >= top_k:
+            thresholds[row] = scores[-1]
+        if len(neighbour_rows) and is_dirty[neighbour_rows].any():
+            contains_dirty[row] = True
+
+    matrix_t = matrix.T.tocsc()
+    best_dirty_score = np.full(n_items, -np.inf, dtype=np.float32)
+    for start in range(0, len(dirty_rows), BLOCK_SIZE):
+        block_rows = dirty_rows[start:start + BLOCK_SIZE]
+        scores = (matrix[block_rows] @ matrix_t).toarray()
+        scores[np.arange(len(block_rows)), block_rows] = -np.inf
+        np.maximum(best_dirty_score, scores.max(axis=0), out=best_dirty_score)
+
+    enters_top_k = best_dirty_score > thresholds
+    affected = (contains_dirty | enters_top_k) & ~is_dirty
+
+    return np.concatenate([dirty_rows, np.flatnonzero(affected)])
+
+
+def incremental_neighbours(matrix: sparse.csr_matrix, dirty_rows: np.ndarray,
+                           current: Dict[int, Neighbours], top_k: int = TOP_K,
+                           min_score: float = MIN_SCORE) -> Dict[int, Neighbours]:
+    rows = affected_rows(matrix, dirty_rows, current, top_k, min_score)
+    return top_k_neighbours(matrix, rows, top_k, min_score)
@@ -0,0 +1,155 @@
+import json
+import logging
+import os
+import shutil
+import time
+from datetime import datetime
+from typing import Dict, Optional
+
+import pandas as pd
+from sqlalchemy import text
+
+try:
+    import pyarrow as pa
+    import pyarrow.feather as feather
+except ImportError:
+    pa = None
+    feather = None
+
+from database.versioning import get_data_version
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Snapshot versionat al datelor de intrare pentru etapele analitice:
+#   snapshots/000007/manifest.json
+#   snapshots/000007/movies.arrow, movie_stats.arrow
+#   snapshots/000007/ratings/part-00000.arrow, part-00001.arrow, ...
+# Fișierele sunt Arrow IPC necomprimate, deci se citesc prin memory map fără copiere.
+
+SNAPSHOT_ROOT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "snapshots")
+RATINGS_PARTITION_ROWS = 1_000_000
+MANIFEST = 'manifest.json'
+
+RATINGS_SCHEMA = None if pa is None else pa.schema([
+    ('user_id', pa.int32()),
+    ('movie_id', pa.int32()),
+    ('rating', pa.float32()),
+    ('timestamp', pa.timestamp('s')),
+])
+MOVIES_SCHEMA = None if pa is None else pa.schema([
+    ('id', pa.int32()),
+    ('title', pa.string()),
+    ('year', pa.int16()),
+    ('genres', pa.string()),
+    ('poster_path', pa.string()),
+    ('tmdb_id', pa.int32()),
+    ('imdb_id', pa.string()),
+])
+MOVIE_STATS_SCHEMA = None if pa is None else pa.schema([
+    ('movie_id', pa.int32()),
+    ('avg_rating', pa.float32()),
+    ('rating_count', pa.int32()),
+])
+
+
+def require_pyarrow():
+    if pa is None:
+        raise RuntimeError("Pachetul pyarrow nu este instalat (pip install pyarrow)")
+
+
+def _write_table(df: pd.DataFrame, schema, path: str) -> int:
+    # Conversia la schema compactă are loc aici, o singură dată per rulare
+    table = pa.Table.from_pandas(df, schema=schema, preserve_index=False)
+    feather.write_feather(table, path, compression='uncompressed')
+    return table.num_rows
+
+
+def _read_table(path: str):
+    return feather.read_table(path, memory_map=True)
+
+
+def snapshot_versions(root: str = SNAPSHOT_ROOT):
+    if not os.path.isdir(root):
+        return []
+    return sorted(int(name) for name in os.listdir(root)
+                  if name.isdigit() and os.path.exists(os.path.join(root, name, MANIFEST)))
+
+
+def latest_snapshot(root: str = SNAPSHOT_ROOT) -> Optional[str]:
+    versions = snapshot_versions(root)
+    return os.path.join(root, f"{versions[-1]:06d}") if versions else None
+
+
+def export_snapshot(engine, root: str = SNAPSHOT_ROOT, partition_rows: int = RATINGS_PARTITION_ROWS) -> str:
+    require_pyarrow()
+    started = time.perf_counter()
+    versions = snapshot_versions(root)
+    version = versions[-1] + 1 if versions else 1
+    path = os.path.join(root, f"{version:06d}")
+    # Scriem într-un director temporar și îl redenumim la final: un snapshot vizibil este mereu complet
+    staging = f"{path}.tmp"
+    shutil.rmtree(staging, ignore_errors=True)
+    os.makedirs(os.path.join(staging, 'ratings'))
+
+    try:
+        with engine.connect() as conn:
+            data_version = get_data_version(conn)
+
+            movies = pd.read_sql(text("""
+                SELECT id, title, year, genres, poster_path, tmdb_id, imdb_id FROM movies ORDER BY id
+            """), conn)
+            counts = {'movies': _write_table(movies, MOVIES_SCHEMA, os.path.join(staging, 'movies.arrow'))}
+
+            movie_stats = pd.read_sql(text("""
+                SELECT movie_id, avg_rating, rating_count FROM movie_stats ORDER BY movie_id
+            """), conn)
+            counts['movie_stats'] = _write_table(movie_stats, MOVIE_STATS_SCHEMA,
+                                                 os.path.join(staging, 'movie_stats.arrow'))
+
+            # Evaluările în partiții de partition_rows rânduri, citite în flux
+            counts['ratings'] = 0
+            partitions = 0
+            chunks = pd.read_sql(text("SELECT user_id, movie_id, rating, timestamp FROM ratings"),
+                                 conn.execution_options(stream_results=True), chunksize=partition_rows)
+            for chunk in chunks:
+                chunk['rating'] = chunk['rating'].astype('float32')
+                chunk['timestamp'] = pd.to_datetime(chunk['timestamp'])
+                counts['ratings'] += _write_table(chunk, RATINGS_SCHEMA,
+                                                  os.path.join(staging, 'ratings', f"part-{partitions:05d}.arrow"))
+                partitions += 1
+
+        manifest = {
+            'version': version,
+            'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+            'data_version': data_version,
+            'rows': counts,
+            'ratings_partitions': partitions
+        }
+        with open(os.path.join(staging, MANIFEST), 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.rename(staging, path)
+
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    logger.info(f"Snapshot {version} exportat în {path}: {counts['ratings']} evaluări în {partitions} partiții, "
+                f"{counts['movies']} filme ({time.perf_counter() - started:.2f}s)")
+    return path
+
+
+def load_snapshot(path: str) -> Dict:
+    # Tabelele Arrow mapate în memorie; pentru ratings, câte un chunk per partiție
+    require_pyarrow()
+    with open(os.path.join(path, MANIFEST)) as f:
+        manifest = json.load(f)
+
+    ratings_dir = os.path.join(path, 'ratings')
+    parts = [_read_table(os.path.join(ratings_dir, name)) for name in sorted(os.listdir(ratings_dir))]
+    return {
+        'manifest': manifest,
+        'movies': _read_table(os.path.join(path, 'movies.arrow')),
+        'movie_stats': _read_table(os.path.join(path, 'movie_stats.arrow')),
+        'ratings': pa.concat_tables(parts) if parts else RATINGS_SCHEMA.empty_table()
+    }
@@ -1,10 +1,12 @@
 from urllib.parse import quote_plus
 
-from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, declarative_base
 from dotenv import load_dotenv
 import os
 
+from database.dialects import create_database_engine, dialect_name
+from database.routing import REPLICA_MAX_LAG, ReplicaRouter
+
 load_dotenv()
 
 DB_USER = os.getenv('DB_USER', 'root')
@@ -15,24 +17,42 @@ DB_PORT = os.getenv('DB_PORT', '3306')
 
 DB_PASSWORD_ENCODED = quote_plus(DB_PASSWORD)
 
-print(f"MySQL Configuration:")
-print(f"  User: {DB_USER}")
-print(f"  Host: {DB_HOST}")
-print(f"  Port: {DB_PORT}")
-print(f"  Database: {DB_NAME}")
+# DATABASE_URL (ex. sqlite:///filmfinder.db) înlocuiește configurația MySQL; opțiunile engine-ului depind de dialect
+DATABASE_URL = os.getenv('DATABASE_URL')
+
+if DATABASE_URL:
+    print(f"Database: {dialect_name(DATABASE_URL)}")
+    engine = create_database_engine(DATABASE_URL)
+else:
+    print(f"MySQL Configuration:")
+    print(f"  User: {DB_USER}")
+    print(f"  Host: {DB_HOST}")
+    print(f"  Port: {DB_PORT}")
+    print(f"  Database: {DB_NAME}")
 
-DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD_ENCODED}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
+    DATABASE_URL = f"mysql+pymysql://{DB_USER}:{DB_PASSWORD_ENCODED}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-engine = create_engine(
-    DATABASE_URL,
-    echo=True,
-    connect_args={
-        'charset': 'utf8mb4'
-    }
-)
+    engine = create_database_engine(DATABASE_URL, echo=True)
 
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+# DATABASE_REPLICA_URLS: replici doar pentru citire, separate prin virgulă (ex. două instanțe locale:
+# DATABASE_URL=sqlite:///primary.db DATABASE_REPLICA_URLS=sqlite:///replica.db)
+REPLICA_URLS = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+REPLICA_MAX_LAG_SECONDS = float(os.getenv('REPLICA_MAX_LAG_SECONDS', REPLICA_MAX_LAG))
+
+if REPLICA_URLS:
+    print(f"Read replicas: {len(REPLICA_URLS)} (max lag {REPLICA_MAX_LAG_SECONDS}s)")
+
+replica_engines = [create_database_engine(url) for url in REPLICA_URLS]
+router = ReplicaRouter(engine, replica_engines, max_lag=REPLICA_MAX_LAG_SECONDS)
+
+
+def ReadSessionLocal():
+    # Sesiune pe o replică la zi, sau pe primar dacă nu există niciuna; doar pentru citiri
+    return SessionLocal(bind=router.read_engine())
+
+
 Base = declarative_base()
 
 def get_db():
@@ -40,4 +60,12 @@ def get_db():
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+
+def get_read_db():
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
@@ -0,0 +1,69 @@
+from typing import Dict, Sequence
+
+from sqlalchemy import create_engine, insert, inspect, text
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.engine import make_url
+from sqlalchemy.exc import IntegrityError
+
+# Diferențele dintre dialecte pentru tabelele create cu SQL brut (DataPreprocessor, baze locale)
+
+AUTOINCREMENT_ID = {
+    'mysql': 'INTEGER PRIMARY KEY AUTO_INCREMENT',
+    'sqlite': 'INTEGER PRIMARY KEY AUTOINCREMENT',
+    'postgresql': 'SERIAL PRIMARY KEY',
+}
+# SQL standard, pentru dialectele care nu sunt în listă
+IDENTITY_ID = 'INTEGER GENERATED BY DEFAULT AS IDENTITY PRIMARY KEY'
+
+
+def dialect_name(url: str) -> str:
+    # mysql+pymysql -> mysql
+    return make_url(url).get_backend_name()
+
+
+def engine_options(url: str) -> Dict:
+    dialect = dialect_name(url)
+    if dialect == 'mysql':
+        return {'connect_args': {'charset': 'utf8mb4'}}
+    if dialect == 'sqlite':
+        # Sesiunile FastAPI și task-urile din fundal folosesc conexiunile din alte thread-uri
+        return {'connect_args': {'check_same_thread': False}}
+    return {}
+
+
+def create_database_engine(url: str, **kwargs):
+    return create_engine(url, **{**engine_options(url), **kwargs})
+
+
+def autoincrement_id(dialect: str) -> str:
+    return AUTOINCREMENT_ID.get(dialect, IDENTITY_ID)
+
+
+def create_index_if_missing(conn, name: str, table: str, columns: Sequence[str]):
+    # MySQL nu are CREATE INDEX IF NOT EXISTS, așa că verificăm prin inspector pe toate dialectele
+    if name not in {index['name'] for index in inspect(conn).get_indexes(table)}:
+        conn.execute(text(f"CREATE INDEX {name} ON {table} ({', '.join(columns)})"))
+
+
+def add_column_if_missing(conn, table: str, column: str, definition: str):
+    # CREATE TABLE IF NOT EXISTS nu adaugă coloanele noi pe tabelele deja create
+    if column not in {existing['name'] for existing in inspect(conn).get_columns(table)}:
+        conn.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"))
+
+
+def insert_if_missing(conn, table, values: Dict):
+    # INSERT care ignoră un rând existent cu aceeași cheie primară, ca primele scrieri concurente
+    # pentru aceeași cheie să nu eșueze cu IntegrityError; conn poate fi și o sesiune ORM
+    dialect = conn.get_bind().dialect.name if hasattr(conn, 'get_bind') else conn.dialect.name
+    if dialect == 'mysql':
+        key = table.primary_key.columns.values()[0]
+        conn.execute(mysql.insert(table).values(values).on_duplicate_key_update({key.name: key}))
+    elif dialect in ('sqlite', 'postgresql'):
+        dialect_insert = sqlite.insert if dialect == 'sqlite' else postgresql.insert
+        conn.execute(dialect_insert(table).values(values).on_conflict_do_nothing())
+    else:
+        try:
+            with conn.begin_nested():
+                conn.execute(insert(table).values(values))
+        except IntegrityError:
+            pass
@@ -0,0 +1,89 @@
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, text
+
+NO_GENRES = '(no genres listed)'
+MAX_GENRES = 64  # măștile de genuri sunt uint64
+
+
+def split_genres(genres: Optional[str]) -> List[str]:
+    if not genres:
+        return []
+    return [genre for genre in genres.split('|') if genre and genre != NO_GENRES]
+
+
+def genre_bit(genre_id: int) -> int:
+    return 1 << (genre_id - 1)
+
+
+def genre_mask(genre_ids: Iterable[int]) -> int:
+    mask = 0
+    for genre_id in genre_ids:
+        mask |= genre_bit(genre_id)
+    return mask
+
+
+def load_genres(conn) -> Dict[str, int]:
+    rows = conn.execute(text("SELECT id, name FROM genres ORDER BY id")).fetchall()
+    return {row.name: row.id for row in rows}
+
+
+def load_movie_genres(conn) -> pd.DataFrame:
+    return pd.read_sql(text("SELECT movie_id, genre_id FROM movie_genres"), conn)
+
+
+def load_movie_genre_masks(conn) -> pd.Series:
+    # movie_id -> mască uint64 cu câte un bit pentru fiecare gen al filmului
+    pairs = load_movie_genres(conn)
+    if pairs.empty:
+        return pd.Series(dtype=np.uint64)
+
+    bits = np.left_shift(np.uint64(1), (pairs['genre_id'].to_numpy() - 1).astype(np.uint64))
+    return pd.Series(bits, index=pairs['movie_id'].to_numpy()).groupby(level=0).agg(np.bitwise_or.reduce)
+
+
+def sync_movie_genres(conn, movie_ids: Optional[List[int]] = None) -> int:
+    # Reconstruiește genres/movie_genres din coloana movies.genres (toate filmele sau doar movie_ids)
+    query = "SELECT id, genres FROM movies"
+    params = {}
+    if movie_ids is not None:
+        if not movie_ids:
+            return 0
+        query += " WHERE id IN :movie_ids"
+        params['movie_ids'] = [int(movie_id) for movie_id in movie_ids]
+
+    statement = text(query)
+    if movie_ids is not None:
+        statement = statement.bindparams(bindparam('movie_ids', expanding=True))
+    movies = conn.execute(statement, params).fetchall()
+
+    pairs = [(int(movie.id), genre) for movie in movies for genre in split_genres(movie.genres)]
+
+    genre_ids = load_genres(conn)
+    new_genres = sorted({genre for _, genre in pairs} - genre_ids.keys())
+    next_id = max(genre_ids.values(), default=0) + 1
+    if next_id + len(new_genres) - 1 > MAX_GENRES:
+        raise ValueError(f"Prea multe genuri pentru măști pe {MAX_GENRES} biți")
+
+    if new_genres:
+        conn.execute(text("INSERT INTO genres (id, name) VALUES (:id, :name)"), [
+            {'id': next_id + i, 'name': genre} for i, genre in enumerate(new_genres)
+        ])
+        genre_ids.update({genre: next_id + i for i, genre in enumerate(new_genres)})
+
+    if movie_ids is None:
+        conn.execute(text("DELETE FROM movie_genres"))
+    else:
+        conn.execute(
+            text("DELETE FROM movie_genres WHERE movie_id IN :movie_ids").bindparams(
+                bindparam('movie_ids', expanding=True)
+            ),
+            {'movie_ids': [int(movie.id) for movie in movies]}
+        )
+
+    rows = [{'movie_id': movie_id, 'genre_id': genre_ids[genre]} for movie_id, genre in set(pairs)]
+    if rows:
+        conn.execute(text("INSERT INTO movie_genres (movie_id, genre_id) VALUES (:movie_id, :genre_id)"), rows)
+    return len(rows)
@@ -1,5 +1,5 @@
 
-from sqlalchemy import Column, Integer, String, Float, Text, Date, ForeignKey, DateTime, Numeric, Boolean, Enum
+from sqlalchemy import Column, Integer, String, Float, Text, Date, ForeignKey, DateTime, Numeric, Boolean, Enum, Index
 from sqlalchemy.orm import relationship
 from database.connection import Base
 import datetime
@@ -23,6 +23,27 @@ class Movie(Base):
 
     ratings = relationship("Rating", back_populates="movie", cascade="all, delete-orphan")
     links = relationship("MovieLink", back_populates="movie", uselist=False)
+    genre_links = relationship("MovieGenre", back_populates="movie", cascade="all, delete-orphan")
+
+
+class Genre(Base):
+    __tablename__ = 'genres'
+
+    id = Column(Integer, primary_key=True)  # bitul genului în măști este id - 1
+    name = Column(String(50), unique=True, nullable=False)
+
+
+class MovieGenre(Base):
+    __tablename__ = 'movie_genres'
+    __table_args__ = (
+        Index('idx_movie_genres_genre', 'genre_id', 'movie_id'),
+    )
+
+    movie_id = Column(Integer, ForeignKey('movies.id'), primary_key=True)
+    genre_id = Column(Integer, ForeignKey('genres.id'), primary_key=True)
+
+    movie = relationship("Movie", back_populates="genre_links")
+    genre = relationship("Genre")
 
 
 class User(Base):
@@ -38,6 +59,9 @@ class User(Base):
 
 class Rating(Base):
     __tablename__ = 'ratings'
+    __table_args__ = (
+        Index('idx_ratings_user_movie', 'user_id', 'movie_id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey('users.id'), nullable=False)
@@ -91,6 +115,9 @@ class UserApplication(Base):
 
 class Watchlist(Base):
     __tablename__ = 'watchlist'
+    __table_args__ = (
+        Index('idx_watchlist_user_movie', 'user_app_id', 'movie_id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_app_id = Column(Integer, ForeignKey('users_application.id'))
@@ -133,6 +160,9 @@ class Collection(Base):
 
 class AppRating(Base):
     __tablename__ = 'app_ratings'
+    __table_args__ = (
+        Index('idx_app_ratings_user_movie', 'user_app_id', 'movie_id'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_app_id = Column(Integer, ForeignKey('users_application.id'), nullable=False)
@@ -160,6 +190,10 @@ class CollectionMovie(Base):
 
 class Notification(Base):
     __tablename__ = 'notifications'
+    __table_args__ = (
+        Index('idx_notifications_user_created', 'user_id', 'created_at'),
+        Index('idx_notifications_user_kind_created', 'user_id', 'kind', 'created_at'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey('users_application.id'), nullable=False)
@@ -168,11 +202,21 @@ class Notification(Base):
     type = Column(Enum('info', 'success', 'warning', 'error'), default='info')
     read = Column(Boolean, default=False)
     notification_metadata = Column(Text, nullable=True)
+    kind = Column(String(50), nullable=True)  # metadata["type"], ex. daily_recommendations
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
 
     user = relationship("UserApplication", backref="notifications")
 
 
+class NotificationSummary(Base):
+    __tablename__ = 'notification_summary'
+
+    user_id = Column(Integer, ForeignKey('users_application.id'), primary_key=True)
+    unread_count = Column(Integer, default=0)
+    last_recommendation_at = Column(DateTime, nullable=True)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+
 class UserProfile(Base):
     __tablename__ = 'user_profiles'
 
@@ -196,4 +240,20 @@ class UserPreferences(Base):
     created_at = Column(DateTime, default=datetime.datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
 
-    user = relationship("UserApplication", backref="preferences", uselist=False)
\ No newline at end of file
+    user = relationship("UserApplication", backref="preferences", uselist=False)
+
+
+class UserAnalytics(Base):
+    __tablename__ = 'user_analytics'
+
+    user_id = Column(Integer, ForeignKey('users_application.id'), primary_key=True)
+    rating_count = Column(Integer, default=0)
+    rating_sum = Column(Float, default=0.0)
+    rating_histogram = Column(Text)  # JSON: {rating: count}
+    genre_stats = Column(Text)  # JSON: {genre: [count, sum]}
+    monthly_genres = Column(Text)  # JSON: {"YYYY-MM": {genre: count}}
+    year_counts = Column(Text)  # JSON: {year: count}
+    watchlist_count = Column(Integer, default=0)
+    updated_at = Column(DateTime, default=datetime.datetime.utcnow, onupdate=datetime.datetime.utcnow)
+
+    user = relationship("UserApplication", backref="analytics", uselist=False)
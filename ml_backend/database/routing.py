@@ -0,0 +1,175 @@
+import logging
+import threading
+import time
+from typing import Dict, Optional, Sequence
+
+from sqlalchemy import text
+
+logger = logging.getLogger(__name__)
+
+# Citirile (endpoint-uri read-only, joburi batch) merg pe o replică, scrierile rămân pe primar.
+# O replică este folosită doar dacă răspunde și întârzierea ei nu depășește max_lag secunde;
+# altfel citirile revin pe primar până când replica recuperează.
+#
+# Întârzierea se măsoară pe toate scrierile, nu doar pe catalog: procesul care citește de pe replici
+# scrie periodic pe primar un rând heartbeat (replication_heartbeat), replicat în ordine odată cu
+# evaluările, watchlist-urile etc. Diferența dintre heartbeat-ul de pe primar și cel de pe replică este
+# întârzierea, cu o rezoluție de HEARTBEAT_INTERVAL. Pe MySQL se folosește direct Seconds_Behind_Source.
+
+REPLICA_MAX_LAG = 5.0
+LAG_CHECK_INTERVAL = 2.0
+HEARTBEAT_INTERVAL = 1.0
+HEARTBEAT = 'primary'
+
+
+def mysql_replication_lag(conn) -> Optional[float]:
+    # Seconds_Behind_Source din SHOW REPLICA STATUS (MySQL 8.0.22+); None dacă serverul nu e configurat ca replică
+    try:
+        row = conn.exec_driver_sql("SHOW REPLICA STATUS").mappings().first()
+    except Exception:
+        return None
+    if row is None:
+        return None
+    lag = row.get('Seconds_Behind_Source')
+    # NULL: firul de replicare este oprit, replica nu mai primește modificări
+    return float('inf') if lag is None else float(lag)
+
+
+def create_heartbeat_table(conn):
+    # Milisecunde epoch ca BIGINT, comparabile pe orice dialect
+    conn.execute(text("""
+        CREATE TABLE IF NOT EXISTS replication_heartbeat (
+            name VARCHAR(50) PRIMARY KEY,
+            beat_ms BIGINT NOT NULL
+        )
+    """))
+
+
+def write_heartbeat(conn, name: str = HEARTBEAT):
+    # UPDATE + INSERT ca bump_data_version; tabela există deja (create_heartbeat_table)
+    now = int(time.time() * 1000)
+    updated = conn.execute(text("UPDATE replication_heartbeat SET beat_ms = :now WHERE name = :name"),
+                           {'now': now, 'name': name}).rowcount
+    if not updated:
+        conn.execute(text("INSERT INTO replication_heartbeat (name, beat_ms) VALUES (:name, :now)"),
+                     {'now': now, 'name': name})
+
+
+def read_heartbeat(conn, name: str = HEARTBEAT) -> Optional[int]:
+    # None: tabela sau rândul nu au ajuns încă pe această bază
+    try:
+        return conn.execute(text("SELECT beat_ms FROM replication_heartbeat WHERE name = :name"),
+                            {'name': name}).scalar()
+    except Exception:
+        conn.rollback()
+        return None
+
+
+class ReplicaRouter:
+    def __init__(self, primary, replicas: Sequence = (), max_lag: float = REPLICA_MAX_LAG,
+                 check_interval: float = LAG_CHECK_INTERVAL, heartbeat_interval: float = HEARTBEAT_INTERVAL):
+        self.primary = primary
+        self.replicas = list(replicas)
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.heartbeat_interval = heartbeat_interval
+        self.lags: Dict[int, Optional[float]] = {}
+        self.checked_at: Dict[int, float] = {}
+        self.lock = threading.Lock()
+        self.heartbeat_thread: Optional[threading.Thread] = None
+        self.heartbeat_table = False
+        self.stopped = threading.Event()
+
+    def beat(self) -> bool:
+        try:
+            with self.primary.begin() as conn:
+                # DDL o singură dată per proces, nu la fiecare bătaie: pe MySQL CREATE TABLE face commit
+                # implicit și ia metadata lock chiar dacă tabela există
+                if not self.heartbeat_table:
+                    create_heartbeat_table(conn)
+                write_heartbeat(conn)
+            self.heartbeat_table = True
+            return True
+        except Exception as e:
+            logger.warning(f"Heartbeat-ul de replicare nu a putut fi scris pe primar: {e}")
+            return False
+
+    def _heartbeat_loop(self):
+        while not self.stopped.wait(self.heartbeat_interval):
+            self.beat()
+
+    def start_heartbeat(self):
+        # Pornit la prima verificare a unei replici, în orice proces care citește de pe replici (API, joburi batch)
+        with self.lock:
+            if self.heartbeat_thread is not None:
+                return
+            self.stopped.clear()
+            self.heartbeat_thread = threading.Thread(target=self._heartbeat_loop, name='replication-heartbeat',
+                                                     daemon=True)
+        self.beat()
+        self.heartbeat_thread.start()
+
+    def measure_lag(self, position: int) -> Optional[float]:
+        # None = replica indisponibilă sau fără heartbeat (citirile rămân pe primar)
+        try:
+            with self.replicas[position].connect() as conn:
+                if conn.dialect.name == 'mysql':
+                    lag = mysql_replication_lag(conn)
+                    if lag is not None:
+                        return lag
+                replica_beat = read_heartbeat(conn)
+            with self.primary.connect() as conn:
+                primary_beat = read_heartbeat(conn)
+        except Exception as e:
+            logger.warning(f"Replica {position} indisponibilă: {e}")
+            return None
+
+        if primary_beat is None:
+            logger.warning("Primarul nu are heartbeat de replicare; citirile rămân pe primar")
+            return None
+        if replica_beat is None:
+            # Replica nu a primit încă nicio scriere făcută după pornirea heartbeat-ului
+            return float('inf')
+        return max(0.0, (primary_beat - replica_beat) / 1000)
+
+    def replica_lag(self, position: int) -> Optional[float]:
+        now = time.monotonic()
+        with self.lock:
+            if now - self.checked_at.get(position, float('-inf')) < self.check_interval:
+                return self.lags.get(position)
+            # Celelalte thread-uri folosesc valoarea anterioară cât timp durează verificarea
+            self.checked_at[position] = now
+
+        lag = self.measure_lag(position)
+        with self.lock:
+            first = position not in self.lags
+            previous = self.lags.get(position)
+            self.lags[position] = lag
+
+        # O replică indisponibilă este deja raportată de measure_lag
+        if lag is not None and not self._usable(lag) and (first or self._usable(previous)):
+            logger.warning(f"Replica {position} scoasă din rotație (întârziere {lag:.1f}s); citirile merg pe primar")
+        elif self._usable(lag) and not first and not self._usable(previous):
+            logger.info(f"Replica {position} a recuperat (întârziere {lag:.1f}s)")
+        return lag
+
+    def _usable(self, lag: Optional[float], max_lag: Optional[float] = None) -> bool:
+        return lag is not None and lag <= (self.max_lag if max_lag is None else max_lag)
+
+    def read_engine(self, max_lag: Optional[float] = None):
+        # Prima replică utilizabilă, în ordinea configurată: aceeași replică servește cât timp e la zi,
+        # deci cache-urile keyed pe data_version (catalogul, ETag-urile) nu oscilează între versiuni
+        if self.replicas:
+            self.start_heartbeat()
+        for position in range(len(self.replicas)):
+            if self._usable(self.replica_lag(position), max_lag):
+                return self.replicas[position]
+        return self.primary
+
+    def dispose(self, close: bool = True):
+        self.stopped.set()
+        if self.heartbeat_thread is not None:
+            self.heartbeat_thread.join()
+            self.heartbeat_thread = None
+        for engine in (self.primary, *self.replicas):
+            engine.dispose(close=close)
@@ -0,0 +1,52 @@
+import threading
+import time
+
+from sqlalchemy import text
+
+CATALOG = 'catalog'
+
+
+def bump_data_version(conn, name: str = CATALOG):
+    # UPDATE + INSERT în loc de upsert, ca să meargă pe orice dialect
+    updated = conn.execute(text("""
+        UPDATE data_version SET version = version + 1, updated_at = CURRENT_TIMESTAMP
+        WHERE name = :name
+    """), {'name': name}).rowcount
+
+    if not updated:
+        conn.execute(text("""
+            INSERT INTO data_version (name, version, updated_at)
+            VALUES (:name, 1, CURRENT_TIMESTAMP)
+        """), {'name': name})
+
+
+def get_data_version(conn, name: str = CATALOG) -> int:
+    try:
+        version = conn.execute(text("SELECT version FROM data_version WHERE name = :name"), {'name': name}).scalar()
+    except Exception:
+        return 0
+    return int(version or 0)
+
+
+class DataVersionCache:
+    def __init__(self, name: str = CATALOG, ttl: float = 5.0):
+        self.name = name
+        self.ttl = ttl
+        self.version = None
+        self.checked_at = 0.0
+        self.lock = threading.Lock()
+
+    def get(self, conn) -> int:
+        now = time.monotonic()
+        if self.version is not None and now - self.checked_at < self.ttl:
+            return self.version
+
+        version = get_data_version(conn, self.name)
+        with self.lock:
+            self.version = version
+            self.checked_at = now
+        return version
+
+    def invalidate(self):
+        with self.lock:
+            self.version = None
@@ -0,0 +1,140 @@
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+import numpy as np
+from sqlalchemy import insert, text
+
+from api.notifications import DAILY_RECOMMENDATIONS, rebuild_notification_summary
+from auth.auth import create_access_token
+from data_processing.local_store import build_local_store, create_local_engine, load_movielens
+from database.models import AppRating, Notification, UserApplication, Watchlist
+from machine_learning.BatchRecommender import BatchRecommender
+from machine_learning.user_recommendations import compute_user_rows, write_user_rows
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Bază SQLite cu ml-latest-small și utilizatori de aplicație generați, pentru testele de încărcare:
+#
+#   python -m loadtest.fixture [--db loadtest.db] [--users 200]
+#
+# Scrie și <db>.json (manifestul): DATABASE_URL, token-urile utilizatorilor și id-urile folosite de scenarii.
+
+LOAD_USERS = 200
+# bcrypt pentru parola 'loadtest', calculat o singură dată: scenariile folosesc token-uri, nu /auth/token
+LOAD_PASSWORD_HASH = '$2b$12$D8ASkH.IwJoviW.VD5Ep8.dKLsAf.Mxn3XziDM1.Wkk49kUFaijRS'
+WATCHLIST_PER_USER = 5
+RATINGS_PER_USER = 10
+NOTIFICATIONS_PER_USER = 30
+SCENARIO_MOVIES = 500
+SEARCH_TERMS = ['star', 'love', 'man', 'the', 'war', 'night', 'Comedy', 'Drama', 'Thriller', 'Animation']
+
+
+def seed_app_users(conn, movie_ids: np.ndarray, count: int, rng: np.random.Generator) -> List[int]:
+    now = datetime.utcnow()
+    users = UserApplication.__table__
+    conn.execute(insert(users), [{
+        'email': f"load{i}@loadtest.local",
+        'password_hash': LOAD_PASSWORD_HASH,
+        'first_name': 'Load',
+        'last_name': str(i),
+        'is_active': True,
+        'created_at': now
+    } for i in range(count)])
+    user_ids = [row.id for row in conn.execute(users.select().where(users.c.email.like('%@loadtest.local')))]
+
+    watchlist, app_ratings, notifications = [], [], []
+    for user_id in user_ids:
+        picked = rng.choice(movie_ids, size=WATCHLIST_PER_USER + RATINGS_PER_USER, replace=False)
+        watchlist += [{'user_app_id': user_id, 'movie_id': int(movie_id), 'priority': 0, 'added_at': now}
+                      for movie_id in picked[:WATCHLIST_PER_USER]]
+        app_ratings += [{'user_app_id': user_id, 'movie_id': int(movie_id),
+                         'rating': float(rng.integers(1, 11)) / 2, 'timestamp': now}
+                        for movie_id in picked[WATCHLIST_PER_USER:]]
+        for i in range(NOTIFICATIONS_PER_USER):
+            daily = i % 3 == 0
+            notifications.append({
+                'user_id': user_id,
+                'title': "New Movie Recommendations" if daily else "Notification",
+                'message': "We've found some movies you might enjoy!",
+                'type': 'info',
+                'read': i >= 5,
+                'notification_metadata': json.dumps({'type': DAILY_RECOMMENDATIONS}) if daily else None,
+                'kind': DAILY_RECOMMENDATIONS if daily else None,
+                'created_at': now - timedelta(hours=i)
+            })
+
+    conn.execute(insert(Watchlist.__table__), watchlist)
+    conn.execute(insert(AppRating.__table__), app_ratings)
+    conn.execute(insert(Notification.__table__), notifications)
+    return user_ids
+
+
+def serving_tables(conn) -> Dict:
+    # Forma tabelelor citite la servire: latențele sunt comparabile doar între fixture-uri cu aceeași formă
+    similarity = conn.execute(text(
+        "SELECT method, COUNT(*) FROM movie_similarity GROUP BY method ORDER BY method"
+    )).all()
+    return {
+        'movie_similarity': {method: count for method, count in similarity},
+        'movie_recommendations': conn.execute(text("SELECT COUNT(*) FROM movie_recommendations")).scalar(),
+        'user_recommendations': conn.execute(text("SELECT COUNT(*) FROM user_recommendations")).scalar()
+    }
+
+
+def create_fixture(db_path: str, users: int = LOAD_USERS) -> Dict:
+    if os.path.exists(db_path):
+        os.remove(db_path)
+
+    database_url = f"sqlite:///{os.path.abspath(db_path)}"
+    store = create_local_engine(database_url)
+    movies, ratings = load_movielens()
+    session, catalog, stages = build_local_store(store, movies, ratings)
+    for stage, stats in stages.items():
+        logger.info(f"  {stage:<22} {stats['seconds']:>8.3f}s")
+
+    rng = np.random.default_rng(42)
+    popular = ratings.groupby('movie_id').size().sort_values(ascending=False, kind='stable')
+    movie_ids = popular.index[:SCENARIO_MOVIES].to_numpy()
+
+    try:
+        conn = session.connection()
+        user_ids = seed_app_users(conn, movie_ids, users, rng)
+        for user_id in user_ids:
+            rebuild_notification_summary(session, user_id)
+        session.flush()
+
+        # Rândurile din user_recommendations pentru watchlist-urile generate
+        conn = session.connection()
+        recommender = BatchRecommender(catalog.get(conn))
+        write_user_rows(conn, user_ids, compute_user_rows(conn, recommender, user_ids))
+        tables = serving_tables(conn)
+        session.commit()
+    finally:
+        session.close()
+
+    manifest = {
+        'database_url': database_url,
+        'created_at': datetime.utcnow().isoformat(timespec='seconds'),
+        'users': [{'id': user_id, 'token': create_access_token({'sub': str(user_id)})} for user_id in user_ids],
+        'movielens_user_ids': sorted(int(user_id) for user_id in ratings['user_id'].unique()),
+        'movie_ids': [int(movie_id) for movie_id in movie_ids],
+        'genres': sorted({genre for genres in movies['genres'] for genre in genres.split('|')} - {'(no genres listed)'}),
+        'search_terms': SEARCH_TERMS,
+        'serving_tables': tables
+    }
+    with open(f"{db_path}.json", 'w') as f:
+        json.dump(manifest, f)
+
+    logger.info(f"Fixture creat: {db_path} ({len(movies)} filme, {len(ratings)} evaluări, {len(user_ids)} utilizatori)")
+    return manifest
+
+
+if __name__ == "__main__":
+    db = sys.argv[sys.argv.index('--db') + 1] if '--db' in sys.argv else 'loadtest.db'
+    count = int(sys.argv[sys.argv.index('--users') + 1]) if '--users' in sys.argv else LOAD_USERS
+    create_fixture(db, count)
@@ -0,0 +1,242 @@
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import httpx
+import numpy as np
+
+from loadtest.scenarios import MIXES, pick_scenario
+
+# Test de încărcare pe serviciul FastAPI, cu manifestul produs de loadtest.fixture:
+#
+#   python -m loadtest.runner --manifest loadtest.db.json [--serve] [--url http://127.0.0.1:8000]
+#                             [--duration 30] [--warmup 5] [--concurrency 8] [--mix default]
+#                             [--out loadtest_reports] [--baseline loadtest_reports/<run>.json]
+#                             [--max-p99-regression 0.2]
+#
+# Cu --baseline, ieșirea este 1 dacă p99-ul unui endpoint crește cu mai mult de --max-p99-regression.
+# Peste ~15 clienți concurenți (pool_size + max_overflow ale engine-ului) cererile așteaptă conexiuni din pool.
+
+LATENCY_PERCENTILES = (50, 95, 99)
+MIN_REGRESSION_SAMPLES = 50
+SERVER_START_TIMEOUT = 60
+SERVER_STOP_TIMEOUT = 10
+
+
+def option(name: str, default=None, cast=str):
+    if name in sys.argv:
+        return cast(sys.argv[sys.argv.index(name) + 1])
+    return default
+
+
+def start_server(database_url: str, url: str) -> subprocess.Popen:
+    # Serviciul rulează pe baza fixture-ului prin DATABASE_URL
+    port = url.rsplit(':', 1)[-1].strip('/')
+    env = {**os.environ, 'DATABASE_URL': database_url}
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'uvicorn', 'api.api:app', '--port', port, '--log-level', 'warning'],
+        env=env
+    )
+
+    deadline = time.monotonic() + SERVER_START_TIMEOUT
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"Serverul s-a oprit la pornire (cod {server.returncode})")
+        try:
+            if httpx.get(f"{url}/", timeout=1).status_code == 200:
+                return server
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+
+    server.terminate()
+    raise RuntimeError(f"Serverul nu a pornit în {SERVER_START_TIMEOUT}s")
+
+
+def stop_server(server: subprocess.Popen):
+    server.terminate()
+    try:
+        server.wait(timeout=SERVER_STOP_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        # uvicorn așteaptă cererile în curs; un server blocat este oprit forțat
+        server.kill()
+        server.wait()
+
+
+async def worker(client: httpx.AsyncClient, manifest: Dict, mix, rng: random.Random, measure_from: float,
+                 stop_at: float, samples: Dict[str, List[float]], errors: Dict[str, int]):
+    while time.perf_counter() < stop_at:
+        endpoint, method, path, kwargs = pick_scenario(mix, rng)(manifest, rng)
+        started = time.perf_counter()
+        try:
+            response = await client.request(method, path, **kwargs)
+            failed = response.status_code >= 400
+        except httpx.HTTPError:
+            failed = True
+        finished = time.perf_counter()
+
+        # Cererile terminate în încălzire nu intră în statistici; cele blocate peste ea da
+        if finished < measure_from:
+            continue
+        samples[endpoint].append((finished - started) * 1000)
+        if failed:
+            errors[endpoint] += 1
+
+
+async def run_load(manifest: Dict, url: str, mix_name: str, duration: float, warmup: float,
+                   concurrency: int) -> Dict:
+    mix = MIXES[mix_name]
+    samples, errors = defaultdict(list), defaultdict(int)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(base_url=url, limits=limits, timeout=30) as client:
+        measure_from = time.perf_counter() + warmup
+        stop_at = measure_from + duration
+        await asyncio.gather(*(
+            worker(client, manifest, mix, random.Random(seed), measure_from, stop_at, samples, errors)
+            for seed in range(concurrency)
+        ))
+
+    return endpoint_stats(samples, errors, duration)
+
+
+def endpoint_stats(samples: Dict[str, List[float]], errors: Dict[str, int], duration: float) -> Dict:
+    stats = {}
+    for endpoint in sorted(samples):
+        latencies = np.array(samples[endpoint])
+        stats[endpoint] = {
+            'requests': int(len(latencies)),
+            'errors': int(errors.get(endpoint, 0)),
+            'rps': round(len(latencies) / duration, 2),
+            'latency_ms': {
+                **{f"p{p}": round(float(np.percentile(latencies, p)), 2) for p in LATENCY_PERCENTILES},
+                'mean': round(float(latencies.mean()), 2),
+                'max': round(float(latencies.max()), 2)
+            }
+        }
+    return stats
+
+
+def p99_regressions(report: Dict, baseline: Dict, threshold: float) -> List[str]:
+    regressions = []
+    for endpoint, stats in report['endpoints'].items():
+        before = baseline.get('endpoints', {}).get(endpoint)
+        # Endpoint-urile cu prea puține cereri au un p99 prea zgomotos pentru a fi comparat
+        if not before or min(before['requests'], stats['requests']) < MIN_REGRESSION_SAMPLES:
+            continue
+        old_p99, new_p99 = before['latency_ms']['p99'], stats['latency_ms']['p99']
+        if old_p99 > 0 and new_p99 > old_p99 * (1 + threshold):
+            regressions.append(f"{endpoint}: p99 {old_p99} -> {new_p99} ms ({new_p99 / old_p99 - 1:+.0%})")
+    return regressions
+
+
+def markdown_report(report: Dict, baseline: Optional[Dict], regressions: List[str]) -> str:
+    def delta(endpoint: str) -> str:
+        before = (baseline or {}).get('endpoints', {}).get(endpoint)
+        if not before:
+            return ''
+        return f" ({report['endpoints'][endpoint]['latency_ms']['p99'] - before['latency_ms']['p99']:+.2f})"
+
+    lines = [
+        f"# Load test — {report['generated_at']}",
+        "",
+        f"- Mix: {report['mix']}, concurrency {report['concurrency']}, "
+        f"{report['duration']}s measured after {report['warmup']}s warmup",
+        f"- Total: {report['total']['requests']} requests, {report['total']['rps']} req/s, "
+        f"{report['total']['errors']} errors",
+    ]
+    if report.get('serving_tables'):
+        tables = report['serving_tables']
+        similarity = ", ".join(f"{method} {count}" for method, count in tables['movie_similarity'].items())
+        lines.append(f"- Fixture: movie_similarity {similarity}; movie_recommendations "
+                     f"{tables['movie_recommendations']}; user_recommendations {tables['user_recommendations']}")
+    if baseline and baseline.get('serving_tables') != report.get('serving_tables'):
+        lines.append("- Warning: the baseline was measured on a fixture with different serving tables")
+    lines += [
+        "",
+        "| endpoint | requests | errors | req/s | p50 ms | p95 ms | p99 ms | max ms |",
+        "|---|---|---|---|---|---|---|---|",
+    ]
+    for endpoint, stats in report['endpoints'].items():
+        latency = stats['latency_ms']
+        lines.append(
+            f"| {endpoint} | {stats['requests']} | {stats['errors']} | {stats['rps']} "
+            f"| {latency['p50']} | {latency['p95']} | {latency['p99']}{delta(endpoint)} | {latency['max']} |"
+        )
+
+    if baseline:
+        lines += ["", f"p99 regressions over {report['max_p99_regression']:.0%}:"]
+        lines += [f"- {regression}" for regression in regressions] or ["- none"]
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    with open(option('--manifest', 'loadtest.db.json')) as f:
+        manifest = json.load(f)
+    url = option('--url', 'http://127.0.0.1:8000').rstrip('/')
+    duration = option('--duration', 30, float)
+    warmup = option('--warmup', 5, float)
+    concurrency = option('--concurrency', 8, int)
+    mix = option('--mix', 'default')
+    out_dir = option('--out', 'loadtest_reports')
+    baseline_path = option('--baseline')
+    threshold = option('--max-p99-regression', 0.2, float)
+
+    if mix not in MIXES:
+        sys.exit(f"Mix necunoscut: {mix} (disponibile: {', '.join(MIXES)})")
+
+    server = start_server(manifest['database_url'], url) if '--serve' in sys.argv else None
+    try:
+        print(f"Încărcare pe {url}: mix {mix}, {concurrency} clienți, {warmup}s încălzire + {duration}s măsurare")
+        endpoints = asyncio.run(run_load(manifest, url, mix, duration, warmup, concurrency))
+    finally:
+        if server:
+            stop_server(server)
+
+    requests = sum(stats['requests'] for stats in endpoints.values())
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'mix': mix,
+        'concurrency': concurrency,
+        'duration': duration,
+        'warmup': warmup,
+        'max_p99_regression': threshold,
+        'serving_tables': manifest.get('serving_tables'),
+        'total': {
+            'requests': requests,
+            'errors': sum(stats['errors'] for stats in endpoints.values()),
+            'rps': round(requests / duration, 2)
+        },
+        'endpoints': endpoints
+    }
+
+    baseline, regressions = None, []
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        regressions = p99_regressions(report, baseline, threshold)
+
+    os.makedirs(out_dir, exist_ok=True)
+    name = os.path.join(out_dir, datetime.now().strftime('loadtest-%Y%m%d-%H%M%S'))
+    with open(f"{name}.json", 'w') as f:
+        json.dump(report, f, indent=2)
+    markdown = markdown_report(report, baseline, regressions)
+    with open(f"{name}.md", 'w') as f:
+        f.write(markdown)
+
+    print()
+    print(markdown)
+    print(f"Raport scris în {name}.json și {name}.md")
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import random
+from typing import Callable, Dict, List, Tuple
+
+# A scenario picks one request: (endpoint label, method, path, httpx request kwargs).
+# The label groups the statistics, so path parameters are not part of it.
+Request = Tuple[str, str, str, Dict]
+Scenario = Callable[[Dict, random.Random], Request]
+
+
+def auth_headers(user: Dict) -> Dict:
+    return {'Authorization': f"Bearer {user['token']}"}
+
+
+def browse(manifest, rng):
+    params = {'sort_by': rng.choice(['popularity', 'rating', 'year']), 'skip': rng.choice([0, 20, 40]), 'limit': 20}
+    if rng.random() < 0.5:
+        params['genres'] = rng.sample(manifest['genres'], 2)
+    return 'GET /movies/browse', 'GET', '/movies/browse', dict(params=params)
+
+
+def search(manifest, rng):
+    body = {'query': rng.choice(manifest['search_terms']), 'limit': 10}
+    return 'POST /search', 'POST', '/search', dict(json=body)
+
+
+def movie_recommendations(manifest, rng):
+    movie_id = rng.choice(manifest['movie_ids'])
+    params = {'method': rng.choice(['hybrid', 'collaborative', 'content_based']), 'limit': 10}
+    return 'GET /movies/{id}/recommendations', 'GET', f"/movies/{movie_id}/recommendations", dict(params=params)
+
+
+def diverse_recommendations(manifest, rng):
+    movie_id = rng.choice(manifest['movie_ids'])
+    body = {'method': 'hybrid', 'limit': 10, 'diversity': 0.5}
+    return 'POST /movies/{id}/recommendations', 'POST', f"/movies/{movie_id}/recommendations", dict(json=body)
+
+
+def personalized(manifest, rng):
+    user_id = rng.choice(manifest['movielens_user_ids'])
+    return 'POST /users/{id}/recommendations', 'POST', f"/users/{user_id}/recommendations", dict(json={'limit': 10})
+
+
+def watchlist_recommendations(manifest, rng):
+    user = rng.choice(manifest['users'])
+    return 'GET /watchlist/recommendations', 'GET', '/watchlist/recommendations', dict(headers=auth_headers(user))
+
+
+def rate(manifest, rng):
+    user = rng.choice(manifest['users'])
+    params = {'movie_id': rng.choice(manifest['movie_ids']), 'rating': rng.randint(1, 10) / 2}
+    return 'POST /ratings', 'POST', '/ratings', dict(params=params, headers=auth_headers(user))
+
+
+def notifications(manifest, rng):
+    user = rng.choice(manifest['users'])
+    params = {'limit': 20, 'unread_only': rng.random() < 0.3}
+    return 'GET /notifications', 'GET', '/notifications', dict(params=params, headers=auth_headers(user))
+
+
+def notifications_summary(manifest, rng):
+    user = rng.choice(manifest['users'])
+    return 'GET /notifications/summary', 'GET', '/notifications/summary', dict(headers=auth_headers(user))
+
+
+# Weighted request mixes; weights are relative
+MIXES: Dict[str, List[Tuple[Scenario, int]]] = {
+    'default': [
+        (browse, 20),
+        (search, 15),
+        (movie_recommendations, 20),
+        (diverse_recommendations, 5),
+        (personalized, 10),
+        (watchlist_recommendations, 5),
+        (rate, 5),
+        (notifications, 10),
+        (notifications_summary, 10),
+    ],
+    'read_heavy': [
+        (browse, 30),
+        (search, 20),
+        (movie_recommendations, 30),
+        (personalized, 10),
+        (notifications_summary, 10),
+    ],
+    'write_heavy': [
+        (rate, 40),
+        (watchlist_recommendations, 20),
+        (personalized, 20),
+        (notifications, 20),
+    ],
+}
+
+
+def pick_scenario(mix: List[Tuple[Scenario, int]], rng: random.Random) -> Scenario:
+    scenarios, weights = zip(*mix)
+    return rng.choices(scenarios, weights=weights)[0]
@@ -0,0 +1,174 @@
+import logging
+from typing import Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import bindparam, text
+
+from machine_learning.GenreReranker import GENRE_BOOST_SCALE, GenreReranker
+from machine_learning.MovieCatalog import CatalogSnapshot
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Same parameters as RecommendationEngine.personalized_recommendations / hybrid_recommendations
+SEED_MOVIES = 5
+NEIGHBOURS_PER_SEED = 5
+WATCHLIST_SEEDS = 5
+WATCHLIST_PER_SEED = 3
+COLLABORATIVE_WEIGHT = 0.6
+CONTENT_WEIGHT = 0.4
+SIMILARITY_METHODS = ('item_collaborative', 'genre')
+
+
+def _expanding(sql: str, name: str):
+    return text(sql).bindparams(bindparam(name, expanding=True))
+
+
+class BatchRecommender:
+    # Vectorized versions of the engine's per-user methods for a batch of users: one query per
+    # table per batch, and the per-seed hybrid neighbour lists are cached across batches
+    def __init__(self, snapshot: CatalogSnapshot):
+        self.snapshot = snapshot
+        self.reranker = GenreReranker(snapshot)
+        self.neighbours: Dict[int, pd.DataFrame] = {}
+        self.loaded_seeds: Dict[int, set] = {}
+
+    def load_genre_weights(self, conn, user_ids: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+        rows = conn.execute(_expanding("""
+            SELECT user_id, favorite_genres FROM user_profiles WHERE user_id IN :user_ids
+        """, 'user_ids'), {'user_ids': list(user_ids)}).fetchall()
+
+        positions = {user_id: position for position, user_id in enumerate(user_ids)}
+        weights = np.zeros((len(user_ids), len(self.snapshot.genre_names)), dtype=np.float32)
+        has_profile = np.zeros(len(user_ids), dtype=bool)
+        for row in rows:
+            position = positions[row.user_id]
+            has_profile[position] = True
+            weights[position] = self.reranker.preference_vector(row.favorite_genres)
+        return weights, has_profile
+
+    def load_neighbours(self, conn, seed_ids: np.ndarray, per_seed: int = NEIGHBOURS_PER_SEED) -> pd.DataFrame:
+        # hybrid_recommendations(seed, per_seed) for every seed, sorted by seed and score
+        loaded = self.loaded_seeds.setdefault(per_seed, set())
+        neighbours = self.neighbours.get(per_seed)
+        if neighbours is None:
+            neighbours = pd.DataFrame({
+                'seed_id': pd.Series(dtype=np.int64),
+                'movie_id': pd.Series(dtype=np.int64),
+                'similarity_score': pd.Series(dtype=np.float64),
+                'hybrid_score': pd.Series(dtype=np.float64)
+            })
+
+        missing = [int(seed_id) for seed_id in seed_ids if seed_id not in loaded]
+        if missing:
+            similarities = pd.read_sql(_expanding("""
+                SELECT movie_id1 AS seed_id, movie_id2 AS movie_id, similarity_score, method
+                FROM movie_similarity
+                WHERE movie_id1 IN :seed_ids AND method IN ('item_collaborative', 'genre')
+            """, 'seed_ids'), conn, params={'seed_ids': missing})
+
+            # hybrid_recommendations: top 2*k per method, weighted sum, top k overall
+            similarities = similarities[similarities['movie_id'].isin(self.snapshot.ids)]
+            similarities = similarities.sort_values('similarity_score', ascending=False, kind='stable')
+            similarities = similarities.groupby(['seed_id', 'method']).head(per_seed * 2)
+
+            if len(similarities):
+                scores = similarities.pivot_table(
+                    index=['seed_id', 'movie_id'], columns='method', values='similarity_score', aggfunc='max'
+                ).reindex(columns=list(SIMILARITY_METHODS))
+
+                # The reported similarity_score is the collaborative one when the movie has it
+                hybrid = pd.DataFrame({
+                    'similarity_score': scores['item_collaborative'].fillna(scores['genre']),
+                    'hybrid_score': scores['item_collaborative'].fillna(0.0) * COLLABORATIVE_WEIGHT
+                                    + scores['genre'].fillna(0.0) * CONTENT_WEIGHT
+                }).reset_index()
+                hybrid = hybrid.sort_values(['seed_id', 'hybrid_score'], ascending=[True, False], kind='stable')
+                hybrid = hybrid.groupby('seed_id').head(per_seed)
+                neighbours = pd.concat([neighbours, hybrid], ignore_index=True) if len(neighbours) else hybrid
+
+            loaded.update(missing)
+            self.neighbours[per_seed] = neighbours
+
+        return neighbours[neighbours['seed_id'].isin(seed_ids)]
+
+    def rank(self, conn, user_ids: Sequence[int],
+             limit: int) -> Dict[int, List[Tuple[int, float, float, float]]]:
+        # personalized_recommendations: (movie_id, similarity_score, hybrid_score, final_score)
+        # for users with a profile
+        user_ids = [int(user_id) for user_id in user_ids]
+        weights, has_profile = self.load_genre_weights(conn, user_ids)
+        profiled = [user_id for user_id, flag in zip(user_ids, has_profile) if flag]
+
+        ranked = {user_id: [] for user_id in profiled}
+        if not profiled:
+            return ranked
+
+        rated = pd.read_sql(_expanding("""
+            SELECT user_id, movie_id FROM ratings WHERE user_id IN :user_ids ORDER BY user_id, id
+        """, 'user_ids'), conn, params={'user_ids': profiled})
+
+        seeds = rated.groupby('user_id').head(SEED_MOVIES).rename(columns={'movie_id': 'seed_id'})
+        neighbours = self.load_neighbours(conn, seeds['seed_id'].unique())
+        candidates = seeds.merge(neighbours, on='seed_id')
+
+        # Drop already rated movies; a movie reached from two seeds keeps its best score
+        candidates = candidates.merge(rated, on=['user_id', 'movie_id'], how='left', indicator=True)
+        candidates = candidates[candidates['_merge'] == 'left_only']
+        candidates = candidates.sort_values('hybrid_score', ascending=False, kind='stable')
+        candidates = candidates.drop_duplicates(['user_id', 'movie_id'])[
+            ['user_id', 'movie_id', 'similarity_score', 'hybrid_score']
+        ]
+        if not len(candidates):
+            return ranked
+
+        positions = {user_id: position for position, user_id in enumerate(user_ids)}
+        user_rows = candidates['user_id'].map(positions).to_numpy()
+        movie_rows = np.searchsorted(self.snapshot.ids, candidates['movie_id'].to_numpy())
+        genre_scores = np.einsum('ij,ij->i', weights[user_rows], self.snapshot.genre_matrix[movie_rows])
+
+        candidates['final_score'] = candidates['hybrid_score'].to_numpy() * (1 + genre_scores / GENRE_BOOST_SCALE)
+        candidates = candidates.sort_values(['user_id', 'final_score'], ascending=[True, False], kind='stable')
+        top = candidates.groupby('user_id').head(limit)
+        for user_id, group in top.groupby('user_id'):
+            ranked[int(user_id)] = list(zip(
+                group['movie_id'].astype(int).tolist(),
+                group['similarity_score'].astype(float).tolist(),
+                group['hybrid_score'].astype(float).tolist(),
+                group['final_score'].astype(float).tolist()
+            ))
+        return ranked
+
+    def recommend(self, conn, user_ids: Sequence[int], limit: int = 3) -> Dict[int, List[int]]:
+        ranked = self.rank(conn, user_ids, limit)
+
+        # Same fallback as the API: popular movies when nothing personal is available
+        popular = [movie.movie_id for movie in self.snapshot.popular(limit)]
+        return {
+            int(user_id): [movie_id for movie_id, *_ in ranked.get(int(user_id), [])] or popular
+            for user_id in user_ids
+        }
+
+    def watchlist_rank(self, conn, user_ids: Sequence[int]) -> Dict[int, List[Tuple[int, float, float]]]:
+        # /watchlist/recommendations: hybrid top-k for the first watchlist items, concatenated in order
+        watchlist = pd.read_sql(_expanding("""
+            SELECT user_app_id AS user_id, movie_id FROM watchlist WHERE user_app_id IN :user_ids
+            ORDER BY user_app_id, id
+        """, 'user_ids'), conn, params={'user_ids': [int(user_id) for user_id in user_ids]})
+
+        seeds = watchlist.groupby('user_id').head(WATCHLIST_SEEDS).rename(columns={'movie_id': 'seed_id'})
+        seeds['seed_position'] = seeds.groupby('user_id').cumcount()
+        neighbours = self.load_neighbours(conn, seeds['seed_id'].unique(), WATCHLIST_PER_SEED)
+
+        candidates = seeds.merge(neighbours, on='seed_id').sort_values(
+            ['user_id', 'seed_position', 'hybrid_score'], ascending=[True, True, False], kind='stable'
+        )
+        ranked = {int(user_id): [] for user_id in seeds['user_id'].unique()}
+        for user_id, group in candidates.groupby('user_id'):
+            ranked[int(user_id)] = list(zip(
+                group['movie_id'].astype(int).tolist(),
+                group['similarity_score'].astype(float).tolist(),
+                group['hybrid_score'].astype(float).tolist()
+            ))
+        return ranked
@@ -0,0 +1,75 @@
+import json
+import logging
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from machine_learning.MovieCatalog import CatalogSnapshot
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# final_score = base_score * (1 + genre_match / GENRE_BOOST_SCALE), as in personalized_recommendations
+GENRE_BOOST_SCALE = 100.0
+PROFILE_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=PROFILE_CACHE_SIZE)
+def parse_favorite_genres(raw: Optional[str]) -> Tuple[Tuple[str, float], ...]:
+    # user_profiles.favorite_genres was written with str(dict) by older preprocessing runs
+    if not raw:
+        return ()
+    try:
+        favorite_genres = json.loads(raw.replace("'", '"'))
+    except ValueError:
+        logger.warning("Unreadable favorite_genres in user profile")
+        return ()
+    return tuple((str(genre), float(weight)) for genre, weight in favorite_genres.items())
+
+
+class GenreReranker:
+    # Genre preference boost for any candidate list: the user's preferences are a dense float32
+    # vector over the catalog's genres, scored against the candidate x genre matrix in one product
+    def __init__(self, snapshot: CatalogSnapshot):
+        self.snapshot = snapshot
+        self.genre_columns = {name: column for column, name in enumerate(snapshot.genre_names)}
+
+    def preference_vector(self, favorite_genres) -> np.ndarray:
+        # Accepts the raw user_profiles JSON or an already parsed {genre: weight} dict
+        if favorite_genres is None or isinstance(favorite_genres, str):
+            favorite_genres = parse_favorite_genres(favorite_genres)
+        elif isinstance(favorite_genres, dict):
+            favorite_genres = favorite_genres.items()
+
+        vector = np.zeros(len(self.genre_columns), dtype=np.float32)
+        for genre, weight in favorite_genres:
+            column = self.genre_columns.get(genre)
+            if column is not None:
+                vector[column] = weight
+        return vector
+
+    def genre_scores(self, movie_ids: Sequence[int], preferences: np.ndarray) -> np.ndarray:
+        rows = np.fromiter((self.snapshot.index.get(movie_id, -1) for movie_id in movie_ids),
+                           dtype=np.int64, count=len(movie_ids))
+        scores = np.zeros(len(rows), dtype=np.float32)
+        known = rows >= 0
+        scores[known] = self.snapshot.genre_matrix[rows[known]] @ preferences
+        return scores
+
+    def boost(self, base_scores: np.ndarray, movie_ids: Sequence[int], preferences: np.ndarray) -> np.ndarray:
+        return base_scores * (1 + self.genre_scores(movie_ids, preferences) / GENRE_BOOST_SCALE)
+
+    def rerank(self, recommendations: List[Dict], preferences: Optional[np.ndarray],
+               score_key: str = 'hybrid_score') -> List[Dict]:
+        # Sets final_score on every recommendation and sorts by it (stable for ties)
+        if not recommendations or preferences is None:
+            return recommendations
+
+        base_scores = np.array([rec.get(score_key) or 0.0 for rec in recommendations], dtype=np.float64)
+        final_scores = self.boost(base_scores, [rec['movie_id'] for rec in recommendations], preferences)
+        for rec, final_score in zip(recommendations, final_scores.tolist()):
+            rec['final_score'] = final_score
+
+        order = np.argsort(-final_scores, kind='stable')
+        return [recommendations[i] for i in order]
@@ -0,0 +1,270 @@
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+from sqlalchemy import text
+
+from database.genres import load_genres, load_movie_genre_masks
+from database.versioning import DataVersionCache
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+SORT_KEYS = ('popularity', 'rating', 'year', 'title')
+POPULAR_MIN_VOTES = 11
+
+
+def _optional_int(value) -> Optional[int]:
+    return None if value is None or np.isnan(value) else int(value)
+
+
+def _optional_float(value) -> Optional[float]:
+    return None if value is None or np.isnan(value) else float(value)
+
+
+class MovieRow:
+    # Lightweight view over one row of a snapshot; nothing is copied until to_dict()
+    __slots__ = ('snapshot', 'row')
+
+    def __init__(self, snapshot: 'CatalogSnapshot', row: int):
+        self.snapshot = snapshot
+        self.row = row
+
+    @property
+    def movie_id(self) -> int:
+        return int(self.snapshot.ids[self.row])
+
+    @property
+    def title(self) -> str:
+        return self.snapshot.titles[self.row]
+
+    @property
+    def year(self) -> Optional[int]:
+        return int(self.snapshot.years[self.row]) or None
+
+    @property
+    def genres(self) -> Optional[str]:
+        return self.snapshot.genres[self.row]
+
+    @property
+    def genre_mask(self) -> int:
+        return int(self.snapshot.genre_masks[self.row])
+
+    @property
+    def poster_path(self) -> Optional[str]:
+        return self.snapshot.poster_paths[self.row]
+
+    @property
+    def overview(self) -> Optional[str]:
+        return self.snapshot.overviews[self.row]
+
+    @property
+    def average_rating(self) -> Optional[float]:
+        return _optional_float(self.snapshot.avg_ratings[self.row])
+
+    @property
+    def rating_count(self) -> Optional[int]:
+        if not self.snapshot.has_stats[self.row]:
+            return None
+        return int(self.snapshot.rating_counts[self.row])
+
+    @property
+    def popularity(self) -> Optional[float]:
+        return _optional_float(self.snapshot.popularity[self.row])
+
+    @property
+    def imdb_id(self) -> Optional[str]:
+        return self.snapshot.imdb_ids[self.row]
+
+    @property
+    def tmdb_id(self) -> Optional[int]:
+        return _optional_int(self.snapshot.tmdb_ids[self.row])
+
+    def to_dict(self, include_overview: bool = True) -> Dict:
+        movie_id = self.movie_id
+        movie = {
+            'id': movie_id,
+            'movie_id': movie_id,
+            'title': self.title,
+            'year': self.year,
+            'genres': self.genres,
+            'poster_path': self.poster_path,
+            'average_rating': self.average_rating,
+            'rating_count': self.rating_count,
+            'imdb_id': self.imdb_id,
+            'tmdb_id': self.tmdb_id
+        }
+        if include_overview:
+            movie['overview'] = self.overview
+        return movie
+
+
+class CatalogSnapshot:
+    # Immutable numpy columns over movies + movie_stats; a request only ever reads one snapshot
+    def __init__(self, version: int, movies: pd.DataFrame, masks: pd.Series, genre_ids: Dict[str, int]):
+        self.version = version
+        self.size = len(movies)
+
+        self.ids = movies['id'].to_numpy(dtype=np.int64)
+        self.index = {movie_id: row for row, movie_id in enumerate(self.ids.tolist())}
+        self.titles = movies['title'].to_numpy(dtype=object)
+        self.years = movies['year'].astype(float).fillna(0).to_numpy(dtype=np.int32)
+        self.genres = movies['genres'].to_numpy(dtype=object)
+        self.poster_paths = movies['poster_path'].to_numpy(dtype=object)
+        self.overviews = movies['overview'].to_numpy(dtype=object)
+        self.imdb_ids = movies['imdb_id'].to_numpy(dtype=object)
+        self.tmdb_ids = movies['tmdb_id'].astype(float).to_numpy()
+        self.avg_ratings = movies['avg_rating'].astype(float).to_numpy()
+        self.has_stats = movies['rating_count'].notna().to_numpy()
+        self.rating_counts = movies['rating_count'].astype(float).fillna(0).to_numpy(dtype=np.int64)
+        self.popularity = self.avg_ratings * np.log(self.rating_counts + 1)
+        self.genre_masks = masks.reindex(self.ids, fill_value=0).to_numpy(dtype=np.uint64)
+
+        # One bitset (bool vector) per genre, used for facet counts
+        self.genre_names = list(genre_ids)
+        self.genre_ids = genre_ids
+        shifts = np.array([genre_ids[name] - 1 for name in self.genre_names], dtype=np.uint64)
+        self.genre_bitsets = ((self.genre_masks[None, :] >> shifts[:, None]) & np.uint64(1)).astype(bool)
+        # movies x genres, for scoring candidates against a user's genre preference vector
+        self.genre_matrix = np.ascontiguousarray(self.genre_bitsets.T, dtype=np.float32)
+
+        self.orders = {
+            'popularity': np.argsort(-np.nan_to_num(self.popularity, nan=-np.inf), kind='stable'),
+            'rating': np.argsort(-np.nan_to_num(self.avg_ratings, nan=-np.inf), kind='stable'),
+            'year': np.argsort(-self.years, kind='stable'),
+            'title': np.argsort(self.titles, kind='stable')
+        }
+
+    def get(self, movie_id: int) -> Optional[MovieRow]:
+        row = self.index.get(movie_id)
+        return MovieRow(self, row) if row is not None else None
+
+    def get_many(self, movie_ids: Iterable[int]) -> List[MovieRow]:
+        # Keeps the requested order; unknown ids are skipped
+        rows = (self.index.get(movie_id) for movie_id in movie_ids)
+        return [MovieRow(self, row) for row in rows if row is not None]
+
+    def popular(self, limit: int = 10, min_votes: int = POPULAR_MIN_VOTES) -> List[MovieRow]:
+        ordered = self.orders['popularity']
+        ordered = ordered[self.rating_counts[ordered] >= min_votes]
+        return [MovieRow(self, int(row)) for row in ordered[:limit]]
+
+    def page(self, sort_by: str = 'popularity', skip: int = 0, limit: int = 100) -> List[MovieRow]:
+        if sort_by not in self.orders:
+            raise ValueError(f"sort_by must be one of: {', '.join(SORT_KEYS)}")
+        # Negative bounds would turn into slices from the end of the catalogue
+        if skip < 0 or limit < 0:
+            raise ValueError("skip and limit must not be negative")
+        ordered = self.orders[sort_by]
+        return [MovieRow(self, int(row)) for row in ordered[skip:skip + limit]]
+
+    def query_mask(self, genres: List[str]) -> int:
+        unknown = [genre for genre in genres if genre not in self.genre_ids]
+        if unknown:
+            raise ValueError(f"Unknown genres: {', '.join(unknown)}")
+        mask = 0
+        for genre in genres:
+            mask |= 1 << (self.genre_ids[genre] - 1)
+        return mask
+
+    def browse(self, genres: Optional[List[str]] = None, match_all: bool = False,
+               year_min: Optional[int] = None, year_max: Optional[int] = None,
+               min_rating: Optional[float] = None, min_votes: Optional[int] = None,
+               sort_by: str = 'popularity', skip: int = 0, limit: int = 20) -> Dict:
+        if sort_by not in self.orders:
+            raise ValueError(f"sort_by must be one of: {', '.join(SORT_KEYS)}")
+
+        everything = np.ones(self.size, dtype=bool)
+
+        genre_filter = everything
+        if genres:
+            query_mask = np.uint64(self.query_mask(genres))
+            matched = self.genre_masks & query_mask
+            genre_filter = matched == query_mask if match_all else matched != 0
+
+        year_filter = everything
+        if year_min is not None:
+            year_filter = year_filter & (self.years >= year_min)
+        if year_max is not None:
+            year_filter = year_filter & (self.years <= year_max) & (self.years > 0)
+
+        rating_filter = everything
+        if min_rating is not None:
+            rating_filter = self.avg_ratings >= min_rating
+
+        votes_filter = everything
+        if min_votes is not None:
+            votes_filter = self.rating_counts >= min_votes
+
+        selected = genre_filter & year_filter & rating_filter & votes_filter
+        ordered = self.orders[sort_by]
+        ordered = ordered[selected[ordered]]
+        page = ordered[skip:skip + limit]
+
+        # Each facet is counted without its own filter so it shows the alternatives
+        return {
+            'total': int(len(ordered)),
+            'results': [MovieRow(self, int(row)).to_dict(include_overview=False) for row in page],
+            'facets': {
+                'genres': self.genre_facet(year_filter & rating_filter & votes_filter),
+                'decades': self.decade_facet(genre_filter & rating_filter & votes_filter),
+                'min_rating': self.rating_facet(genre_filter & year_filter & votes_filter)
+            }
+        }
+
+    def genre_facet(self, selected: np.ndarray) -> Dict[str, int]:
+        counts = np.count_nonzero(self.genre_bitsets & selected, axis=1)
+        return {name: int(count) for name, count in zip(self.genre_names, counts) if count}
+
+    def decade_facet(self, selected: np.ndarray) -> Dict[str, int]:
+        years = self.years[selected]
+        decades, counts = np.unique(years[years > 0] // 10 * 10, return_counts=True)
+        return {str(decade): int(count) for decade, count in zip(decades, counts)}
+
+    def rating_facet(self, selected: np.ndarray) -> Dict[str, int]:
+        # Cumulative: how many movies have an average >= threshold
+        ratings = self.avg_ratings[selected]
+        ratings = ratings[~np.isnan(ratings)]
+        return {str(threshold): int(np.count_nonzero(ratings >= threshold)) for threshold in range(1, 6)}
+
+
+class MovieCatalog:
+    def __init__(self, ttl: float = 5.0):
+        self.version_cache = DataVersionCache(ttl=ttl)
+        self.snapshot: Optional[CatalogSnapshot] = None
+        self.lock = threading.Lock()
+
+    def load_snapshot(self, conn, version: int) -> CatalogSnapshot:
+        movies = pd.read_sql(text("""
+            SELECT m.id, m.title, m.year, m.genres, m.poster_path, m.overview,
+                   m.imdb_id, m.tmdb_id, ms.avg_rating, ms.rating_count
+            FROM movies m
+            LEFT JOIN movie_stats ms ON m.id = ms.movie_id
+            ORDER BY m.id
+        """), conn)
+        return CatalogSnapshot(version, movies, load_movie_genre_masks(conn), load_genres(conn))
+
+    def get(self, conn) -> CatalogSnapshot:
+        version = self.version_cache.get(conn)
+        snapshot = self.snapshot
+        if snapshot is not None and snapshot.version == version:
+            return snapshot
+
+        # A single thread reloads; the others keep serving the previous snapshot meanwhile
+        if not self.lock.acquire(blocking=snapshot is None):
+            return snapshot
+        try:
+            if self.snapshot is None or self.snapshot.version != version:
+                self.snapshot = self.load_snapshot(conn, version)
+                logger.info(f"Movie catalog loaded: {self.snapshot.size} movies (version {version})")
+            return self.snapshot
+        finally:
+            self.lock.release()
+
+    def invalidate(self):
+        self.version_cache.invalidate()
+
+
+movie_catalog = MovieCatalog()
@@ -3,84 +3,179 @@ import numpy as np
 import pandas as pd
 from sqlalchemy import text
 from database.connection import SessionLocal
+from machine_learning.BatchRecommender import WATCHLIST_PER_SEED, WATCHLIST_SEEDS
+from machine_learning.GenreReranker import GenreReranker
+from machine_learning.diversity import DIVERSITY_POOL_FACTOR, diversify
+from machine_learning.MovieCatalog import CatalogSnapshot, movie_catalog
+from machine_learning.user_recommendations import PERSONALIZED, USER_TOP_K, WATCHLIST
 import json
 import logging
+import orjson
 from sklearn.preprocessing import StandardScaler
 from typing import List, Dict, Optional, Tuple
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+SERVING_TOP_K = 50  # same as DataPreprocessor.SERVING_TOP_K
+
 
 class RecommendationEngine:
-    def __init__(self):
-        self.session = SessionLocal()
+    def __init__(self, session=None, catalog=None):
+        self.session = session or SessionLocal()
         self.engine = self.session.bind
+        self.catalog = catalog or movie_catalog
+        self.reranker: Optional[GenreReranker] = None
+
+    def get_catalog(self) -> CatalogSnapshot:
+        return self.catalog.get(self.session.connection())
+
+    def get_reranker(self) -> GenreReranker:
+        snapshot = self.get_catalog()
+        if self.reranker is None or self.reranker.snapshot is not snapshot:
+            self.reranker = GenreReranker(snapshot)
+        return self.reranker
+
+    def user_genre_preferences(self, user_id: int) -> Optional[np.ndarray]:
+        row = self.session.execute(text("""
+            SELECT favorite_genres FROM user_profiles WHERE user_id = :user_id
+        """), {"user_id": user_id}).first()
+        if row is None:
+            return None
+        return self.get_reranker().preference_vector(row.favorite_genres)
+
+    def rerank_for_user(self, user_id: int, recommendations: List[Dict],
+                        score_key: str = 'hybrid_score') -> List[Dict]:
+        # Genre preference boost for any candidate list (watchlist, daily, chatbot)
+        try:
+            preferences = self.user_genre_preferences(user_id)
+            return self.get_reranker().rerank(recommendations, preferences, score_key)
+
+        except Exception as e:
+            logger.error(f"Error re-ranking recommendations: {e}")
+            return recommendations
+
+    def diversify(self, recommendations: List[Dict], limit: int, diversity: float,
+                  score_key: str = 'hybrid_score') -> List[Dict]:
+        # MMR over a candidate pool (callers fetch limit * DIVERSITY_POOL_FACTOR candidates)
+        try:
+            return diversify(recommendations, self.get_catalog(), limit, diversity, score_key)
+
+        except Exception as e:
+            logger.error(f"Error diversifying recommendations: {e}")
+            return recommendations[:limit]
 
     def get_movie_details(self, movie_id: int) -> Dict:
         try:
-            query = text("""
-                SELECT m.id, m.title, m.year, m.genres, m.poster_path, 
-                       m.overview, m.tmdb_id, m.imdb_id,
-                       ms.avg_rating, ms.rating_count
-                FROM movies m
-                LEFT JOIN movie_stats ms ON m.id = ms.movie_id
-                WHERE m.id = :movie_id
-            """)
-            result = self.session.execute(query, {"movie_id": movie_id}).first()
-
-            if result:
-                return {
-                    'id': result.id,
-                    'title': result.title,
-                    'year': result.year,
-                    'genres': result.genres,
-                    'poster_path': result.poster_path,  # Include this
-                    'overview': result.overview,
-                    'average_rating': result.avg_rating,
-                    'rating_count': result.rating_count,
-                    'imdb_id': result.imdb_id,
-                    'tmdb_id': result.tmdb_id
-                }
-            return None
+            movie = self.get_catalog().get(movie_id)
+            return movie.to_dict() if movie else None
 
         except Exception as e:
             logger.error(f"Error getting movie details: {e}")
             return None
 
+    def get_movies_details(self, movie_ids: List[int]) -> List[Dict]:
+        try:
+            if not movie_ids:
+                return []
+
+            # Păstrăm ordinea cerută; id-urile inexistente sunt omise
+            movies = self.get_catalog().get_many(dict.fromkeys(movie_ids))
+            return [movie.to_dict() for movie in movies]
+
+        except Exception as e:
+            logger.error(f"Error getting movie details batch: {e}")
+            return []
+
+    def _hydrate_neighbours(self, scores: Dict[int, float], method: str) -> List[Dict]:
+        # Metadata (title, poster, stats) always comes from the current catalog snapshot
+        recommendations = []
+        for movie in self.get_catalog().get_many(scores):
+            rec = movie.to_dict(include_overview=False)
+            rec['similarity_score'] = scores[movie.movie_id]
+            rec['method'] = method
+            recommendations.append(rec)
+        return recommendations
+
+    def _serving_recommendations(self, movie_id: int, method: str, limit: int,
+                                 served_as: str) -> Optional[List[Dict]]:
+        # O singură citire după cheia primară din movie_recommendations (scrisă de DataPreprocessor)
+        try:
+            row = self.session.execute(text("""
+                SELECT recommendations
+                FROM movie_recommendations
+                WHERE movie_id = :movie_id AND method = :method
+            """), {"movie_id": movie_id, "method": method}).first()
+        except Exception as e:
+            logger.warning(f"movie_recommendations unavailable, falling back to movie_similarity: {e}")
+            self.session.rollback()
+            return None
+
+        if row is None:
+            return None
+
+        entries = orjson.loads(row.recommendations)
+        if entries and not isinstance(entries[0], list):
+            # Rows written before the [movie_id, score] format carry stale metadata; read movie_similarity
+            return None
+        if len(entries) < limit and len(entries) >= SERVING_TOP_K:
+            # The list was truncated at top-k; larger limits go to movie_similarity
+            return None
+        return self._hydrate_neighbours(dict(entries[:limit]), served_as)
+
+    def _stored_user_recommendations(self, user_id: int, kind: str, limit: int) -> Optional[List[Dict]]:
+        # Lists precomputed by machine_learning.user_recommendations; None means compute online
+        try:
+            row = self.session.execute(text("""
+                SELECT recommendations
+                FROM user_recommendations
+                WHERE user_id = :user_id AND kind = :kind
+            """), {"user_id": user_id, "kind": kind}).first()
+        except Exception as e:
+            logger.warning(f"user_recommendations unavailable, computing online: {e}")
+            self.session.rollback()
+            return None
+
+        if row is None:
+            return None
+
+        entries = orjson.loads(row.recommendations)
+        if len(entries) < limit and len(entries) >= USER_TOP_K:
+            return None
+
+        catalog = self.get_catalog()
+        recommendations = []
+        for movie_id, similarity_score, hybrid_score, *final_score in entries[:limit]:
+            movie = catalog.get(movie_id)
+            if movie is None:
+                continue
+            rec = movie.to_dict(include_overview=False)
+            rec['similarity_score'] = similarity_score
+            rec['hybrid_score'] = hybrid_score
+            if final_score:
+                rec['final_score'] = final_score[0]
+            rec['method'] = 'hybrid'
+            recommendations.append(rec)
+        return recommendations
+
     def collaborative_filtering_recommendations(self, movie_id: int, limit: int = 10) -> List[Dict]:
         try:
+            recommendations = self._serving_recommendations(movie_id, 'item_collaborative', limit,
+                                                            'collaborative_filtering')
+            if recommendations is not None:
+                return recommendations
+
             query = text("""
-                SELECT ms.movie_id2 as similar_movie_id, ms.similarity_score,
-                       m.title, m.year, m.genres, m.poster_path, m.tmdb_id, m.imdb_id,
-                       mst.avg_rating, mst.rating_count
-                FROM movie_similarity ms
-                JOIN movies m ON ms.movie_id2 = m.id
-                LEFT JOIN movie_stats mst ON m.id = mst.movie_id
-                WHERE ms.movie_id1 = :movie_id AND ms.method = 'item_collaborative'
-                ORDER BY ms.similarity_score DESC
+                SELECT movie_id2 as similar_movie_id, similarity_score
+                FROM movie_similarity
+                WHERE movie_id1 = :movie_id AND method = 'item_collaborative'
+                ORDER BY similarity_score DESC
                 LIMIT :limit
             """)
 
             results = self.session.execute(query, {"movie_id": movie_id, "limit": limit}).fetchall()
-
-            recommendations = []
-            for row in results:
-                recommendations.append({
-                    'movie_id': row.similar_movie_id,
-                    'title': row.title,
-                    'year': row.year,
-                    'genres': row.genres,
-                    'poster_path': row.poster_path,  # Include this
-                    'tmdb_id': row.tmdb_id,
-                    'imdb_id': row.imdb_id,
-                    'similarity_score': row.similarity_score,
-                    'average_rating': row.avg_rating,
-                    'rating_count': row.rating_count,
-                    'method': 'collaborative_filtering'
-                })
-
-            return recommendations
+            return self._hydrate_neighbours({row.similar_movie_id: row.similarity_score for row in results},
+                                            'collaborative_filtering')
 
         except Exception as e:
             logger.error(f"Error in collaborative filtering: {e}")
@@ -88,37 +183,21 @@ class RecommendationEngine:
 
     def content_based_recommendations(self, movie_id: int, limit: int = 10) -> List[Dict]:
         try:
+            recommendations = self._serving_recommendations(movie_id, 'genre', limit, 'content_based')
+            if recommendations is not None:
+                return recommendations
+
             query = text("""
-                SELECT ms.movie_id2 as similar_movie_id, ms.similarity_score,
-                       m.title, m.year, m.genres, m.poster_path, m.tmdb_id, m.imdb_id,
-                       mst.avg_rating, mst.rating_count
-                FROM movie_similarity ms
-                JOIN movies m ON ms.movie_id2 = m.id
-                LEFT JOIN movie_stats mst ON m.id = mst.movie_id
-                WHERE ms.movie_id1 = :movie_id AND ms.method = 'genre'
-                ORDER BY ms.similarity_score DESC
+                SELECT movie_id2 as similar_movie_id, similarity_score
+                FROM movie_similarity
+                WHERE movie_id1 = :movie_id AND method = 'genre'
+                ORDER BY similarity_score DESC
                 LIMIT :limit
             """)
 
             results = self.session.execute(query, {"movie_id": movie_id, "limit": limit}).fetchall()
-
-            recommendations = []
-            for row in results:
-                recommendations.append({
-                    'movie_id': row.similar_movie_id,
-                    'title': row.title,
-                    'year': row.year,
-                    'genres': row.genres,
-                    'poster_path': row.poster_path,  # Include this
-                    'tmdb_id': row.tmdb_id,
-                    'imdb_id': row.imdb_id,
-                    'similarity_score': row.similarity_score,
-                    'average_rating': row.avg_rating,
-                    'rating_count': row.rating_count,
-                    'method': 'content_based'
-                })
-
-            return recommendations
+            return self._hydrate_neighbours({row.similar_movie_id: row.similarity_score for row in results},
+                                            'content_based')
 
         except Exception as e:
             logger.error(f"Error in content-based recommendations: {e}")
@@ -126,10 +205,12 @@ class RecommendationEngine:
 
     def hybrid_recommendations(self, movie_id: int, limit: int = 10,
                                collaborative_weight: float = 0.6,
-                               content_weight: float = 0.4) -> List[Dict]:
+                               content_weight: float = 0.4,
+                               diversity: float = 0.0) -> List[Dict]:
         try:
-            cf_recs = self.collaborative_filtering_recommendations(movie_id, limit * 2)
-            cb_recs = self.content_based_recommendations(movie_id, limit * 2)
+            pool = limit * DIVERSITY_POOL_FACTOR if diversity > 0 else limit
+            cf_recs = self.collaborative_filtering_recommendations(movie_id, pool * 2)
+            cb_recs = self.content_based_recommendations(movie_id, pool * 2)
 
             movie_scores = {}
 
@@ -157,7 +238,7 @@ class RecommendationEngine:
                 movie_scores.items(),
                 key=lambda x: x[1]['hybrid_score'],
                 reverse=True
-            )[:limit]
+            )[:pool]
 
             recommendations = []
             for movie_id, scores in sorted_movies:
@@ -166,26 +247,29 @@ class RecommendationEngine:
                 rec['method'] = 'hybrid'
                 recommendations.append(rec)
 
+            if diversity > 0:
+                return self.diversify(recommendations, limit, diversity)
             return recommendations
 
         except Exception as e:
             logger.error(f"Error in hybrid recommendations: {e}")
             return []
 
-    def personalized_recommendations(self, user_id: int, limit: int = 10) -> List[Dict]:
+    def personalized_recommendations(self, user_id: int, limit: int = 10, diversity: float = 0.0) -> List[Dict]:
+        if diversity > 0:
+            candidates = self.personalized_recommendations(user_id, limit * DIVERSITY_POOL_FACTOR)
+            score_key = 'final_score' if candidates and 'final_score' in candidates[0] else 'popularity_score'
+            return self.diversify(candidates, limit, diversity, score_key)
+
         try:
-            query = text("""
-                SELECT favorite_genres, avg_rating, rating_count
-                FROM user_profiles
-                WHERE user_id = :user_id
-            """)
-            user_profile = self.session.execute(query, {"user_id": user_id}).first()
+            recommendations = self._stored_user_recommendations(user_id, PERSONALIZED, limit)
+            if recommendations is not None:
+                return recommendations
 
-            if not user_profile:
+            preferences = self.user_genre_preferences(user_id)
+            if preferences is None:
                 return self.get_popular_movies(limit)
 
-            favorite_genres = json.loads(user_profile.favorite_genres.replace("'", '"'))
-
             query = text("""
                 SELECT movie_id
                 FROM ratings
@@ -198,58 +282,46 @@ class RecommendationEngine:
                 movie_recs = self.hybrid_recommendations(movie_id, 5)
                 recommendations.extend(movie_recs)
 
-            recommendations = [r for r in recommendations if r['movie_id'] not in rated_movies]
-
-            for rec in recommendations:
-                if rec['genres']:
-                    genre_match_score = 0
-                    for genre in rec['genres'].split('|'):
-                        if genre in favorite_genres:
-                            genre_match_score += favorite_genres[genre]
-                    rec['final_score'] = rec['hybrid_score'] * (1 + genre_match_score / 100)
-                else:
-                    rec['final_score'] = rec['hybrid_score']
-
-            recommendations.sort(key=lambda x: x['final_score'], reverse=True)
+            rated = set(rated_movies)
+            recommendations = [r for r in recommendations if r['movie_id'] not in rated]
 
-            return recommendations[:limit]
+            return self.get_reranker().rerank(recommendations, preferences)[:limit]
 
         except Exception as e:
             logger.error(f"Error in personalized recommendations: {e}")
             return []
 
-    def get_popular_movies(self, limit: int = 10) -> List[Dict]:
+    def watchlist_recommendations(self, user_id: int) -> List[Dict]:
         try:
+            recommendations = self._stored_user_recommendations(user_id, WATCHLIST, USER_TOP_K)
+            if recommendations is not None:
+                return self.rerank_for_user(user_id, recommendations)
+
             query = text("""
-                SELECT m.id as movie_id, m.title, m.year, m.genres,
-                       m.poster_path, m.tmdb_id, m.imdb_id, m.overview,
-                       ms.avg_rating, ms.rating_count,
-                       (ms.avg_rating * LOG(ms.rating_count + 1)) as popularity_score
-                FROM movies m
-                LEFT JOIN movie_stats ms ON m.id = ms.movie_id
-                WHERE ms.rating_count > 10
-                ORDER BY popularity_score DESC
-                LIMIT :limit
+                SELECT movie_id
+                FROM watchlist
+                WHERE user_app_id = :user_id
+                ORDER BY id
+                LIMIT :seeds
             """)
+            recommendations = []
+            for row in self.session.execute(query, {"user_id": user_id, "seeds": WATCHLIST_SEEDS}).fetchall():
+                recommendations.extend(self.hybrid_recommendations(row.movie_id, WATCHLIST_PER_SEED))
 
-            results = self.session.execute(query, {"limit": limit}).fetchall()
+            return self.rerank_for_user(user_id, recommendations)
 
+        except Exception as e:
+            logger.error(f"Error in watchlist recommendations: {e}")
+            return []
+
+    def get_popular_movies(self, limit: int = 10) -> List[Dict]:
+        try:
             recommendations = []
-            for row in results:
-                recommendations.append({
-                    'movie_id': row.movie_id,
-                    'title': row.title,
-                    'year': row.year,
-                    'genres': row.genres,
-                    'poster_path': row.poster_path,  # Include this
-                    'tmdb_id': row.tmdb_id,
-                    'imdb_id': row.imdb_id,
-                    'overview': row.overview,
-                    'average_rating': row.avg_rating,
-                    'rating_count': row.rating_count,
-                    'popularity_score': row.popularity_score,
-                    'method': 'popular'
-                })
+            for movie in self.get_catalog().popular(limit):
+                rec = movie.to_dict()
+                rec['popularity_score'] = movie.popularity
+                rec['method'] = 'popular'
+                recommendations.append(rec)
 
             return recommendations
 
@@ -258,18 +330,23 @@ class RecommendationEngine:
             return []
 
     def search_movies(self, query: str, limit: int = 10) -> List[Dict]:
+        # "x IS NULL, x DESC" instead of NULLS LAST, which MySQL does not support.
+        # SQL only picks and orders the ids; the rows come from the catalog like every other movie response
         try:
             search_pattern = f"%{query}%"
             sql_query = text("""
-                SELECT m.id as movie_id, m.title, m.year, m.genres,
-                       m.poster_path, m.tmdb_id, m.imdb_id, m.overview,
-                       ms.avg_rating, ms.rating_count
+                SELECT m.id as movie_id
                 FROM movies m
                 LEFT JOIN movie_stats ms ON m.id = ms.movie_id
-                WHERE m.title LIKE :query 
-                   OR m.genres LIKE :query
-                ORDER BY ms.rating_count DESC NULLS LAST,
-                         ms.avg_rating DESC NULLS LAST
+                WHERE m.title LIKE :query
+                   OR m.id IN (
+                       SELECT mg.movie_id
+                       FROM genres g
+                       JOIN movie_genres mg ON mg.genre_id = g.id
+                       WHERE g.name LIKE :query
+                   )
+                ORDER BY ms.rating_count IS NULL, ms.rating_count DESC,
+                         ms.avg_rating IS NULL, ms.avg_rating DESC
                 LIMIT :limit
             """)
 
@@ -278,27 +355,32 @@ class RecommendationEngine:
                 "limit": limit
             }).fetchall()
 
-            search_results = []
-            for row in results:
-                search_results.append({
-                    'movie_id': row.movie_id,
-                    'title': row.title,
-                    'year': row.year,
-                    'genres': row.genres,
-                    'poster_path': row.poster_path,
-                    'tmdb_id': row.tmdb_id,
-                    'imdb_id': row.imdb_id,
-                    'overview': row.overview,
-                    'average_rating': row.avg_rating,
-                    'rating_count': row.rating_count
-                })
-
-            return search_results
+            return self.get_movies_details([row.movie_id for row in results])
 
         except Exception as e:
             logger.error(f"Error searching movies: {e}")
             return []
 
+    def search_movies_by_genre(self, genre: str, limit: int = 10) -> List[Dict]:
+        try:
+            sql_query = text("""
+                SELECT m.id as movie_id
+                FROM genres g
+                JOIN movie_genres mg ON mg.genre_id = g.id
+                JOIN movies m ON m.id = mg.movie_id
+                LEFT JOIN movie_stats ms ON m.id = ms.movie_id
+                WHERE g.name = :genre
+                ORDER BY ms.rating_count DESC, ms.avg_rating DESC
+                LIMIT :limit
+            """)
+
+            results = self.session.execute(sql_query, {"genre": genre, "limit": limit}).fetchall()
+            return self.get_movies_details([row.movie_id for row in results])
+
+        except Exception as e:
+            logger.error(f"Error searching movies by genre: {e}")
+            return []
+
     def close(self):
         self.session.close()
 
@@ -0,0 +1,54 @@
+from typing import Dict, List
+
+import numpy as np
+
+from machine_learning.MovieCatalog import CatalogSnapshot
+
+# Candidates considered by MMR per returned recommendation
+DIVERSITY_POOL_FACTOR = 3
+
+
+def mmr_select(relevance: np.ndarray, vectors: np.ndarray, limit: int, diversity: float) -> List[int]:
+    # Maximal Marginal Relevance: greedily take the candidate maximizing
+    # (1 - diversity) * relevance - diversity * max cosine similarity to the ones already taken.
+    # Candidates are expected in relevance order, so ties keep that order.
+    count = min(limit, len(relevance))
+    if count <= 0:
+        return []
+    if diversity <= 0:
+        return list(range(count))
+
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    unit = vectors / np.where(norms > 0, norms, 1)
+    similarity = unit @ unit.T
+
+    top = relevance.max()
+    relevance = relevance / top if top > 0 else relevance
+    gains = (1 - diversity) * relevance
+
+    redundancy = np.zeros(len(relevance), dtype=similarity.dtype)
+    available = np.ones(len(relevance), dtype=bool)
+    selected = []
+    for _ in range(count):
+        scores = np.where(available, gains - diversity * redundancy, -np.inf)
+        best = int(np.argmax(scores))
+        selected.append(best)
+        available[best] = False
+        np.maximum(redundancy, similarity[best], out=redundancy)
+    return selected
+
+
+def diversify(recommendations: List[Dict], snapshot: CatalogSnapshot, limit: int, diversity: float,
+              score_key: str = 'hybrid_score') -> List[Dict]:
+    # Item vectors are the catalog's genre rows; movies missing from the snapshot count as unrelated
+    if diversity <= 0 or len(recommendations) <= 1:
+        return recommendations[:limit]
+
+    rows = np.fromiter((snapshot.index.get(rec['movie_id'], -1) for rec in recommendations),
+                       dtype=np.int64, count=len(recommendations))
+    vectors = np.zeros((len(rows), snapshot.genre_matrix.shape[1]), dtype=np.float32)
+    known = rows >= 0
+    vectors[known] = snapshot.genre_matrix[rows[known]]
+
+    relevance = np.array([rec.get(score_key) or 0.0 for rec in recommendations], dtype=np.float32)
+    return [recommendations[i] for i in mmr_select(relevance, vectors, limit, diversity)]
@@ -0,0 +1,120 @@
+import logging
+import time
+from typing import Dict, List, Optional, Sequence
+
+import orjson
+from sqlalchemy import bindparam, text
+
+from database.connection import SessionLocal
+from machine_learning.BatchRecommender import BatchRecommender
+from machine_learning.MovieCatalog import movie_catalog
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+USER_TOP_K = 50
+STORE_BATCH_SIZE = 500
+# kind -> list of [movie_id, similarity_score, hybrid_score(, final_score)]
+PERSONALIZED = 'personalized'
+WATCHLIST = 'watchlist'
+
+
+def compute_user_rows(conn, recommender: BatchRecommender, user_ids: Sequence[int]) -> List[Dict]:
+    # Users without a profile / watchlist get no row and are served online (cold users)
+    rows = [{
+        'user_id': user_id,
+        'kind': PERSONALIZED,
+        'recommendations': orjson.dumps(ranked).decode()
+    } for user_id, ranked in recommender.rank(conn, user_ids, USER_TOP_K).items()]
+
+    rows += [{
+        'user_id': user_id,
+        'kind': WATCHLIST,
+        'recommendations': orjson.dumps(ranked).decode()
+    } for user_id, ranked in recommender.watchlist_rank(conn, user_ids).items()]
+    return rows
+
+
+def delete_user_rows(conn, user_ids: Sequence[int], kinds: Sequence[str] = (PERSONALIZED, WATCHLIST)):
+    conn.execute(text("""
+        DELETE FROM user_recommendations WHERE user_id IN :user_ids AND kind IN :kinds
+    """).bindparams(bindparam('user_ids', expanding=True), bindparam('kinds', expanding=True)),
+        {'user_ids': list(user_ids), 'kinds': list(kinds)})
+
+
+def write_user_rows(conn, user_ids: Sequence[int], rows: List[Dict]):
+    delete_user_rows(conn, user_ids)
+    if rows:
+        conn.execute(text("""
+            INSERT INTO user_recommendations (user_id, kind, recommendations)
+            VALUES (:user_id, :kind, :recommendations)
+        """), rows)
+
+
+def invalidate_user_recommendations(db, user_id: int, kinds: Sequence[str] = (PERSONALIZED, WATCHLIST)):
+    # Runs in the request's transaction; until the refresh lands the user is served online
+    try:
+        with db.begin_nested():
+            delete_user_rows(db.connection(), [user_id], kinds)
+    except Exception as e:
+        logger.warning(f"user_recommendations unavailable, nothing to invalidate: {e}")
+
+
+def refresh_user_recommendations(user_id: int) -> bool:
+    # Incremental refresh, scheduled as a background task after a rating or watchlist change
+    db = SessionLocal()
+    try:
+        conn = db.connection()
+        recommender = BatchRecommender(movie_catalog.get(conn))
+        write_user_rows(conn, [user_id], compute_user_rows(conn, recommender, [user_id]))
+        db.commit()
+        return True
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error refreshing stored recommendations for user {user_id}: {e}")
+        return False
+    finally:
+        db.close()
+
+
+def stored_user_ids(conn) -> List[int]:
+    rows = conn.execute(text("""
+        SELECT user_id FROM user_profiles
+        UNION
+        SELECT DISTINCT user_app_id FROM watchlist
+        ORDER BY 1
+    """)).fetchall()
+    return [row[0] for row in rows]
+
+
+def build_all_user_recommendations(batch_size: int = STORE_BATCH_SIZE,
+                                   user_ids: Optional[List[int]] = None) -> Optional[Dict]:
+    db = SessionLocal()
+    started = time.perf_counter()
+    written = 0
+    try:
+        conn = db.connection()
+        user_ids = stored_user_ids(conn) if user_ids is None else user_ids
+        recommender = BatchRecommender(movie_catalog.get(conn))
+
+        # One transaction per batch, so readers never see a half-written user
+        for i in range(0, len(user_ids), batch_size):
+            batch = user_ids[i:i + batch_size]
+            conn = db.connection()
+            rows = compute_user_rows(conn, recommender, batch)
+            write_user_rows(conn, batch, rows)
+            db.commit()
+            written += len(rows)
+
+        elapsed = time.perf_counter() - started
+        logger.info(f"user_recommendations updated: {written} rows for {len(user_ids)} users "
+                    f"in {elapsed:.2f}s")
+        return {'users': len(user_ids), 'rows': written, 'seconds': elapsed}
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"Error building user_recommendations: {e}")
+        return None
+    finally:
+        db.close()
@@ -0,0 +1,35 @@
+"""hot lookup indexes
+
+Revision ID: 0001
+Revises:
+Create Date: 2026-10-19
+
+"""
+from alembic import op
+
+from database.dialects import create_index_if_missing
+
+revision = '0001'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+INDEXES = [
+    ('idx_ratings_user_movie', 'ratings', ['user_id', 'movie_id']),
+    ('idx_app_ratings_user_movie', 'app_ratings', ['user_app_id', 'movie_id']),
+    ('idx_watchlist_user_movie', 'watchlist', ['user_app_id', 'movie_id']),
+    ('idx_notifications_user_created', 'notifications', ['user_id', 'created_at']),
+    ('idx_movie_stats_rating_count', 'movie_stats', ['rating_count']),
+]
+
+
+def upgrade():
+    # Bazele create cu Base.metadata.create_all au deja indecșii din modele
+    conn = op.get_bind()
+    for name, table, columns in INDEXES:
+        create_index_if_missing(conn, name, table, columns)
+
+
+def downgrade():
+    for name, table, _ in reversed(INDEXES):
+        op.drop_index(name, table_name=table)
@@ -0,0 +1,63 @@
+"""notification kind column and per-user summary
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19
+
+"""
+import json
+
+import sqlalchemy as sa
+from alembic import op
+
+from database.dialects import add_column_if_missing, create_index_if_missing
+
+revision = '0002'
+down_revision = '0001'
+branch_labels = None
+depends_on = None
+
+
+def _notification_kind(metadata):
+    # Copie înghețată a api.notifications.notification_kind din momentul migrării: migrarea trebuie să
+    # producă aceleași date și după ce codul aplicației se schimbă
+    if not metadata:
+        return None
+    try:
+        kind = json.loads(metadata).get('type')
+    except (ValueError, AttributeError):
+        return None
+    return str(kind)[:50] if kind else None
+
+
+def upgrade():
+    # Sare peste obiectele create deja de Base.metadata.create_all sau scripts/create_app_tables.py
+    conn = op.get_bind()
+    add_column_if_missing(conn, 'notifications', 'kind', 'VARCHAR(50)')
+    create_index_if_missing(conn, 'idx_notifications_user_kind_created', 'notifications',
+                            ['user_id', 'kind', 'created_at'])
+
+    if not sa.inspect(conn).has_table('notification_summary'):
+        op.create_table(
+            'notification_summary',
+            sa.Column('user_id', sa.Integer, sa.ForeignKey('users_application.id'), primary_key=True),
+            sa.Column('unread_count', sa.Integer, default=0),
+            sa.Column('last_recommendation_at', sa.DateTime, nullable=True),
+            sa.Column('updated_at', sa.DateTime),
+        )
+
+    # Completează kind din metadata JSON; sumarele se construiesc leneș la prima citire
+    rows = conn.execute(sa.text(
+        "SELECT id, notification_metadata FROM notifications "
+        "WHERE kind IS NULL AND notification_metadata IS NOT NULL"
+    )).fetchall()
+    updates = [{'id': row.id, 'kind': _notification_kind(row.notification_metadata)} for row in rows]
+    updates = [update for update in updates if update['kind']]
+    if updates:
+        conn.execute(sa.text("UPDATE notifications SET kind = :kind WHERE id = :id"), updates)
+
+
+def downgrade():
+    op.drop_table('notification_summary')
+    op.drop_index('idx_notifications_user_kind_created', table_name='notifications')
+    op.drop_column('notifications', 'kind')
@@ -0,0 +1,44 @@
+import random
+import statistics
+import time
+
+from sqlalchemy import text
+
+from machine_learning.RecommendationEngine import RecommendationEngine
+
+BATCH_SIZES = [1, 5, 10, 25, 50, 100]
+ROUNDS = 20
+
+
+def timed(fn):
+    start = time.perf_counter()
+    fn()
+    return time.perf_counter() - start
+
+
+def main():
+    engine = RecommendationEngine()
+    try:
+        movie_ids = [row.id for row in engine.session.execute(text("SELECT id FROM movies")).fetchall()]
+        if not movie_ids:
+            print("Nu există filme în baza de date")
+            return
+
+        print(f"{'ids':>5} {'secvențial (ms)':>16} {'batch (ms)':>11} {'speedup':>8}")
+        for size in BATCH_SIZES:
+            sequential, batch = [], []
+            for _ in range(ROUNDS):
+                ids = random.sample(movie_ids, min(size, len(movie_ids)))
+                sequential.append(timed(lambda: [engine.get_movie_details(movie_id) for movie_id in ids]))
+                batch.append(timed(lambda: engine.get_movies_details(ids)))
+
+            sequential_ms = statistics.median(sequential) * 1000
+            batch_ms = statistics.median(batch) * 1000
+            print(f"{size:>5} {sequential_ms:>16.2f} {batch_ms:>11.2f} {sequential_ms / batch_ms:>7.1f}x")
+
+    finally:
+        engine.close()
+
+
+if __name__ == "__main__":
+    main()
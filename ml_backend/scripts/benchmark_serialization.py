@@ -0,0 +1,84 @@
+import gzip
+import json
+import os
+import timeit
+from typing import List
+
+import pandas as pd
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import ORJSONResponse
+from pydantic import TypeAdapter
+from starlette.responses import JSONResponse
+
+from api.api import MovieResponse
+from api.compression import brotli
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ml-latest-small")
+PAGE_SIZE = 100
+REPEAT = 200
+
+
+def load_page():
+    movies_df = pd.read_csv(os.path.join(DATA_PATH, "movies.csv")).head(PAGE_SIZE)
+
+    rows = []
+    for i, row in enumerate(movies_df.itertuples()):
+        rows.append({
+            'id': int(row.movieId),
+            'movie_id': int(row.movieId),
+            'title': row.title,
+            'year': 1990 + i % 30,
+            'genres': row.genres,
+            'overview': f"{row.title} follows an unlikely group of characters through a story of "
+                        f"friendship, loss and second chances. " * 3,
+            'poster_path': f"/poster_{row.movieId}.jpg",
+            'average_rating': 3.0 + (i % 20) / 10,
+            'rating_count': 10 + i * 7
+        })
+    return rows
+
+
+def validated_stdlib(rows, adapter):
+    # Drumul implicit FastAPI: validare response_model + jsonable_encoder + json stdlib
+    validated = adapter.validate_python(rows)
+    return JSONResponse(jsonable_encoder(validated)).body
+
+
+def direct_orjson(rows):
+    return ORJSONResponse(rows).body
+
+
+def main():
+    rows = load_page()
+    adapter = TypeAdapter(List[MovieResponse])
+
+    stdlib_time = timeit.timeit(lambda: validated_stdlib(rows, adapter), number=REPEAT) / REPEAT
+    orjson_time = timeit.timeit(lambda: direct_orjson(rows), number=REPEAT) / REPEAT
+
+    body = direct_orjson(rows)
+    assert json.loads(body) == json.loads(json.dumps(rows))
+
+    print(f"Pagină de {PAGE_SIZE} filme\n")
+    print("Serializare (medie pe cerere):")
+    print(f"  response_model + json stdlib: {stdlib_time * 1000:8.3f} ms")
+    print(f"  orjson direct:                {orjson_time * 1000:8.3f} ms  ({stdlib_time / orjson_time:.1f}x)")
+
+    print("\nOcteți transferați:")
+    print(f"  necomprimat: {len(body):>8}")
+    gzipped = gzip.compress(body, compresslevel=6)
+    print(f"  gzip (6):    {len(gzipped):>8}  ({len(gzipped) / len(body):.1%})")
+    if brotli is not None:
+        compressed = brotli.compress(body, quality=4)
+        print(f"  brotli (4):  {len(compressed):>8}  ({len(compressed) / len(body):.1%})")
+    else:
+        print("  brotli:      indisponibil (pip install brotli)")
+
+    gzip_time = timeit.timeit(lambda: gzip.compress(body, compresslevel=6), number=REPEAT) / REPEAT
+    print(f"\nCost gzip pe cerere: {gzip_time * 1000:.3f} ms")
+    if brotli is not None:
+        brotli_time = timeit.timeit(lambda: brotli.compress(body, quality=4), number=REPEAT) / REPEAT
+        print(f"Cost brotli pe cerere: {brotli_time * 1000:.3f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import os
+import time
+
+import numpy as np
+import pandas as pd
+
+from data_processing import similarity
+
+DATA_PATH = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "ml-latest-small")
+CHURN_RATES = [0.001, 0.005, 0.01, 0.05, 0.10, 0.25]
+NEW_RATINGS_PER_MOVIE = 5
+
+
+def load_ratings():
+    df = pd.read_csv(os.path.join(DATA_PATH, "ratings.csv"))
+    return df.rename(columns={'userId': 'user_id', 'movieId': 'movie_id'})[['user_id', 'movie_id', 'rating']]
+
+
+def add_churn(ratings_df, movie_ids, churn_rate, rng):
+    # Simulează rating-uri noi pentru o fracțiune din filme
+    n_dirty = max(1, int(len(movie_ids) * churn_rate))
+    dirty_ids = rng.choice(movie_ids, size=n_dirty, replace=False)
+    users = ratings_df['user_id'].unique()
+
+    new_rows = pd.DataFrame({
+        'user_id': rng.choice(users, size=n_dirty * NEW_RATINGS_PER_MOVIE),
+        'movie_id': np.repeat(dirty_ids, NEW_RATINGS_PER_MOVIE),
+        'rating': rng.choice(np.arange(0.5, 5.5, 0.5), size=n_dirty * NEW_RATINGS_PER_MOVIE)
+    })
+
+    updated = pd.concat([ratings_df, new_rows]).drop_duplicates(['user_id', 'movie_id'], keep='last')
+    return updated, dirty_ids
+
+
+def main():
+    rng = np.random.default_rng(42)
+    ratings_df = load_ratings()
+
+    start = time.perf_counter()
+    movie_ids, item_matrix = similarity.build_item_matrix(ratings_df)
+    current = similarity.top_k_neighbours(item_matrix)
+    full_time = time.perf_counter() - start
+
+    print(f"Filme: {len(movie_ids)}, rating-uri: {len(ratings_df)}")
+    print(f"Recalculare completă: {full_time:.3f}s ({len(movie_ids)} liste)\n")
+    print(f"{'churn':>8} {'modificate':>10} {'recalculate':>12} {'incremental':>12} {'complet':>10} {'speedup':>8} {'identic':>8}")
+
+    for churn_rate in CHURN_RATES:
+        updated_df, dirty_ids = add_churn(ratings_df, movie_ids, churn_rate, rng)
+        updated_ids, updated_matrix = similarity.build_item_matrix(updated_df)
+        dirty_rows = np.flatnonzero(np.isin(updated_ids, dirty_ids))
+
+        start = time.perf_counter()
+        patched = similarity.incremental_neighbours(updated_matrix, dirty_rows, current)
+        incremental_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        rebuilt = similarity.top_k_neighbours(updated_matrix)
+        rebuild_time = time.perf_counter() - start
+
+        merged = dict(current)
+        merged.update(patched)
+        # Comparăm scorurile, nu id-urile: la egalitate ordinea vecinilor poate diferi
+        identical = all(
+            len(merged.get(row, ((), ()))[1]) == len(scores)
+            and np.allclose(merged[row][1], scores, atol=1e-5)
+            for row, (_, scores) in rebuilt.items()
+        )
+
+        print(f"{churn_rate:>8.1%} {len(dirty_rows):>10} {len(patched):>12} "
+              f"{incremental_time:>11.3f}s {rebuild_time:>9.3f}s "
+              f"{rebuild_time / incremental_time:>7.1f}x {str(identical):>8}")
+
+
+if __name__ == "__main__":
+    main()
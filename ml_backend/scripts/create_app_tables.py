@@ -2,7 +2,7 @@
 
 from database.connection import engine
 from database.models import Base, UserApplication, AppRating, Watchlist, Collection, CollectionMovie, MovieStatus, \
-    Notification
+    Notification, NotificationSummary, UserAnalytics
 import logging
 
 logging.basicConfig(
@@ -23,6 +23,8 @@ def create_application_tables():
         #CollectionMovie.__table__.create(engine, checkfirst=True)
         #MovieStatus.__table__.create(engine, checkfirst=True)
         Notification.__table__.create(engine, checkfirst=True)
+        NotificationSummary.__table__.create(engine, checkfirst=True)
+        UserAnalytics.__table__.create(engine, checkfirst=True)
 
         logger.info("✓ Tabele create cu succes!")
 
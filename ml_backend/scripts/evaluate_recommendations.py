@@ -0,0 +1,222 @@
+import json
+import math
+import os
+import sys
+import time
+from datetime import datetime
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from data_processing.local_store import build_local_store, create_local_engine, load_movielens, peak_rss_mb
+from machine_learning.RecommendationEngine import RecommendationEngine
+
+# Evaluare offline: split temporal al ml-latest-small, modelele construite cu aceleași funcții ca
+# DataPreprocessor într-o bază SQLite în memorie, interogate prin RecommendationEngine.
+#
+#   python scripts/evaluate_recommendations.py [--k 10] [--users 300] [--split user|global]
+#                                              [--out evaluation_reports]
+#                                              [--baseline evaluation_reports/<run>.json]
+
+TEST_FRACTION = 0.2
+RELEVANT_RATING = 4.0
+MIN_TRAIN_RATINGS = 5
+METHODS = ('collaborative', 'content_based', 'hybrid', 'personalized', 'popular')
+LATENCY_PERCENTILES = (50, 95, 99)
+
+
+def option(name: str, default=None, cast=str):
+    if name in sys.argv:
+        return cast(sys.argv[sys.argv.index(name) + 1])
+    return default
+
+
+def temporal_split(ratings: pd.DataFrame, test_fraction: float = TEST_FRACTION, per_user: bool = True):
+    if not per_user:
+        # Un singur prag de timp global: tot ce e după el este viitorul pe care îl prezicem.
+        # Pe ml-latest-small lasă puțini utilizatori cu istoric în ambele părți.
+        cutoff = ratings['timestamp'].quantile(1 - test_fraction)
+        is_test = ratings['timestamp'] >= cutoff
+        return ratings[~is_test], ratings[is_test], f"global {cutoff}"
+
+    # Ultimele test_fraction din evaluările fiecărui utilizator, în ordine cronologică
+    ordered = ratings.sort_values(['user_id', 'timestamp'], kind='stable')
+    position = ordered.groupby('user_id').cumcount()
+    counts = ordered.groupby('user_id')['movie_id'].transform('size')
+    is_test = position >= np.ceil(counts * (1 - test_fraction))
+    return ordered[~is_test], ordered[is_test], f"per user, last {test_fraction:.0%}"
+
+
+def eval_users(train: pd.DataFrame, test: pd.DataFrame, max_users: Optional[int]) -> pd.DataFrame:
+    relevant = test[test['rating'] >= RELEVANT_RATING].groupby('user_id')['movie_id'].apply(set)
+    train_counts = train.groupby('user_id').size()
+    users = sorted(user_id for user_id in relevant.index if train_counts.get(user_id, 0) >= MIN_TRAIN_RATINGS)
+    if max_users and len(users) > max_users:
+        users = sorted(np.random.default_rng(42).choice(users, size=max_users, replace=False).tolist())
+    return relevant.loc[users]
+
+
+def seed_movie(history: pd.DataFrame) -> int:
+    # Metodele item-to-item pornesc de la cel mai recent film apreciat (sau cel mai recent film)
+    liked = history[history['rating'] >= RELEVANT_RATING]
+    return int((liked if len(liked) else history).iloc[-1]['movie_id'])
+
+
+def recommend(engine: RecommendationEngine, method: str, user_id: int, seed: int, limit: int) -> List[Dict]:
+    if method == 'collaborative':
+        return engine.collaborative_filtering_recommendations(seed, limit)
+    if method == 'content_based':
+        return engine.content_based_recommendations(seed, limit)
+    if method == 'hybrid':
+        return engine.hybrid_recommendations(seed, limit)
+    if method == 'personalized':
+        return engine.personalized_recommendations(user_id, limit)
+    return engine.get_popular_movies(limit)
+
+
+def ndcg(ranked: List[int], relevant: set, k: int) -> float:
+    dcg = sum(1 / math.log2(position + 2) for position, movie_id in enumerate(ranked[:k]) if movie_id in relevant)
+    ideal = sum(1 / math.log2(position + 2) for position in range(min(len(relevant), k)))
+    return dcg / ideal if ideal else 0.0
+
+
+def evaluate(engine: RecommendationEngine, train: pd.DataFrame, relevant: pd.Series, catalog_size: int,
+             k: int) -> Dict:
+    histories = {user_id: group for user_id, group in train.sort_values('timestamp').groupby('user_id')}
+    # Noutate: -log2 din fracțiunea utilizatorilor care au evaluat filmul (netezită)
+    n_users = train['user_id'].nunique()
+    popularity = train.groupby('movie_id').size()
+
+    recommend(engine, 'hybrid', 0, int(train['movie_id'].iloc[0]), k)  # încălzire: snapshot-ul catalogului
+
+    results = {}
+    for method in METHODS:
+        precision, recall, gains, novelty, latencies = [], [], [], [], []
+        recommended = set()
+        for user_id, user_relevant in relevant.items():
+            history = histories[user_id]
+            seen = set(history['movie_id'].tolist())
+
+            started = time.perf_counter()
+            recommendations = recommend(engine, method, int(user_id), seed_movie(history), k * 2)
+            latencies.append((time.perf_counter() - started) * 1000)
+
+            # Filmele deja văzute în antrenare nu pot fi "descoperite"
+            ranked = list(dict.fromkeys(rec['movie_id'] for rec in recommendations if rec['movie_id'] not in seen))
+            ranked = ranked[:k]
+
+            hits = len(set(ranked) & user_relevant)
+            precision.append(hits / k)
+            recall.append(hits / len(user_relevant))
+            gains.append(ndcg(ranked, user_relevant, k))
+            recommended.update(ranked)
+            novelty.extend(-math.log2((popularity.get(movie_id, 0) + 1) / (n_users + 1)) for movie_id in ranked)
+
+        results[method] = {
+            'precision': round(float(np.mean(precision)), 4),
+            'recall': round(float(np.mean(recall)), 4),
+            'ndcg': round(float(np.mean(gains)), 4),
+            'coverage': round(len(recommended) / catalog_size, 4),
+            'novelty': round(float(np.mean(novelty)), 3) if novelty else None,
+            'latency_ms': {
+                **{f"p{p}": round(float(np.percentile(latencies, p)), 3) for p in LATENCY_PERCENTILES},
+                'mean': round(float(np.mean(latencies)), 3)
+            }
+        }
+    return results
+
+
+def markdown_report(report: Dict, baseline: Optional[Dict]) -> str:
+    k = report['k']
+
+    def delta(method: str, metric: str) -> str:
+        if not baseline or method not in baseline.get('methods', {}):
+            return ''
+        before = baseline['methods'][method].get(metric)
+        after = report['methods'][method][metric]
+        if before is None or after is None:
+            return ''
+        return f" ({after - before:+.4f})"
+
+    lines = [
+        f"# Recommendation evaluation — {report['generated_at']}",
+        "",
+        f"- Split: temporal, {report['split']['strategy']} "
+        f"({report['split']['train_ratings']} train / {report['split']['test_ratings']} test ratings)",
+        f"- Users evaluated: {report['split']['users']} (relevant = rating >= {RELEVANT_RATING})",
+        f"- Peak RSS: {report['peak_rss_mb']} MB",
+        "",
+        f"| method | precision@{k} | recall@{k} | NDCG@{k} | coverage | novelty | p50 ms | p95 ms | p99 ms |",
+        "|---|---|---|---|---|---|---|---|---|",
+    ]
+    for method, metrics in report['methods'].items():
+        latency = metrics['latency_ms']
+        lines.append(
+            f"| {method} | {metrics['precision']}{delta(method, 'precision')} "
+            f"| {metrics['recall']}{delta(method, 'recall')} | {metrics['ndcg']}{delta(method, 'ndcg')} "
+            f"| {metrics['coverage']}{delta(method, 'coverage')} | {metrics['novelty']} "
+            f"| {latency['p50']} | {latency['p95']} | {latency['p99']} |"
+        )
+
+    lines += ["", "| build stage | seconds | peak RSS MB |", "|---|---|---|"]
+    for stage, stats in report['build'].items():
+        lines.append(f"| {stage} | {stats['seconds']} | {stats['peak_rss_mb']} |")
+    return "\n".join(lines) + "\n"
+
+
+def main():
+    k = option('--k', 10, int)
+    max_users = option('--users', 0, int)
+    out_dir = option('--out', 'evaluation_reports')
+    baseline_path = option('--baseline')
+
+    movies, ratings = load_movielens()
+    train, test, strategy = temporal_split(ratings, per_user=option('--split', 'user') == 'user')
+    relevant = eval_users(train, test, max_users)
+    print(f"Split {strategy}: {len(train)} antrenare / {len(test)} test, {len(relevant)} utilizatori evaluați")
+
+    session, catalog, stages = build_local_store(create_local_engine(), movies, train)
+    for stage, stats in stages.items():
+        print(f"  {stage:<22} {stats['seconds']:>8.3f}s {stats['peak_rss_mb']:>9.1f} MB")
+
+    engine = RecommendationEngine(session=session, catalog=catalog)
+    try:
+        methods = evaluate(engine, train, relevant, len(movies), k)
+    finally:
+        engine.close()
+
+    report = {
+        'generated_at': datetime.now().isoformat(timespec='seconds'),
+        'k': k,
+        'split': {
+            'strategy': strategy,
+            'train_ratings': int(len(train)),
+            'test_ratings': int(len(test)),
+            'users': int(len(relevant))
+        },
+        'build': stages,
+        'peak_rss_mb': peak_rss_mb(),
+        'methods': methods
+    }
+
+    baseline = None
+    if baseline_path:
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+
+    os.makedirs(out_dir, exist_ok=True)
+    name = os.path.join(out_dir, datetime.now().strftime('evaluation-%Y%m%d-%H%M%S'))
+    with open(f"{name}.json", 'w') as f:
+        json.dump(report, f, indent=2)
+    markdown = markdown_report(report, baseline)
+    with open(f"{name}.md", 'w') as f:
+        f.write(markdown)
+
+    print()
+    print(markdown)
+    print(f"Raport scris în {name}.json și {name}.md")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+import sys
+
+from sqlalchemy import create_engine, text
+
+from database.connection import DATABASE_URL
+
+# Interogările fierbinți din API și motorul de recomandări; fiecare trebuie să folosească un index
+HOT_QUERIES = [
+    ('ratings by user and movie', """
+        SELECT id, rating FROM ratings WHERE user_id = :user_id AND movie_id = :movie_id
+    """),
+    ('ratings by user', """
+        SELECT movie_id FROM ratings WHERE user_id = :user_id
+    """),
+    ('app rating by user and movie', """
+        SELECT id, rating FROM app_ratings WHERE user_app_id = :user_id AND movie_id = :movie_id
+    """),
+    ('my ratings', """
+        SELECT ar.rating, m.title FROM app_ratings ar
+        JOIN movies m ON ar.movie_id = m.id
+        WHERE ar.user_app_id = :user_id
+    """),
+    ('watchlist item', """
+        SELECT id FROM watchlist WHERE user_app_id = :user_id AND movie_id = :movie_id
+    """),
+    ('latest notifications', """
+        SELECT id, title FROM notifications WHERE user_id = :user_id
+        ORDER BY created_at DESC LIMIT 20
+    """),
+    ('last daily recommendation', """
+        SELECT MAX(created_at) FROM notifications
+        WHERE user_id = :user_id AND kind = 'daily_recommendations'
+    """),
+    ('popular movie stats', """
+        SELECT movie_id, avg_rating FROM movie_stats WHERE rating_count >= :min_votes
+        ORDER BY rating_count DESC LIMIT 10
+    """),
+    ('similar movies', """
+        SELECT movie_id2, similarity_score FROM movie_similarity
+        WHERE movie_id1 = :movie_id AND method = 'item_collaborative'
+        ORDER BY similarity_score DESC LIMIT 20
+    """),
+    ('precomputed recommendations', """
+        SELECT recommendations FROM movie_recommendations
+        WHERE movie_id = :movie_id AND method = 'genre'
+    """),
+]
+
+PARAMS = {'user_id': 1, 'movie_id': 1, 'min_votes': 1000}
+
+
+def full_scans_mysql(conn, sql):
+    rows = conn.execute(text(f"EXPLAIN {sql}"), PARAMS).mappings().all()
+    # type = ALL înseamnă scanarea întregului tabel, index = scanarea întregului index
+    return [f"{row['table']} (type={row['type']})" for row in rows if row['type'] in ('ALL', 'index')], rows
+
+
+def full_scans_sqlite(conn, sql):
+    rows = conn.execute(text(f"EXPLAIN QUERY PLAN {sql}"), PARAMS).mappings().all()
+    details = [row['detail'] for row in rows]
+    return [detail for detail in details if detail.startswith('SCAN ') and 'CONSTANT ROW' not in detail], details
+
+
+EXPLAINERS = {
+    'mysql': full_scans_mysql,
+    'sqlite': full_scans_sqlite,
+}
+
+
+def explain_hot_queries(database_url=DATABASE_URL, verbose=False):
+    engine = create_engine(database_url)
+    explainer = EXPLAINERS.get(engine.dialect.name)
+    if explainer is None:
+        print(f"EXPLAIN nu este suportat pentru dialectul {engine.dialect.name}")
+        return False
+
+    failures = 0
+    with engine.connect() as conn:
+        for name, sql in HOT_QUERIES:
+            scans, plan = explainer(conn, sql)
+            status = 'FULL SCAN' if scans else 'ok'
+            print(f"{status:>9}  {name}" + (f": {', '.join(scans)}" if scans else ''))
+            if verbose:
+                for row in plan:
+                    print(f"           {dict(row) if hasattr(row, 'keys') else row}")
+            failures += bool(scans)
+
+    engine.dispose()
+    print(f"\n{len(HOT_QUERIES) - failures}/{len(HOT_QUERIES)} interogări folosesc indecși")
+    return failures == 0
+
+
+if __name__ == "__main__":
+    args = [arg for arg in sys.argv[1:] if not arg.startswith('-')]
+    ok = explain_hot_queries(args[0] if args else DATABASE_URL, verbose='-v' in sys.argv)
+    sys.exit(0 if ok else 1)
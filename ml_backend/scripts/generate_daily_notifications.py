@@ -0,0 +1,222 @@
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+
+from sqlalchemy import insert, text
+
+from api.notification_broker import notification_broker, sse_frame, summary_payload
+from api.notifications import DAILY_RECOMMENDATIONS, serialize_notification
+from database.connection import ReadSessionLocal, SessionLocal, router
+from database.models import Notification, NotificationSummary
+from machine_learning.BatchRecommender import BatchRecommender
+from machine_learning.MovieCatalog import movie_catalog
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = int(os.getenv('DAILY_NOTIFICATIONS_BATCH_SIZE', '500'))
+MAX_WORKERS = int(os.getenv('DAILY_NOTIFICATIONS_WORKERS', str(os.cpu_count() or 1)))
+RECOMMENDATIONS_PER_USER = 3
+TITLE = "New Movie Recommendations"
+MESSAGE = "We've found some movies you might enjoy!"
+
+# Recomandatorul unui proces din pool; pool-ul (și deci recomandatorul) este creat din nou la fiecare rulare
+_recommender: Optional[BatchRecommender] = None
+
+
+def pending_user_ids(conn, day_start: datetime) -> List[int]:
+    # Utilizatorii activi care nu au primit încă recomandările de azi (idx_notifications_user_kind_created)
+    rows = conn.execute(text("""
+        SELECT u.id FROM users_application u
+        WHERE u.is_active = :active
+          AND NOT EXISTS (
+              SELECT 1 FROM notifications n
+              WHERE n.user_id = u.id AND n.kind = :kind AND n.created_at >= :day_start
+          )
+        ORDER BY u.id
+    """), {'active': True, 'kind': DAILY_RECOMMENDATIONS, 'day_start': day_start}).fetchall()
+    return [row.id for row in rows]
+
+
+def _init_worker():
+    # Procesele copil nu refolosesc conexiunile moștenite de la părinte (primar și replici)
+    global _recommender
+    router.dispose(close=False)
+    _recommender = None
+
+
+def create_recommender() -> BatchRecommender:
+    # Snapshot-ul catalogului de la începutul rulării; vecinii se calculează o singură dată per rulare
+    read_db = ReadSessionLocal()
+    try:
+        return BatchRecommender(movie_catalog.get(read_db.connection()))
+    finally:
+        read_db.close()
+
+
+def _get_recommender(conn) -> BatchRecommender:
+    global _recommender
+    if _recommender is None:
+        _recommender = BatchRecommender(movie_catalog.get(conn))
+    return _recommender
+
+
+def notification_rows(recommendations: Dict[int, List[int]], recommender: BatchRecommender,
+                      created_at: datetime) -> List[Dict]:
+    rows = []
+    for user_id, movie_ids in recommendations.items():
+        movies = recommender.snapshot.get_many(movie_ids)
+        if not movies:
+            continue
+        metadata = {
+            "type": DAILY_RECOMMENDATIONS,
+            "movies": [{"id": movie.movie_id, "title": movie.title} for movie in movies]
+        }
+        rows.append({
+            'user_id': user_id,
+            'title': TITLE,
+            'message': MESSAGE,
+            'type': 'info',
+            'read': False,
+            'notification_metadata': json.dumps(metadata),
+            'kind': DAILY_RECOMMENDATIONS,
+            'created_at': created_at
+        })
+    return rows
+
+
+def publish_batch(conn, user_ids: List[int], created_at: datetime):
+    # Fără un broker partajat (Redis) nu există abonați în acest proces
+    if not notification_broker.shared:
+        return
+
+    notifications = Notification.__table__
+    rows = conn.execute(notifications.select().where(
+        notifications.c.user_id.in_(user_ids),
+        notifications.c.kind == DAILY_RECOMMENDATIONS,
+        notifications.c.created_at == created_at
+    )).fetchall()
+    for notification in rows:
+        frame = sse_frame('notification', serialize_notification(notification))
+        notification_broker.publish(notification.user_id, frame)
+
+    summaries = NotificationSummary.__table__
+    for summary in conn.execute(summaries.select().where(summaries.c.user_id.in_(user_ids))).fetchall():
+        notification_broker.publish(summary.user_id, sse_frame('summary', summary_payload(summary)))
+
+
+def process_batch(user_ids: List[int], created_at: datetime, recommender: Optional[BatchRecommender] = None):
+    # Recomandările se calculează pe o replică (dacă există); notificările se scriu pe primar.
+    # Fără recomandator (procesele din pool) se folosește cel al procesului, creat la primul lot.
+    read_db = ReadSessionLocal()
+    db = SessionLocal()
+    try:
+        read_conn = read_db.connection()
+        recommender = recommender or _get_recommender(read_conn)
+        rows = notification_rows(recommender.recommend(read_conn, user_ids, RECOMMENDATIONS_PER_USER),
+                                 recommender, created_at)
+        read_db.close()
+
+        conn = db.connection()
+        if rows:
+            conn.execute(insert(Notification.__table__), rows)
+            # Sumarele existente sunt actualizate pe loc; cele lipsă se reconstruiesc la prima citire
+            summaries = NotificationSummary.__table__
+            conn.execute(summaries.update().where(
+                summaries.c.user_id.in_([row['user_id'] for row in rows])
+            ).values(
+                unread_count=summaries.c.unread_count + 1,
+                last_recommendation_at=created_at
+            ))
+        db.commit()
+
+        publish_batch(db.connection(), [row['user_id'] for row in rows], created_at)
+        return len(user_ids), len(rows)
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Eroare la lotul {user_ids[0]}-{user_ids[-1]}: {str(e)}")
+        return len(user_ids), 0
+    finally:
+        read_db.close()
+        db.close()
+
+
+def generate_daily_notifications(workers: int = MAX_WORKERS, batch_size: int = BATCH_SIZE) -> Dict:
+    created_at = datetime.utcnow().replace(microsecond=0)
+    day_start = created_at.replace(hour=0, minute=0, second=0)
+
+    db = SessionLocal()
+    try:
+        user_ids = pending_user_ids(db.connection(), day_start)
+    finally:
+        db.close()
+
+    batches = [user_ids[i:i + batch_size] for i in range(0, len(user_ids), batch_size)]
+    logger.info(f"Recomandări zilnice pentru {len(user_ids)} utilizatori în {len(batches)} loturi "
+                f"({workers} procese)")
+
+    started = time.perf_counter()
+    processed = created = 0
+
+    def report(result):
+        nonlocal processed, created
+        batch_users, batch_created = result
+        processed += batch_users
+        created += batch_created
+        elapsed = time.perf_counter() - started
+        logger.info(f"  {processed}/{len(user_ids)} utilizatori, {created} notificări "
+                    f"({processed / elapsed:.1f} utilizatori/s)")
+
+    if workers <= 1 or len(batches) <= 1:
+        recommender = create_recommender() if batches else None
+        for batch in batches:
+            report(process_batch(batch, created_at, recommender))
+    else:
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool:
+            futures = [pool.submit(process_batch, batch, created_at) for batch in batches]
+            for future in as_completed(futures):
+                report(future.result())
+
+    elapsed = time.perf_counter() - started
+    users_per_second = processed / elapsed if elapsed > 0 else 0.0
+    logger.info(f"✓ {created} notificări create pentru {processed} utilizatori în {elapsed:.2f}s "
+                f"({users_per_second:.1f} utilizatori/s)")
+    return {
+        'users': processed,
+        'notifications': created,
+        'seconds': elapsed,
+        'users_per_second': users_per_second
+    }
+
+
+def run_daily(at: str):
+    # Worker de sine stătător: rulează zilnic la ora HH:MM (UTC)
+    hour, minute = (int(part) for part in at.split(':'))
+    while True:
+        now = datetime.utcnow()
+        next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
+        if next_run <= now:
+            next_run += timedelta(days=1)
+        logger.info(f"Următoarea rulare: {next_run:%Y-%m-%d %H:%M} UTC")
+        time.sleep((next_run - now).total_seconds())
+
+        try:
+            generate_daily_notifications()
+        except Exception as e:
+            logger.error(f"❌ Eroare la generarea recomandărilor zilnice: {str(e)}")
+
+
+if __name__ == "__main__":
+    if '--daily' in sys.argv:
+        run_daily(sys.argv[sys.argv.index('--daily') + 1])
+    else:
+        generate_daily_notifications()
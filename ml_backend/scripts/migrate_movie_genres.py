@@ -0,0 +1,31 @@
+import logging
+
+from database.connection import engine
+from database.genres import sync_movie_genres
+from database.models import Genre, MovieGenre
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def migrate_movie_genres():
+    try:
+        logger.info("Creare tabele genres și movie_genres...")
+        Genre.__table__.create(engine, checkfirst=True)
+        MovieGenre.__table__.create(engine, checkfirst=True)
+
+        with engine.begin() as conn:
+            saved = sync_movie_genres(conn)
+
+        logger.info(f"✓ {saved} asocieri film-gen migrate din movies.genres")
+
+    except Exception as e:
+        logger.error(f"❌ Eroare la migrarea genurilor: {str(e)}")
+        raise
+
+
+if __name__ == "__main__":
+    migrate_movie_genres()
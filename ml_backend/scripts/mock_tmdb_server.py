@@ -0,0 +1,105 @@
+import json
+import random
+import sys
+import threading
+import zlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+# Server TMDB local pentru rularea fetcher-ului fără rețea (folosit și de tests/test_fetch_posters.py):
+#   PYTHONPATH=. python scripts/mock_tmdb_server.py 8765
+#   TMDB_BASE_URL=http://localhost:8765/3 PYTHONPATH=. python data_processing/fetch_posters.py
+
+FAILURE_RATE = 0.05
+
+
+class MockTMDBHandler(BaseHTTPRequestHandler):
+    def _send_json(self, status_code, payload):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status_code)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        if status_code == 429:
+            self.send_header('Retry-After', str(self.server.retry_after))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        with self.server.lock:
+            self.server.request_count += 1
+            self.server.paths.append(urlparse(self.path).path)
+            # Primele failures_per_request încercări ale fiecărei cereri primesc 429 (determinist, pentru teste)
+            attempts = self.server.attempts[self.path] = self.server.attempts.get(self.path, 0) + 1
+
+        if attempts <= self.server.failures_per_request or random.random() < self.server.failure_rate:
+            self._send_json(429, {'status_message': 'Rate limit exceeded'})
+            return
+
+        url = urlparse(self.path)
+        params = {key: values[0] for key, values in parse_qs(url.query).items()}
+
+        if url.path.endswith('/search/movie'):
+            query = params.get('query', '')
+            if not query or query.lower().startswith('unknown'):
+                self._send_json(200, {'page': 1, 'results': [], 'total_results': 0})
+                return
+
+            movie_id = zlib.crc32(query.encode("utf-8")) % 1000000
+            self._send_json(200, {'page': 1, 'total_results': 1, 'results': [{
+                'id': movie_id,
+                'title': query,
+                'overview': f"Overview for {query}",
+                'poster_path': f"/poster_{movie_id}.jpg",
+                'vote_average': 7.0,
+                'release_date': f"{params.get('year') or 2000}-01-01"
+            }]})
+            return
+
+        if '/movie/' in url.path:
+            movie_id = url.path.rsplit('/', 1)[-1]
+            if not movie_id.isdigit() or int(movie_id) % 13 == 0:
+                self._send_json(404, {'status_message': 'The resource you requested could not be found.'})
+                return
+
+            self._send_json(200, {
+                'id': int(movie_id),
+                'title': f"Movie {movie_id}",
+                'overview': f"Overview for movie {movie_id}",
+                'poster_path': f"/poster_{movie_id}.jpg",
+                'vote_average': 7.5,
+                'popularity': int(movie_id) % 100 + 0.5,
+                'runtime': 90 + int(movie_id) % 60,
+                'release_date': '2001-06-15'
+            })
+            return
+
+        self._send_json(404, {'status_message': 'The resource you requested could not be found.'})
+
+    def log_message(self, format, *args):
+        pass
+
+
+def create_server(port=8765, failure_rate=FAILURE_RATE, failures_per_request=0, retry_after=1):
+    # port=0: port liber ales de sistem (server.server_address[1])
+    server = ThreadingHTTPServer(('127.0.0.1', port), MockTMDBHandler)
+    server.failure_rate = failure_rate
+    server.failures_per_request = failures_per_request
+    server.retry_after = retry_after
+    server.lock = threading.Lock()
+    server.request_count = 0
+    server.attempts = {}
+    server.paths = []
+    return server
+
+
+if __name__ == "__main__":
+    port = int(sys.argv[1]) if len(sys.argv) > 1 else 8765
+    server = create_server(port)
+    print(f"Mock TMDB listening on http://127.0.0.1:{port}/3")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        print(f"Served {server.request_count} requests")
@@ -0,0 +1,35 @@
+import logging
+
+from api.analytics import rebuild_user_analytics
+from database.connection import SessionLocal
+from database.models import UserApplication
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def rebuild_all_user_analytics():
+    db = SessionLocal()
+    try:
+        user_ids = [user_id for (user_id,) in db.query(UserApplication.id).all()]
+        logger.info(f"Reconstruire user_analytics pentru {len(user_ids)} utilizatori...")
+
+        for user_id in user_ids:
+            rebuild_user_analytics(db, user_id)
+            db.commit()
+
+        logger.info("✓ user_analytics reconstruit cu succes!")
+
+    except Exception as e:
+        db.rollback()
+        logger.error(f"❌ Eroare la reconstruirea user_analytics: {str(e)}")
+        raise
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    rebuild_all_user_analytics()
@@ -1,6 +1,5 @@
 from database.connection import SessionLocal
-from database.models import Movie, Rating, User, MovieLink
-import pandas as pd
+from database.models import Movie, Rating, User, MovieLink, Genre, MovieGenre
 from sqlalchemy import func
 
 
@@ -36,17 +35,15 @@ def verify_data():
                 f"  User {rating.user_id} a dat {rating.rating} stele pentru '{movie.title if movie else 'Film necunoscut'}'")
 
         print("\n📊 Statistici pe genuri:")
-        movies_data = []
-        for movie in session.query(Movie).all():
-            if movie.genres:
-                for genre in movie.genres.split('|'):
-                    movies_data.append({'genre': genre})
-
-        if movies_data:
-            df = pd.DataFrame(movies_data)
-            genre_counts = df['genre'].value_counts()
+        genre_counts = session.query(Genre.name, func.count(MovieGenre.movie_id).label('count')) \
+            .join(MovieGenre, MovieGenre.genre_id == Genre.id) \
+            .group_by(Genre.name) \
+            .order_by(func.count(MovieGenre.movie_id).desc()) \
+            .limit(10).all()
+
+        if genre_counts:
             print("\nTop 10 genuri:")
-            for genre, count in genre_counts.head(10).items():
+            for genre, count in genre_counts:
                 print(f"  {genre}: {count} filme")
 
         print("\n🔍 Verificare completitudine date:")
@@ -0,0 +1,47 @@
+import threading
+
+from sqlalchemy import event
+from sqlalchemy.orm import Session
+
+from data_processing.local_store import create_local_engine
+from database.models import Base, UserApplication
+
+
+def create_app_store(path):
+    # Fișier, nu memorie: fiecare thread are conexiunea lui, ca două cereri API
+    store = create_local_engine(f"sqlite:///{path}")
+    Base.metadata.create_all(store)
+    with Session(bind=store) as db:
+        db.add(UserApplication(id=1, email='user@test', password_hash=''))
+        db.commit()
+    return store
+
+
+def run_concurrent_first_writes(store, table: str, *writes):
+    # Ambele tranzacții au citit deja "niciun rând" când ajung la INSERT
+    barrier = threading.Barrier(len(writes))
+    waiting = threading.local()
+
+    @event.listens_for(store, 'before_cursor_execute')
+    def wait_before_insert(conn, cursor, statement, parameters, context, executemany):
+        if statement.startswith(f"INSERT INTO {table}") and not getattr(waiting, 'done', False):
+            waiting.done = True
+            barrier.wait(timeout=10)
+
+    errors = []
+
+    def run(write):
+        with Session(bind=store) as db:
+            try:
+                write(db)
+                db.commit()
+            except Exception as e:
+                errors.append(e)
+
+    threads = [threading.Thread(target=run, args=(write,)) for write in writes]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    event.remove(store, 'before_cursor_execute', wait_before_insert)
+    return errors
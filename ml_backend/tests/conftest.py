@@ -0,0 +1,37 @@
+import os
+import tempfile
+
+import pytest
+
+# database.connection citește configurația la import: testele rulează pe SQLite, fără replici
+TEST_DIR = tempfile.mkdtemp(prefix='filmfinder-tests-')
+FIXTURE_DB = os.path.join(TEST_DIR, 'filmfinder.db')
+FIXTURE_USERS = 20
+os.environ['DATABASE_URL'] = f"sqlite:///{FIXTURE_DB}"
+os.environ.pop('DATABASE_REPLICA_URLS', None)
+os.environ['IMAGE_CACHE_DIR'] = os.path.join(TEST_DIR, 'image_cache')
+os.environ['TMDB_CACHE_DIR'] = os.path.join(TEST_DIR, 'tmdb_cache')
+
+
+@pytest.fixture(scope='session')
+def fixture_manifest():
+    # Baza testelor de încărcare (ml-latest-small + utilizatori de aplicație), construită o dată per sesiune
+    from database.connection import engine
+    from loadtest.fixture import create_fixture
+
+    manifest = create_fixture(FIXTURE_DB, FIXTURE_USERS)
+    engine.dispose()
+    return manifest
+
+
+@pytest.fixture(scope='session')
+def client(fixture_manifest):
+    from fastapi.testclient import TestClient
+    from api.api import app
+
+    return TestClient(app)
+
+
+@pytest.fixture
+def auth_headers(fixture_manifest):
+    return {'Authorization': f"Bearer {fixture_manifest['users'][0]['token']}"}
@@ -0,0 +1,64 @@
+import json
+from datetime import datetime
+
+import pytest
+from sqlalchemy.orm import Session
+
+from api.analytics import get_user_analytics, record_rating_change, record_watchlist_change
+from database.dialects import insert_if_missing
+from database.models import Movie, UserAnalytics
+from tests.concurrency import create_app_store, run_concurrent_first_writes
+
+
+@pytest.fixture
+def store(tmp_path):
+    return create_app_store(tmp_path / 'analytics.db')
+
+
+def test_concurrent_first_writes_share_one_analytics_row(store):
+    errors = run_concurrent_first_writes(
+        store, 'user_analytics',
+        lambda db: record_rating_change(db, 1, None, new_rating=4.0, new_timestamp=datetime(2024, 1, 1)),
+        lambda db: record_watchlist_change(db, 1, 1)
+    )
+    assert errors == []
+
+    with Session(bind=store) as db:
+        statistics = get_user_analytics(db, 1).user_statistics()
+    assert statistics == {'rating_count': 1, 'average_rating': 4.0, 'watchlist_count': 1}
+
+
+def test_insert_if_missing_keeps_the_existing_row(store):
+    with Session(bind=store) as db:
+        record_watchlist_change(db, 1, 1)
+        insert_if_missing(db, UserAnalytics.__table__, {'user_id': 1, 'updated_at': None})
+        db.commit()
+        assert db.query(UserAnalytics).one().watchlist_count == 1
+
+
+def test_placeholder_genre_is_not_counted(store):
+    with Session(bind=store) as db:
+        unlisted = Movie(id=1, title='Unlisted', genres='(no genres listed)', year=2000)
+        comedy = Movie(id=2, title='Comedy', genres='Comedy|Drama', year=2000)
+        db.add_all([unlisted, comedy])
+        record_rating_change(db, 1, unlisted, new_rating=3.0, new_timestamp=datetime(2024, 1, 1))
+        record_rating_change(db, 1, comedy, new_rating=5.0, new_timestamp=datetime(2024, 1, 1))
+        db.commit()
+
+        rollup = get_user_analytics(db, 1)
+        assert set(rollup.genre_stats) == {'Comedy', 'Drama'}
+        assert set(rollup.monthly_genres['2024-01']) == {'Comedy', 'Drama'}
+        assert rollup.rating_count == 2
+
+
+def test_rows_built_with_the_placeholder_genre_drop_it(store):
+    with Session(bind=store) as db:
+        record_watchlist_change(db, 1, 1)
+        row = db.query(UserAnalytics).one()
+        row.genre_stats = json.dumps({'(no genres listed)': [1, 3.0], 'Comedy': [1, 5.0]})
+        row.monthly_genres = json.dumps({'2023-12': {'(no genres listed)': 1}, '2024-01': {'Comedy': 1}})
+        db.commit()
+
+        rollup = get_user_analytics(db, 1)
+        assert rollup.genre_stats == {'Comedy': [1, 5.0]}
+        assert rollup.monthly_genres == {'2024-01': {'Comedy': 1}}
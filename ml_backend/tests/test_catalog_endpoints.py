@@ -0,0 +1,24 @@
+import pytest
+
+from machine_learning.MovieCatalog import movie_catalog
+
+
+@pytest.mark.parametrize('query', ['limit=-1', 'limit=0', 'limit=501', 'skip=-1'])
+def test_all_movies_rejects_out_of_range_paging(client, query):
+    assert client.get(f"/movies/all?{query}").status_code == 422
+
+
+@pytest.mark.parametrize('path', ['/movies/all', '/movies/browse'])
+def test_unknown_sort_is_rejected(client, path):
+    response = client.get(f"{path}?sort_by=bogus")
+    assert response.status_code == 400
+    assert 'sort_by' in response.json()['error']
+
+
+def test_all_movies_pages_in_sort_order(client):
+    first = client.get('/movies/all?sort_by=title&limit=5').json()
+    second = client.get('/movies/all?sort_by=title&skip=5&limit=5').json()
+
+    titles = [movie['title'] for movie in first + second]
+    assert len(titles) == 10 and titles == sorted(titles)
+    assert [movie.title for movie in movie_catalog.snapshot.page('title', 0, 10)] == titles
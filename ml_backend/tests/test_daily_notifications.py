@@ -0,0 +1,21 @@
+from scripts import generate_daily_notifications as daily
+
+
+def test_each_run_builds_its_own_recommender(fixture_manifest, monkeypatch):
+    user_ids = [user['id'] for user in fixture_manifest['users']]
+    recommenders = []
+
+    def process_batch(batch, created_at, recommender=None):
+        recommenders.append(recommender)
+        return len(batch), 0
+
+    monkeypatch.setattr(daily, 'pending_user_ids', lambda conn, day_start: user_ids)
+    monkeypatch.setattr(daily, 'process_batch', process_batch)
+
+    # Ca run_daily: mai multe rulări în același proces
+    daily.generate_daily_notifications(workers=1, batch_size=len(user_ids))
+    daily.generate_daily_notifications(workers=1, batch_size=len(user_ids))
+
+    assert len(recommenders) == 2 and None not in recommenders
+    assert recommenders[0] is not recommenders[1]
+    assert daily._recommender is None
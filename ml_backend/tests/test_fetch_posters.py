@@ -0,0 +1,154 @@
+import threading
+
+import pandas as pd
+import pytest
+from sqlalchemy import event, text
+from sqlalchemy.orm import Session
+
+from data_processing import fetch_posters
+from data_processing.DataPreprocessor import DataPreprocessor
+from data_processing.local_store import create_local_engine
+from database.models import Base, Movie
+from scripts.mock_tmdb_server import create_server
+
+MOVIES = 250
+BATCH_SIZE = 100
+REQUESTS_PER_SECOND = 1000
+
+
+class CountingBucket(fetch_posters.TokenBucket):
+    def __init__(self, rate: float):
+        super().__init__(rate)
+        self.acquired = 0
+
+    def acquire(self):
+        super().acquire()
+        self.acquired += 1
+
+
+@pytest.fixture
+def tmdb_server(monkeypatch):
+    server = create_server(port=0, failure_rate=0, retry_after=0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    monkeypatch.setattr(fetch_posters, 'TMDB_BASE_URL', f"http://127.0.0.1:{server.server_address[1]}/3")
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def create_store(movies: pd.DataFrame):
+    store = create_local_engine()
+    Base.metadata.create_all(store)
+    assert DataPreprocessor(session=Session(bind=store)).create_processed_tables()
+    with store.begin() as conn:
+        movies.to_sql('movies', conn, if_exists='append', index=False)
+    return store
+
+
+def untitled_movies(count: int = MOVIES) -> pd.DataFrame:
+    return pd.DataFrame({'id': range(1, count + 1), 'title': [f"Film {i}" for i in range(1, count + 1)],
+                         'year': 2000})
+
+
+def run_fetcher(store, cache_dir, **kwargs):
+    session = Session(bind=store)
+    marker = session.get(Movie, 1)
+    commits = []
+    event.listen(session, 'after_commit', lambda _: commits.append(1))
+    result = fetch_posters.update_movie_posters(max_workers=4, requests_per_second=REQUESTS_PER_SECOND,
+                                                batch_size=BATCH_SIZE, session=session, cache_dir=str(cache_dir),
+                                                **kwargs)
+    # Sesiunea apelantului nu este închisă: obiectele încărcate de el rămân în sesiune
+    assert marker in session
+    session.close()
+    return result, len(commits)
+
+
+def movie_rows(store):
+    with store.connect() as conn:
+        return {row.id: row for row in conn.execute(text("SELECT * FROM movies"))}
+
+
+def test_updates_are_committed_in_batches(tmdb_server, tmp_path):
+    store = create_store(untitled_movies())
+    result, commits = run_fetcher(store, tmp_path)
+
+    assert result == {'updated': MOVIES, 'failed': 0, 'cached': 0}
+    # Un commit per lot de BATCH_SIZE filme, plus cel care crește data_version
+    assert commits == -(-MOVIES // BATCH_SIZE) + 1
+    assert all(row.poster_path for row in movie_rows(store).values())
+    with store.connect() as conn:
+        assert conn.execute(text("SELECT version FROM data_version")).scalar() == 1
+
+
+def test_rerun_is_served_from_cache(tmdb_server, tmp_path):
+    run_fetcher(create_store(untitled_movies()), tmp_path)
+    requests_before = tmdb_server.request_count
+
+    store = create_store(untitled_movies())
+    result, _ = run_fetcher(store, tmp_path)
+
+    assert tmdb_server.request_count == requests_before
+    assert result == {'updated': MOVIES, 'failed': 0, 'cached': MOVIES}
+    assert all(row.poster_path for row in movie_rows(store).values())
+
+
+def test_rate_limited_requests_are_retried_through_the_bucket(tmdb_server, tmp_path):
+    tmdb_server.failures_per_request = 2
+    bucket = CountingBucket(REQUESTS_PER_SECOND)
+    movie = (1, 'Film 1', 2000, None, None, None, None, None, None, None)
+
+    _, tmdb_data, from_cache = fetch_posters.fetch_movie(movie, None, bucket,
+                                                         fetch_posters.ResponseCache(str(tmp_path)))
+
+    assert tmdb_data['poster_path'] and not from_cache
+    assert tmdb_server.request_count == 3
+    assert bucket.acquired == tmdb_server.request_count
+
+
+def test_rate_limited_run_updates_every_movie(tmdb_server, tmp_path):
+    tmdb_server.failures_per_request = 1
+    store = create_store(untitled_movies())
+    result, _ = run_fetcher(store, tmp_path)
+
+    assert result['updated'] == MOVIES and result['failed'] == 0
+    assert tmdb_server.request_count == 2 * MOVIES
+
+
+def test_movie_with_tmdb_id_is_fetched_by_id(tmdb_server, tmp_path):
+    store = create_store(pd.DataFrame({'id': [1], 'title': ['Film 1'], 'year': [2000], 'tmdb_id': [100]}))
+    result, _ = run_fetcher(store, tmp_path)
+
+    assert result['updated'] == 1
+    assert tmdb_server.paths == ['/3/movie/100']
+    movie = movie_rows(store)[1]
+    assert movie.poster_path == '/poster_100.jpg' and movie.runtime == 90 + 100 % 60 and movie.popularity
+
+
+def test_unknown_tmdb_id_falls_back_to_title_search(tmdb_server, tmp_path):
+    # Serverul stub întoarce 404 pentru id-urile divizibile cu 13
+    store = create_store(pd.DataFrame({'id': [1], 'title': ['Film 1'], 'year': [2000], 'tmdb_id': [26]}))
+    result, _ = run_fetcher(store, tmp_path)
+
+    assert result['updated'] == 1
+    assert tmdb_server.paths == ['/3/movie/26', '/3/search/movie']
+    movie = movie_rows(store)[1]
+    assert movie.tmdb_id == 26 and movie.overview == 'Overview for Film 1'
+
+    # Rezultatul căutării este final: rerularea nu mai încearcă id-ul
+    run_fetcher(create_store(pd.DataFrame({'id': [1], 'title': ['Film 1'], 'year': [2000], 'tmdb_id': [26]})),
+                tmp_path)
+    assert tmdb_server.request_count == 2
+
+
+def test_entries_from_older_cache_versions_are_refetched(tmdb_server, tmp_path):
+    key = ['Film 1', 2000, 100]
+    fetch_posters.ResponseCache(str(tmp_path), version=fetch_posters.CACHE_VERSION - 1).set(key, {'id': 100})
+    movie = (1, 'Film 1', 2000, 100, None, None, None, None, None, None)
+
+    cache = fetch_posters.ResponseCache(str(tmp_path))
+    _, tmdb_data, from_cache = fetch_posters.fetch_movie(movie, None, None, cache)
+
+    assert not from_cache and tmdb_data['runtime'] == 90 + 100 % 60
+    assert cache.get(key) == (True, tmdb_data)
@@ -0,0 +1,46 @@
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from data_processing.DataPreprocessor import DataPreprocessor
+from data_processing.local_store import create_local_engine
+from database.genres import sync_movie_genres
+from database.models import Base
+
+MOVIES = [
+    (1, 'A', 'Comedy|Drama'),
+    (2, 'B', 'Comedy'),
+    (3, 'C', 'Drama|Romance'),
+    (4, 'D', 'Horror'),
+    (5, 'E', '(no genres listed)'),
+]
+
+
+def genre_neighbours():
+    store = create_local_engine()
+    Base.metadata.create_all(store)
+    preprocessor = DataPreprocessor(session=Session(bind=store))
+    assert preprocessor.create_processed_tables()
+    with store.begin() as conn:
+        pd.DataFrame(MOVIES, columns=['id', 'title', 'genres']).to_sql('movies', conn, if_exists='append',
+                                                                      index=False)
+        sync_movie_genres(conn)
+
+    assert preprocessor.process_genre_similarities()
+    with store.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT movie_id1, movie_id2, similarity_score FROM movie_similarity WHERE method = 'genre'
+        """)).fetchall()
+        vectors = conn.execute(text("SELECT COUNT(*) FROM movie_genre_vectors")).scalar()
+    return {(row.movie_id1, row.movie_id2): round(row.similarity_score, 4) for row in rows}, vectors
+
+
+def test_genre_neighbours_are_stored_in_both_directions():
+    neighbours, vectors = genre_neighbours()
+
+    # cos(Comedy|Drama, Comedy) = 1 / sqrt(2); filmele fără genuri comune nu sunt vecini
+    assert neighbours[(1, 2)] == neighbours[(2, 1)] == round(2 ** -0.5, 4)
+    assert neighbours[(1, 3)] == neighbours[(3, 1)] == 0.5
+    assert (2, 3) not in neighbours and not any(4 in pair for pair in neighbours)
+    assert not any(5 in pair for pair in neighbours)
+    assert vectors == 4
@@ -0,0 +1,71 @@
+import os
+import shutil
+import subprocess
+import sys
+
+import pytest
+from sqlalchemy import create_engine, inspect, text
+
+from scripts.explain_hot_queries import HOT_QUERIES, full_scans_sqlite
+
+ML_BACKEND = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Obiectele adăugate de migrări (0001, 0002); modelele și DataPreprocessor le creează deja pe baza de test
+MIGRATED_INDEXES = {
+    'ratings': 'idx_ratings_user_movie',
+    'app_ratings': 'idx_app_ratings_user_movie',
+    'watchlist': 'idx_watchlist_user_movie',
+    'movie_stats': 'idx_movie_stats_rating_count',
+}
+NOTIFICATION_INDEXES = ['idx_notifications_user_created', 'idx_notifications_user_kind_created']
+
+
+def downgrade_to_baseline(database_url: str):
+    # Schema dinaintea migrărilor, cu datele fixture-ului: fără indecși, fără notifications.kind
+    # și fără notification_summary
+    engine = create_engine(database_url)
+    with engine.begin() as conn:
+        for name in [*MIGRATED_INDEXES.values(), *NOTIFICATION_INDEXES]:
+            conn.execute(text(f"DROP INDEX IF EXISTS {name}"))
+        conn.execute(text("DROP TABLE notification_summary"))
+        conn.execute(text("ALTER TABLE notifications DROP COLUMN kind"))
+    engine.dispose()
+
+
+@pytest.fixture(scope='module')
+def migrated_fixture(fixture_manifest, tmp_path_factory):
+    # Copie a bazei de test, ca migrările să nu modifice baza folosită de celelalte teste
+    database = str(tmp_path_factory.mktemp('migrations') / 'filmfinder.db')
+    shutil.copy(fixture_manifest['database_url'][len('sqlite:///'):], database)
+    database_url = f"sqlite:///{database}"
+    downgrade_to_baseline(database_url)
+
+    subprocess.run([sys.executable, '-m', 'alembic', '-x', f"url={database_url}", 'upgrade', 'head'],
+                   cwd=ML_BACKEND, check=True)
+    engine = create_engine(database_url)
+    yield engine
+    engine.dispose()
+
+
+def test_migrations_create_the_indexes_and_columns(migrated_fixture):
+    inspector = inspect(migrated_fixture)
+    for table, index in [*MIGRATED_INDEXES.items(), *(('notifications', name) for name in NOTIFICATION_INDEXES)]:
+        assert index in {existing['name'] for existing in inspector.get_indexes(table)}, index
+    assert 'kind' in {column['name'] for column in inspector.get_columns('notifications')}
+    assert inspector.has_table('notification_summary')
+
+    with migrated_fixture.connect() as conn:
+        assert conn.execute(text("SELECT version_num FROM alembic_version")).scalar() == '0002'
+        # kind completat din metadata pentru notificările existente
+        missing = conn.execute(text("""
+            SELECT COUNT(*) FROM notifications WHERE notification_metadata IS NOT NULL AND kind IS NULL
+        """)).scalar()
+        assert missing == 0
+        assert conn.execute(text("SELECT COUNT(*) FROM notifications WHERE kind IS NOT NULL")).scalar() > 0
+
+
+@pytest.mark.parametrize('name, sql', HOT_QUERIES, ids=[name for name, _ in HOT_QUERIES])
+def test_hot_query_uses_an_index(migrated_fixture, name, sql):
+    with migrated_fixture.connect() as conn:
+        scans, plan = full_scans_sqlite(conn, sql)
+    assert scans == [], plan
@@ -0,0 +1,27 @@
+from machine_learning.MovieCatalog import movie_catalog
+
+
+def test_catalog_etag_uses_the_served_snapshot_version(client):
+    response = client.get('/movies/popular?limit=5')
+    assert response.status_code == 200
+    assert response.headers['etag'].startswith(f'W/"v{movie_catalog.snapshot.version}-')
+
+
+def test_get_recommendations_revalidate(client, fixture_manifest):
+    path = f"/movies/{fixture_manifest['movie_ids'][0]}/recommendations?limit=5"
+    etag = client.get(path).headers['etag']
+
+    response = client.get(path, headers={'If-None-Match': etag})
+    assert response.status_code == 304
+    assert response.headers['etag'] == etag
+
+
+def test_post_recommendations_are_not_conditional(client, fixture_manifest):
+    movie_id = fixture_manifest['movie_ids'][0]
+    etag = client.get(f"/movies/{movie_id}/recommendations?limit=5").headers['etag']
+
+    response = client.post(f"/movies/{movie_id}/recommendations", json={'limit': 5},
+                           headers={'If-None-Match': etag})
+    assert response.status_code == 200
+    assert len(response.json()) == 5
+    assert 'etag' not in response.headers
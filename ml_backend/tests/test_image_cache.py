@@ -0,0 +1,142 @@
+import io
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+from fastapi.testclient import TestClient
+from PIL import Image
+
+import api.api
+from api.image_cache import ImageCache
+
+POSTER = '/poster.png'
+CONCURRENT_REQUESTS = 8
+
+
+def poster_bytes(mode: str = 'RGB', color=(200, 40, 40)) -> bytes:
+    output = io.BytesIO()
+    Image.new(mode, (600, 900), color).save(output, format='PNG')
+    return output.getvalue()
+
+
+class OriginHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        with self.server.lock:
+            self.server.paths.append(self.path)
+        # Destul de lent încât cererile concurente să se suprapună
+        time.sleep(0.2)
+        body = self.server.body if self.path.endswith(POSTER) else b''
+        self.send_response(self.server.status or (200 if body else 404))
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+@pytest.fixture
+def origin():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), OriginHandler)
+    server.lock = threading.Lock()
+    server.paths = []
+    server.body = poster_bytes()
+    server.status = None
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def image_cache(origin, tmp_path):
+    return ImageCache(str(tmp_path), origin_url=f"http://127.0.0.1:{origin.server_address[1]}/t/p")
+
+
+def stored_refs(cache: ImageCache) -> int:
+    return sum(len(files) for _, _, files in os.walk(cache.refs_dir))
+
+
+def test_concurrent_misses_fetch_and_resize_once(origin, image_cache):
+    barrier = threading.Barrier(CONCURRENT_REQUESTS)
+    results = []
+
+    def request():
+        barrier.wait()
+        results.append(image_cache.get('w185', POSTER))
+
+    threads = [threading.Thread(target=request) for _ in range(CONCURRENT_REQUESTS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert origin.paths == [f"/t/p/original{POSTER}"]
+    assert len({digest for _, digest in results}) == 1
+    with Image.open(io.BytesIO(results[0][0])) as image:
+        assert image.width == 185
+    # Doar originalul și dimensiunea cerută
+    assert stored_refs(image_cache) == 2
+
+
+def test_other_sizes_reuse_the_cached_original(origin, image_cache):
+    image_cache.get('w92', POSTER)
+    image_cache.get('w342', POSTER)
+    image_cache.get('original', POSTER)
+
+    assert len(origin.paths) == 1
+    assert stored_refs(image_cache) == 3
+
+
+@pytest.mark.parametrize('if_none_match', ['"{digest}"', 'W/"{digest}"', '"other", W/"{digest}"', '*'])
+def test_image_endpoint_revalidates_weak_and_listed_etags(monkeypatch, image_cache, if_none_match):
+    monkeypatch.setattr(api.api, 'image_cache', image_cache)
+    client = TestClient(api.api.app)
+
+    response = client.get(f"/images/w185{POSTER}")
+    assert response.status_code == 200
+    digest = response.headers['etag'].strip('"')
+
+    response = client.get(f"/images/w185{POSTER}", headers={'If-None-Match': if_none_match.format(digest=digest)})
+    assert response.status_code == 304
+
+    response = client.get(f"/images/w185{POSTER}", headers={'If-None-Match': '"other"'})
+    assert response.status_code == 200
+
+
+def test_transparent_png_keeps_its_alpha_channel(origin, image_cache):
+    origin.body = poster_bytes('RGBA', (200, 40, 40, 0))
+    data, _ = image_cache.get('w185', POSTER)
+
+    with Image.open(io.BytesIO(data)) as image:
+        assert image.format == 'PNG' and image.mode == 'RGBA'
+        assert image.getpixel((10, 10))[3] == 0
+
+
+@pytest.fixture
+def image_client(monkeypatch, image_cache):
+    monkeypatch.setattr(api.api, 'image_cache', image_cache)
+    return TestClient(api.api.app)
+
+
+def test_origin_error_is_a_bad_gateway_not_a_missing_image(origin, image_client):
+    origin.status = 503
+    response = image_client.get(f"/images/w185{POSTER}")
+    assert response.status_code == 502
+    assert response.headers['cache-control'] == 'no-store'
+
+    # Eroarea nu este memorată: după revenirea originii imaginea se servește
+    origin.status = None
+    assert image_client.get(f"/images/w185{POSTER}").status_code == 200
+
+
+def test_unreachable_origin_is_a_bad_gateway(tmp_path, monkeypatch):
+    cache = ImageCache(str(tmp_path), origin_url='http://127.0.0.1:9/t/p')
+    monkeypatch.setattr(api.api, 'image_cache', cache)
+    assert TestClient(api.api.app).get(f"/images/w185{POSTER}").status_code == 502
+
+
+def test_missing_origin_image_is_not_found(origin, image_client):
+    assert image_client.get('/images/w185/missing.png').status_code == 404
@@ -0,0 +1,97 @@
+from datetime import datetime
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from data_processing.DataPreprocessor import DataPreprocessor
+from data_processing.local_store import create_local_engine
+from database.models import Base
+
+RATINGS = [
+    (1, 1, 5.0), (1, 2, 5.0),
+    (2, 2, 4.0), (2, 3, 4.0),
+    (3, 3, 3.0), (3, 4, 3.0),
+]
+
+
+def create_store():
+    store = create_local_engine()
+    Base.metadata.create_all(store)
+    preprocessor = DataPreprocessor(session=Session(bind=store))
+    assert preprocessor.create_processed_tables()
+
+    with store.begin() as conn:
+        pd.DataFrame({'id': [1, 2, 3, 4], 'title': ['A', 'B', 'C', 'D']}).to_sql('movies', conn, if_exists='append',
+                                                                                index=False)
+        pd.DataFrame({'id': [1, 2, 3], 'email': ['u1', 'u2', 'u3'], 'password_hash': ''}).to_sql(
+            'users', conn, if_exists='append', index=False)
+        add_ratings(conn, RATINGS, datetime(2020, 1, 1))
+    return store, preprocessor
+
+
+def add_ratings(conn, ratings, timestamp):
+    pd.DataFrame(ratings, columns=['user_id', 'movie_id', 'rating']).assign(timestamp=timestamp).to_sql(
+        'ratings', conn, if_exists='append', index=False)
+
+
+def neighbours(store):
+    with store.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT movie_id1, movie_id2 FROM movie_similarity WHERE method = 'item_collaborative'
+        """)).fetchall()
+    return {(row.movie_id1, row.movie_id2) for row in rows}
+
+
+def test_backfilled_rating_with_old_timestamp_is_recomputed():
+    store, preprocessor = create_store()
+    assert preprocessor.create_item_collaborative_similarity()
+    assert (1, 4) not in neighbours(store)
+
+    # Evaluare importată după rulare, dar cu un timestamp anterior ultimei evaluări procesate
+    with store.begin() as conn:
+        add_ratings(conn, [(1, 4, 5.0)], datetime(2019, 1, 1))
+    assert preprocessor.create_item_collaborative_similarity(incremental=True)
+    incremental = neighbours(store)
+    assert (1, 4) in incremental and (4, 1) in incremental
+
+    assert preprocessor.create_item_collaborative_similarity()
+    assert neighbours(store) == incremental
+
+
+def test_incremental_run_without_new_ratings_keeps_similarities():
+    store, preprocessor = create_store()
+    assert preprocessor.create_item_collaborative_similarity()
+    before = neighbours(store)
+
+    assert preprocessor.create_item_collaborative_similarity(incremental=True)
+    assert neighbours(store) == before
+    with store.connect() as conn:
+        assert conn.execute(text("SELECT last_rating_id FROM preprocessing_state")).scalar() == len(RATINGS)
+
+
+def scores(store, movie_id):
+    with store.connect() as conn:
+        rows = conn.execute(text("""
+            SELECT movie_id2, similarity_score FROM movie_similarity
+            WHERE method = 'item_collaborative' AND movie_id1 = :movie_id
+        """), {'movie_id': movie_id}).fetchall()
+    return {row.movie_id2: round(row.similarity_score, 6) for row in rows}
+
+
+def test_rerated_movie_is_recomputed():
+    store, preprocessor = create_store()
+    assert preprocessor.create_item_collaborative_similarity()
+    before = scores(store, 2)
+
+    # Ca POST /users/{id}/ratings: rândul existent este actualizat, id-ul rămâne același
+    with store.begin() as conn:
+        conn.execute(text("""
+            UPDATE ratings SET rating = 1.0, timestamp = :now WHERE user_id = 1 AND movie_id = 2
+        """), {'now': datetime.utcnow()})
+    assert preprocessor.create_item_collaborative_similarity(incremental=True)
+    incremental = scores(store, 2)
+    assert incremental != before
+
+    assert preprocessor.create_item_collaborative_similarity()
+    assert scores(store, 2) == incremental
@@ -0,0 +1,23 @@
+from sqlalchemy import create_engine, text
+
+from data_processing.DataPreprocessor import SERVING_TOP_K
+from loadtest.fixture import serving_tables
+
+
+def test_fixture_has_production_serving_tables(fixture_manifest):
+    store = create_engine(fixture_manifest['database_url'])
+    try:
+        with store.connect() as conn:
+            tables = serving_tables(conn)
+            widest = conn.execute(text(
+                "SELECT MAX(n) FROM (SELECT COUNT(*) AS n FROM movie_similarity GROUP BY movie_id1, method)"
+            )).scalar()
+    finally:
+        store.dispose()
+
+    # Manifestul descrie exact tabelele pe care au fost măsurate latențele
+    assert fixture_manifest['serving_tables'] == tables
+    assert set(tables['movie_similarity']) == {'genre', 'item_collaborative'}
+    assert tables['movie_recommendations'] > 0
+    # Ca în producție: cel mult SERVING_TOP_K vecini per film și metodă, nu toate perechile
+    assert widest <= SERVING_TOP_K
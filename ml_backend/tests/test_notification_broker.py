@@ -0,0 +1,65 @@
+import threading
+import time
+
+import pytest
+
+from api import notification_broker
+from api.notification_broker import RedisNotificationBroker
+
+SLOW_REDIS_SECONDS = 0.5
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.messages = []
+
+    def publish(self, channel, frame):
+        self.messages.append((channel, frame))
+
+    def execute(self):
+        time.sleep(self.client.delay)
+        if self.client.error:
+            raise notification_broker.redis.ConnectionError("Redis unavailable")
+        with self.client.lock:
+            self.client.published.extend(self.messages)
+
+
+class FakeRedis:
+    def __init__(self, delay: float = 0.0, error: bool = False):
+        self.delay = delay
+        self.error = error
+        self.lock = threading.Lock()
+        self.published = []
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+
+@pytest.fixture
+def broker():
+    broker = RedisNotificationBroker('redis://127.0.0.1:1')
+    yield broker
+    broker.close()
+
+
+def test_publish_does_not_wait_for_redis(broker):
+    broker.client = FakeRedis(delay=SLOW_REDIS_SECONDS)
+
+    started = time.monotonic()
+    for user_id in range(10):
+        broker.publish(user_id, b'frame')
+    assert time.monotonic() - started < SLOW_REDIS_SECONDS
+
+    broker.close()
+    assert sorted(broker.client.published) == sorted((f"notifications:{user_id}", b'frame') for user_id in range(10))
+
+
+def test_frames_fall_back_to_local_subscribers_when_redis_fails(broker, monkeypatch):
+    broker.client = FakeRedis(error=True)
+    delivered = []
+    monkeypatch.setattr(broker, 'deliver', lambda user_id, frame: delivered.append((user_id, frame)))
+
+    broker.publish(1, b'frame')
+    broker.close()
+    assert delivered == [(1, b'frame')]
@@ -0,0 +1,37 @@
+import pytest
+from sqlalchemy.orm import Session
+
+from api.notifications import add_notification, get_notification_summary, mark_notifications_read
+from database.models import Notification, NotificationSummary
+from tests.concurrency import create_app_store, run_concurrent_first_writes
+
+
+@pytest.fixture
+def store(tmp_path):
+    return create_app_store(tmp_path / 'notifications.db')
+
+
+def test_concurrent_first_notifications_share_one_summary_row(store):
+    errors = run_concurrent_first_writes(
+        store, 'notification_summary',
+        lambda db: add_notification(db, 1, 'First', 'message'),
+        lambda db: add_notification(db, 1, 'Second', 'message')
+    )
+    assert errors == []
+
+    with Session(bind=store) as db:
+        assert db.query(Notification).count() == 2
+        assert db.query(NotificationSummary).count() == 1
+        assert get_notification_summary(db, 1).unread_count == 2
+
+
+def test_summary_of_existing_notifications_is_rebuilt_on_first_write(store):
+    with Session(bind=store) as db:
+        # Notificări create înainte de tabela notification_summary
+        db.add_all([Notification(user_id=1, title='Old', message='message', read=False) for _ in range(3)])
+        db.commit()
+
+        assert mark_notifications_read(db, 1, db.query(Notification.id).first().id) == 1
+        db.commit()
+        summary = get_notification_summary(db, 1)
+        assert summary.unread_count == 2 and summary.updated_at is not None
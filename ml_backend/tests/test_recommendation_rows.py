@@ -0,0 +1,73 @@
+import json
+
+import pandas as pd
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+
+from data_processing.DataPreprocessor import DataPreprocessor
+from data_processing.local_store import create_local_engine
+from database.models import Base
+from database.versioning import bump_data_version
+from machine_learning.MovieCatalog import MovieCatalog
+from machine_learning.RecommendationEngine import RecommendationEngine
+
+SIMILARITIES = [
+    (1, 2, 0.9, 'item_collaborative'), (1, 3, 0.5, 'item_collaborative'), (1, 4, 0.1, 'item_collaborative'),
+    (2, 1, 0.9, 'item_collaborative'),
+    (1, 4, 0.8, 'genre'), (1, 3, 0.6, 'genre'),
+]
+
+
+def create_store():
+    store = create_local_engine()
+    Base.metadata.create_all(store)
+    preprocessor = DataPreprocessor(session=Session(bind=store))
+    assert preprocessor.create_processed_tables()
+
+    with store.begin() as conn:
+        pd.DataFrame({'id': [1, 2, 3, 4], 'title': ['A', 'B', 'C', 'D'], 'year': 2000}).to_sql(
+            'movies', conn, if_exists='append', index=False)
+        pd.DataFrame(SIMILARITIES, columns=['movie_id1', 'movie_id2', 'similarity_score', 'method']).to_sql(
+            'movie_similarity', conn, if_exists='append', index=False)
+    return store, preprocessor
+
+
+def stored_rows(store):
+    with store.connect() as conn:
+        rows = conn.execute(text("SELECT movie_id, method, recommendations FROM movie_recommendations"))
+        return {(row.movie_id, row.method): json.loads(row.recommendations) for row in rows}
+
+
+def test_rows_keep_the_top_k_ids_and_scores_per_method():
+    store, preprocessor = create_store()
+    assert preprocessor.build_recommendation_rows(top_k=2)
+
+    assert stored_rows(store) == {
+        (1, 'item_collaborative'): [[2, 0.9], [3, 0.5]],
+        (2, 'item_collaborative'): [[1, 0.9]],
+        (1, 'genre'): [[4, 0.8], [3, 0.6]],
+    }
+
+
+def test_served_recommendations_follow_poster_and_stats_updates():
+    store, preprocessor = create_store()
+    assert preprocessor.build_recommendation_rows()
+    engine = RecommendationEngine(session=Session(bind=store), catalog=MovieCatalog(ttl=0))
+
+    recommendations = engine.collaborative_filtering_recommendations(1, limit=2)
+    assert [rec['id'] for rec in recommendations] == [2, 3]
+    assert recommendations[0]['poster_path'] is None
+    assert recommendations[0]['method'] == 'collaborative_filtering'
+
+    # Ce fac fetch_posters și calculate_movie_stats, fără să reconstruiască movie_recommendations
+    with store.begin() as conn:
+        conn.execute(text("UPDATE movies SET poster_path = '/b.jpg' WHERE id = 2"))
+        conn.execute(text("INSERT INTO movie_stats (movie_id, avg_rating, rating_count) VALUES (2, 4.5, 12)"))
+        bump_data_version(conn)
+    engine.session.rollback()
+
+    recommendations = engine.collaborative_filtering_recommendations(1, limit=2)
+    assert recommendations[0]['poster_path'] == '/b.jpg'
+    assert recommendations[0]['average_rating'] == 4.5 and recommendations[0]['rating_count'] == 12
+    assert recommendations[0]['similarity_score'] == 0.9
+    assert engine.content_based_recommendations(1, limit=1)[0]['method'] == 'content_based'
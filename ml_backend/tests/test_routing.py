@@ -0,0 +1,104 @@
+import time
+
+import pytest
+from sqlalchemy import event, text
+
+from database.dialects import create_database_engine
+from database.routing import ReplicaRouter, create_heartbeat_table, read_heartbeat
+
+MAX_LAG = 0.5
+HEARTBEAT_INTERVAL = 0.05
+
+
+@pytest.fixture
+def databases(tmp_path):
+    primary = create_database_engine(f"sqlite:///{tmp_path / 'primary.db'}")
+    replica = create_database_engine(f"sqlite:///{tmp_path / 'replica.db'}")
+    yield primary, replica
+    primary.dispose()
+    replica.dispose()
+
+
+def create_router(primary, *replicas):
+    return ReplicaRouter(primary, replicas, max_lag=MAX_LAG, check_interval=0,
+                         heartbeat_interval=HEARTBEAT_INTERVAL)
+
+
+def replicate(primary, replica):
+    # Replicarea simulată: heartbeat-ul ajunge pe replică odată cu celelalte scrieri ale primarului
+    with primary.connect() as conn:
+        beat = read_heartbeat(conn)
+    with replica.begin() as conn:
+        create_heartbeat_table(conn)
+        conn.execute(text("DELETE FROM replication_heartbeat"))
+        conn.execute(text("INSERT INTO replication_heartbeat (name, beat_ms) VALUES ('primary', :beat)"),
+                     {'beat': beat})
+
+
+def test_reads_go_to_a_caught_up_replica(databases):
+    primary, replica = databases
+    router = create_router(primary, replica)
+    try:
+        router.start_heartbeat()
+        replicate(primary, replica)
+        assert router.read_engine() is replica
+    finally:
+        router.dispose(close=False)
+
+
+def test_lagging_replica_leaves_and_rejoins_the_rotation(databases):
+    primary, replica = databases
+    router = create_router(primary, replica)
+    try:
+        router.start_heartbeat()
+        replicate(primary, replica)
+        assert router.read_engine() is replica
+
+        # Replica nu mai primește scrieri (de exemplu evaluările utilizatorilor), heartbeat-ul primarului avansează
+        time.sleep(MAX_LAG + 4 * HEARTBEAT_INTERVAL)
+        assert router.read_engine() is primary
+        assert router.lags[0] > MAX_LAG
+
+        replicate(primary, replica)
+        assert router.read_engine() is replica
+    finally:
+        router.dispose(close=False)
+
+
+def test_replica_without_heartbeat_is_not_used(databases):
+    primary, replica = databases
+    router = create_router(primary, replica)
+    try:
+        assert router.read_engine() is primary
+        assert router.lags[0] == float('inf')
+    finally:
+        router.dispose(close=False)
+
+
+def test_unreachable_replica_falls_back_to_the_primary(databases, tmp_path):
+    primary, _ = databases
+    unreachable = create_database_engine(f"sqlite:///{tmp_path / 'missing' / 'replica.db'}")
+    router = create_router(primary, unreachable)
+    try:
+        assert router.read_engine() is primary
+        assert router.lags[0] is None
+    finally:
+        router.dispose()
+
+
+def test_heartbeat_table_is_created_once(databases):
+    primary, _ = databases
+    statements = []
+    event.listen(primary, 'before_cursor_execute',
+                 lambda conn, cursor, statement, *args: statements.append(statement.split()[0].upper()))
+    router = create_router(primary)
+    try:
+        for _ in range(3):
+            assert router.beat()
+        with primary.connect() as conn:
+            assert read_heartbeat(conn) is not None
+    finally:
+        router.dispose()
+
+    assert statements.count('CREATE') == 1
+    assert statements.count('UPDATE') == 3
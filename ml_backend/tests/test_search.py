@@ -0,0 +1,21 @@
+import pytest
+
+
+@pytest.mark.parametrize('query', ['star', 'Animation'])
+def test_search_returns_movie_responses(client, query):
+    response = client.post('/search', json={'query': query, 'limit': 5})
+
+    assert response.status_code == 200
+    results = response.json()
+    assert len(results) == 5
+    for movie in results:
+        assert movie['id'] and movie['title']
+        assert query.lower() in movie['title'].lower() or query in movie['genres']
+
+    # Cele mai evaluate filme întâi
+    counts = [movie['rating_count'] for movie in results]
+    assert counts == sorted(counts, reverse=True)
+
+
+def test_empty_search_query_is_rejected(client):
+    assert client.post('/search', json={'query': ''}).status_code == 400